@@ -0,0 +1,85 @@
+import queue
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future
+
+from backend.model import predict_batch
+from backend.utils.logger import setup_logger
+
+logger = setup_logger()
+
+class MicroBatcher:
+    def __init__(self, model, device, max_batch_size=8, max_wait_ms=5):
+        self.model = model
+        self.device = device
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.model.eval()
+        self.model.to(device)
+
+        self._queue: queue.Queue = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, image, return_embedding=False) -> Future:
+        if self._closed:
+            raise RuntimeError("MicroBatcher is closed")
+        future = Future()
+        self._queue.put((image, return_embedding, future))
+        return future
+
+    def close(self):
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+
+    def _collect(self):
+        item = self._queue.get()
+        if item is None:
+            return None
+
+        batch = [item]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                # Se reencola para que el bucle principal termine tras este lote
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while (batch := self._collect()) is not None:
+            # Solo se pueden apilar tensores con la misma forma
+            groups = defaultdict(list)
+            for image, return_embedding, future in batch:
+                if future.set_running_or_notify_cancel():
+                    groups[tuple(image.shape)].append((image, return_embedding, future))
+
+            for items in groups.values():
+                start_time = time.perf_counter()
+                try:
+                    categories, embeddings = predict_batch(self.model, [image for image, _, _ in items], self.device,
+                                                           return_embeddings=True)
+                except Exception as e:
+                    for _, _, future in items:
+                        future.set_exception(e)
+                    continue
+                for idx, (_, return_embedding, future) in enumerate(items):
+                    if return_embedding:
+                        future.set_result((categories[idx], None if embeddings is None else embeddings[idx]))
+                    else:
+                        future.set_result(categories[idx])
+                logger.debug(
+                    f"BATCH_RUN | size={len(items)} | queued={self._queue.qsize()} | "
+                    f"duration={time.perf_counter() - start_time:.3f}s"
+                )
@@ -0,0 +1,149 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+from backend.jobs import sqlite_connection
+from backend.utils.logger import setup_logger
+
+logger = setup_logger()
+
+# Eventos que se conservan para reanudar con Last-Event-ID
+EVENT_HISTORY = 1000
+# Intervalo (s) con el que SQLiteEventBroker lee los eventos de otros procesos
+SQLITE_POLL_S = 0.5
+
+
+class LocalEventBroker:
+    """Pub/sub en memoria del proceso con un histórico acotado de eventos.
+
+    Cada evento tiene un id creciente. ``events_after(last_id)`` devuelve
+    los posteriores a ``last_id`` (esperando hasta ``timeout`` si no hay
+    ninguno) o None si ``last_id`` ya salió del histórico y el cliente debe
+    recargar el estado completo.
+    """
+
+    def __init__(self, history: int = EVENT_HISTORY):
+        self._events = deque(maxlen=history)
+        self._condition = threading.Condition()
+        self._last_id = 0
+
+    @property
+    def last_id(self) -> int:
+        with self._condition:
+            return self._last_id
+
+    def publish(self, event: str, data: dict) -> int:
+        with self._condition:
+            event_id = self._last_id + 1
+            self._deliver(event_id, event, data)
+            return event_id
+
+    def _deliver(self, event_id, event, data):
+        # Se llama con self._condition adquirida
+        self._events.append((event_id, event, data))
+        self._last_id = event_id
+        self._condition.notify_all()
+
+    def close(self):
+        pass
+
+    def events_after(self, last_id: int, timeout: float | None = None) -> list | None:
+        with self._condition:
+            if last_id > self._last_id:
+                # Id de otro histórico (reinicio del servidor): también hay que recargar
+                return None
+            self._condition.wait_for(lambda: self._last_id > last_id, timeout)
+            if self._events and last_id < self._events[0][0] - 1:
+                return None
+            return [e for e in self._events if e[0] > last_id]
+
+
+class SQLiteEventBroker(LocalEventBroker):
+    """Broker compartido entre procesos (workers de ``serve.py``) a través de un fichero SQLite.
+
+    ``publish`` inserta el evento en la tabla y un hilo de cada proceso la
+    lee cada ``poll_s`` segundos y lo reparte a sus suscriptores locales. Los
+    ids son los de la tabla, así que un cliente puede reanudar en cualquier worker.
+    """
+
+    def __init__(self, db_path: str | Path, history: int = EVENT_HISTORY, poll_s: float = SQLITE_POLL_S):
+        super().__init__(history)
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.history = history
+        self.poll_s = poll_s
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS events ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, event TEXT NOT NULL, data TEXT NOT NULL, created REAL NOT NULL)"
+            )
+            # Solo los eventos nuevos: los anteriores al arranque no tienen suscriptores
+            self._last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM events").fetchone()[0]
+        self._poll_lock = threading.Lock()
+        self._closed = threading.Event()
+        threading.Thread(target=self._tail, name="event-broker", daemon=True).start()
+
+    def _connect(self):
+        return sqlite_connection(self.db_path)
+
+    def publish(self, event: str, data: dict) -> int:
+        with self._connect() as conn:
+            event_id = conn.execute(
+                "INSERT INTO events (event, data, created) VALUES (?, ?, ?)", (event, json.dumps(data), time.time())
+            ).lastrowid
+            conn.execute("DELETE FROM events WHERE id <= ?", (event_id - self.history,))
+        # Entrega inmediata a los suscriptores de este proceso
+        self._poll()
+        return event_id
+
+    def _poll(self):
+        with self._poll_lock:
+            with self._connect() as conn:
+                rows = conn.execute("SELECT id, event, data FROM events WHERE id > ? ORDER BY id",
+                                    (self.last_id,)).fetchall()
+            with self._condition:
+                for event_id, event, data in rows:
+                    self._deliver(event_id, event, json.loads(data))
+
+    def _tail(self):
+        while not self._closed.wait(self.poll_s):
+            try:
+                self._poll()
+            except sqlite3.Error as e:
+                logger.error(f"EVENT_BROKER_POLL_FAIL | error={e}")
+
+    def close(self):
+        self._closed.set()
+
+
+def make_event_broker(backend: str, db_path: str | Path = "events/events.db", history: int = EVENT_HISTORY,
+                      workers: int = 1):
+    """Broker de ``backend``. Con varios workers ``local`` pasa a ``sqlite``: en memoria,
+    los suscriptores de un worker no verían los eventos publicados en otro."""
+    if backend == "local" and workers > 1:
+        logger.warning(f"EVENTS_BACKEND_UPGRADE | backend=local -> sqlite | workers={workers}")
+        backend = "sqlite"
+    if backend == "local":
+        return LocalEventBroker(history)
+    if backend == "sqlite":
+        return SQLiteEventBroker(db_path, history)
+    raise ValueError(f"Unknown events backend: {backend}")
+
+
+def format_sse(event_id=None, event=None, data=None, comment=None, retry_ms=None) -> str:
+    lines = []
+    if comment is not None:
+        lines.append(f": {comment}")
+    if retry_ms is not None:
+        lines.append(f"retry: {retry_ms}")
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event is not None:
+        lines.append(f"event: {event}")
+    if data is not None:
+        lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
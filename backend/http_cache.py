@@ -0,0 +1,177 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+import sqlalchemy as sa
+from flask import Response, make_response, request
+from werkzeug.http import is_resource_modified
+
+# Respuestas serializadas que se guardan por proceso
+RESPONSE_CACHE_SIZE = 256
+
+
+def utcnow():
+    """Hora UTC sin zona, como se guarda en ``versiones_tablas.modificada``."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def bump_table_versions(conn, version_table, tables):
+    """Suma 1 a la versión de ``tables`` y anota la hora (UTC) del cambio, en la transacción de ``conn``."""
+    tables = sorted(tables)
+    now = utcnow()
+    result = conn.execute(version_table.update()
+                          .where(version_table.c.tabla.in_(tables))
+                          .values(version=version_table.c.version + 1, modificada=now))
+    if result.rowcount < len(tables):
+        # Tabla de versiones creada a mano, sin sus filas
+        existing = set(conn.execute(sa.select(version_table.c.tabla).where(version_table.c.tabla.in_(tables))).scalars())
+        conn.execute(version_table.insert(), [{"tabla": table, "version": 1, "modificada": now}
+                                              for table in tables if table not in existing])
+
+
+def track_table_versions(session, version_table, models):
+    """Mantiene en ``version_table`` una versión por tabla de ``models`` que cambia con cada alta, edición o baja.
+
+    La versión se incrementa en el mismo flush que el cambio (y en los
+    ``update``/``delete`` masivos del ORM), así que todos los workers la
+    ven a la vez que los datos. Al crear ``version_table`` se insertan sus
+    filas con versión 0.
+    """
+    tables = {model.__table__.name for model in models}
+
+    @sa.event.listens_for(version_table, "after_create")
+    def seed(target, connection, **kw):
+        connection.execute(version_table.insert(), [{"tabla": table, "version": 0, "modificada": utcnow()}
+                                                    for table in sorted(tables)])
+
+    @sa.event.listens_for(session, "after_flush")
+    def after_flush(session, flush_context):
+        changed = {obj.__table__.name for obj in (*session.new, *session.deleted) if obj.__table__.name in tables}
+        changed.update(obj.__table__.name for obj in session.dirty
+                       if obj.__table__.name in tables and session.is_modified(obj, include_collections=False))
+        if changed:
+            bump_table_versions(session.connection(), version_table, changed)
+
+    @sa.event.listens_for(session, "do_orm_execute")
+    def bulk_write(state):
+        mapper = state.bind_mapper
+        if (state.is_update or state.is_delete) and mapper is not None and mapper.local_table.name in tables:
+            bump_table_versions(state.session.connection(), version_table, {mapper.local_table.name})
+
+
+def table_fingerprint(session, sources, version_table=None) -> tuple:
+    """Huella ``(filas, max(id), max(fecha), versión, modificada)`` de cada ``(modelo, filtro | None)``.
+
+    Todo sale de una sola consulta. Las tres primeras columnas cubren las
+    filas del filtro, incluso si se escriben sin pasar por el ORM; la versión
+    de la tabla en ``version_table`` (ver ``track_table_versions``) cambia
+    también con las ediciones en el sitio. Sirve para validar ETags y
+    respuestas cacheadas sin volver a leer ni serializar los reportes.
+    """
+    columns = []
+    for model, condition in sources:
+        for column in (sa.func.count(model.id), sa.func.max(model.id), sa.func.max(model.fecha)):
+            subquery = sa.select(column)
+            if condition is not None:
+                subquery = subquery.where(condition)
+            columns.append(subquery.scalar_subquery())
+        for column in ("version", "modificada"):
+            if version_table is None:
+                columns.append(sa.null())
+            else:
+                columns.append(sa.select(version_table.c[column])
+                               .where(version_table.c.tabla == model.__table__.name)
+                               .scalar_subquery())
+    row = session.execute(sa.select(*columns)).one()
+    return tuple(tuple(row[i:i + 5]) for i in range(0, len(row), 5))
+
+
+def fingerprint_last_modified(fingerprint):
+    """Último cambio en UTC: la ``fecha`` más reciente (hora local del servidor) o la última edición o baja."""
+    dates = []
+    for _, _, fecha, _, modificada in fingerprint:
+        if fecha is not None:
+            dates.append(fecha.astimezone(timezone.utc))
+        if modificada is not None:
+            dates.append(modificada.replace(tzinfo=timezone.utc))
+    return max(dates) if dates else None
+
+
+def make_etag(*parts) -> str:
+    return hashlib.sha256(repr(parts).encode()).hexdigest()[:32]
+
+
+class ResponseCache:
+    """LRU en memoria de cuerpos de respuesta ya serializados.
+
+    Cada entrada guarda el ETag con el que se generó: ``get`` solo la
+    devuelve si coincide con el actual, de modo que una huella nueva
+    (reportes subidos desde otro worker) nunca sirve datos viejos. ``clear``
+    libera las entradas tras un commit en este proceso.
+    """
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, etag: str) -> tuple | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != etag:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1], entry[2]
+
+    def put(self, key, etag: str, body: bytes, mimetype: str):
+        with self._lock:
+            self._entries[key] = (etag, body, mimetype)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+
+def conditional_response(cache, key, etag, last_modified, build):
+    """304 si el cliente ya tiene ``etag``; si no, el cuerpo cacheado o el que genere ``build()``.
+
+    Solo se cachean respuestas 200 completas (no las de streaming). Todas
+    llevan ``Cache-Control: private, no-cache`` para que el navegador
+    revalide siempre con ``If-None-Match``. Si la petición trae
+    ``If-None-Match``, ``If-Modified-Since`` no se tiene en cuenta.
+    """
+    environ = request.environ
+    if "HTTP_IF_NONE_MATCH" in environ:
+        environ = {key: value for key, value in environ.items() if key != "HTTP_IF_MODIFIED_SINCE"}
+    if not is_resource_modified(environ, etag=etag, last_modified=last_modified):
+        response = Response(status=304)
+    else:
+        cached = cache.get(key, etag) if cache is not None else None
+        if cached is not None:
+            body, mimetype = cached
+            response = Response(body, mimetype=mimetype)
+        else:
+            response = make_response(build())
+            if response.status_code != 200:
+                return response
+            if cache is not None and not response.is_streamed:
+                cache.put(key, etag, response.get_data(), response.mimetype)
+
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
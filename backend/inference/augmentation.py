@@ -0,0 +1,119 @@
+import numpy as np
+import torch
+from torch import nn
+from torch.nn import functional as F
+
+# Pesos de luminancia de ITU-R 601-2 (los mismos que usa torchvision para la escala de grises)
+_GRAY_WEIGHTS = (0.299, 0.587, 0.114)
+# RGB <-> YIQ: girar el plano IQ equivale a desplazar el tono sin pasar por HSV
+_RGB_TO_YIQ = torch.tensor([[0.299, 0.587, 0.114],
+                            [0.596, -0.274, -0.322],
+                            [0.211, -0.523, 0.312]])
+_YIQ_TO_RGB = torch.linalg.inv(_RGB_TO_YIQ)
+
+
+def collate_uint8(batch) -> tuple[torch.Tensor, torch.Tensor]:
+    """Junta muestras HWC uint8 en un lote ``(B, C, H, W)`` uint8 con memoria ``channels_last``.
+
+    Es la única copia de los píxeles en el worker: las muestras de
+    ``ShardedPetDataset(uint8=True)`` son vistas del shard mapeado.
+    """
+    images = torch.from_numpy(np.stack([image for image, _ in batch]))
+    labels = torch.tensor([label for _, label in batch], dtype=torch.int64)
+    return images.permute(0, 3, 1, 2), labels
+
+
+class EvalTransform(nn.Module):
+    """Lote uint8 -> float en [0, 1] (y ``size`` si se indica), sin nada aleatorio."""
+
+    def __init__(self, size: tuple[int, int] | None = None):
+        super().__init__()
+        self.size = size
+
+    def forward(self, images: torch.Tensor) -> torch.Tensor:
+        images = images.to(torch.get_default_dtype()).div_(255)
+        if self.size is not None and tuple(images.shape[-2:]) != tuple(self.size):
+            images = F.interpolate(images, size=self.size, mode='bilinear', antialias=True, align_corners=False)
+        return images
+
+
+class BatchAugment(EvalTransform):
+    """Volteos y ColorJitter sobre el lote ya colado, con parámetros distintos por muestra.
+
+    Sustituye a ``v2.RandomHorizontalFlip``/``RandomVerticalFlip``/``ColorJitter``
+    aplicados muestra a muestra. Los volteos se hacen sobre uint8. Brillo,
+    contraste, saturación y tono son transformaciones lineales del color,
+    así que se componen en una matriz 3x3 y un desplazamiento por muestra
+    y se aplican con un solo ``bmm`` a todo el lote, en el dispositivo al
+    que se haya movido (CPU o GPU). El tono se desplaza rotando el plano IQ
+    de YIQ. A diferencia de ``ColorJitter``, el orden es siempre el mismo y
+    solo se recorta a [0, 1] al final. ``generator``, si se pasa, debe
+    estar en el mismo dispositivo que el lote.
+    """
+
+    def __init__(self, size: tuple[int, int] | None = None, hflip: float = 0.5, vflip: float = 0.5,
+                 brightness: float = 0.1, contrast: float = 0.1, saturation: float = 0.05, hue: float = 0.02,
+                 generator: torch.Generator | None = None):
+        super().__init__(size)
+        self.hflip = hflip
+        self.vflip = vflip
+        self.brightness = brightness
+        self.contrast = contrast
+        self.saturation = saturation
+        self.hue = hue
+        self.generator = generator
+
+    def _rand(self, batch: int, device) -> torch.Tensor:
+        return torch.rand(batch, device=device, generator=self.generator)
+
+    def _factor(self, batch: int, spread: float, device) -> torch.Tensor:
+        return 1 + (self._rand(batch, device) * 2 - 1) * spread
+
+    def _flip(self, images: torch.Tensor, p: float, dim: int) -> torch.Tensor:
+        if p <= 0:
+            return images
+        idx = torch.nonzero(self._rand(images.shape[0], images.device) < p).view(-1)
+        if idx.numel():
+            images[idx] = images[idx].flip(dim)
+        return images
+
+    def color_matrices(self, images: torch.Tensor) -> tuple[torch.Tensor, torch.Tensor]:
+        """Matriz ``(B, 3, 3)`` y desplazamiento ``(B, 3, 1)`` con brillo, contraste, saturación y tono."""
+        batch, device, dtype = images.shape[0], images.device, images.dtype
+        eye = torch.eye(3, device=device, dtype=dtype).expand(batch, 3, 3)
+        weights = torch.tensor(_GRAY_WEIGHTS, device=device, dtype=dtype)
+        brightness = self._factor(batch, self.brightness, device).to(dtype)
+        contrast = self._factor(batch, self.contrast, device).to(dtype)
+        saturation = self._factor(batch, self.saturation, device).to(dtype).view(-1, 1, 1)
+
+        # Contraste: mezcla con la luminancia media de la imagen ya con el brillo aplicado
+        gray_mean = images.mean(dim=(2, 3)) @ weights * brightness
+        matrix = eye * (brightness * contrast).view(-1, 1, 1)
+        # Saturación: mezcla con la escala de grises de cada píxel (deja fijos los grises)
+        gray = torch.ones(3, 1, device=device, dtype=dtype) @ weights.view(1, 3)
+        matrix = (saturation * eye + (1 - saturation) * gray) @ matrix
+        if self.hue:
+            angle = (self._rand(batch, device) * 2 - 1).to(dtype) * self.hue * 2 * torch.pi
+            cos, sin = angle.cos(), angle.sin()
+            rotation = torch.zeros(batch, 3, 3, device=device, dtype=dtype)
+            rotation[:, 0, 0] = 1
+            rotation[:, 1, 1], rotation[:, 1, 2] = cos, -sin
+            rotation[:, 2, 1], rotation[:, 2, 2] = sin, cos
+            hue = _YIQ_TO_RGB.to(device, dtype) @ rotation @ _RGB_TO_YIQ.to(device, dtype)
+            matrix = hue @ matrix
+        # El desplazamiento es gris, y ni la saturación ni el tono cambian los grises
+        offset = ((1 - contrast) * gray_mean).view(-1, 1, 1).expand(batch, 3, 1)
+        return matrix, offset
+
+    def forward(self, images: torch.Tensor) -> torch.Tensor:
+        # Copia contigua (NCHW) del lote: los volteos se hacen sobre ella sin tocar la del DataLoader
+        images = images.clone(memory_format=torch.contiguous_format)
+        images = self._flip(images, self.hflip, -1)
+        images = self._flip(images, self.vflip, -2)
+        images = super().forward(images).contiguous()
+        if not (self.brightness or self.contrast or self.saturation or self.hue):
+            return images
+        batch, channels, height, width = images.shape
+        matrix, offset = self.color_matrices(images)
+        images = torch.baddbmm(offset, matrix, images.view(batch, channels, height * width))
+        return images.view(batch, channels, height, width).clamp_(0, 1)
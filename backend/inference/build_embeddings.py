@@ -0,0 +1,38 @@
+from pathlib import Path
+
+from backend.app import LostReport, ShelterReport, create_app
+from backend.model import predict
+
+STATIC_ROOT = Path(__file__).parent.parent.parent / 'frontend'
+
+
+def image_path(image_store, path_imagen: str) -> Path:
+    """Fichero local de ``path_imagen``: del almacenamiento de imágenes (descargado si es S3) o estático."""
+    key = image_store.backend.key_for(path_imagen)
+    if key is not None:
+        return image_store.backend.local_path(key)
+    # Reportes anteriores al almacenamiento por contenido (static/uploads/, static/shelters_uploads/)
+    return STATIC_ROOT / path_imagen.lstrip('/')
+
+
+if __name__ == '__main__':
+    # Rellena los vector stores con los reportes subidos antes de que existieran
+    app = create_app('production')
+    provider = app.config['INFERENCE_PROVIDER']
+    if not provider.wait():
+        raise RuntimeError('No se pudo cargar el modelo')
+    model, device = provider.model, provider.device
+    with app.app_context():
+        for name, report_model in (('perdidos', LostReport), ('acogidas', ShelterReport)):
+            store = app.config['VECTOR_STORES'][name]
+            known = set(store.arrays()[2].tolist())
+            added = 0
+            for report in report_model.query.filter(report_model.id.notin_(known) if known else True):
+                _, embedding = predict(model, image_path(app.config['IMAGE_STORE'], report.path_imagen), device,
+                                       return_embedding=True)
+                if embedding is None:
+                    print(f'[EMBEDDINGS] No se pudo leer {report.path_imagen}')
+                    continue
+                store.add(report.id, embedding)
+                added += 1
+            print(f'[EMBEDDINGS] {name}: {added} añadidos, {len(store)} en total')
@@ -0,0 +1,204 @@
+import hashlib
+import json
+import os
+import struct
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from backend.prediction_cache import content_hash, file_hash
+from backend.utils.logger import setup_logger
+
+logger = setup_logger()
+
+# Descargas simultáneas (hilos) y conexiones keep-alive por host
+DOWNLOAD_WORKERS = 16
+DOWNLOAD_TIMEOUT_S = 10
+# Reintentos con espera exponencial: backoff * 2^(n-1) segundos
+DOWNLOAD_RETRIES = 4
+DOWNLOAD_BACKOFF_S = 0.5
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+MANIFEST_NAME = "manifest.jsonl"
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def make_session(pool_size: int = DOWNLOAD_WORKERS, retries: int = DOWNLOAD_RETRIES,
+                 backoff: float = DOWNLOAD_BACKOFF_S) -> requests.Session:
+    """``Session`` con un pool de ``pool_size`` conexiones reutilizables y reintentos con backoff.
+
+    Se reintentan los errores de conexión y los ``RETRY_STATUSES``,
+    respetando ``Retry-After`` en los 429/503.
+    """
+    retry = Retry(total=retries, backoff_factor=backoff, status_forcelist=RETRY_STATUSES,
+                  allowed_methods=frozenset({"GET"}), raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def image_name(url: str) -> str:
+    """Nombre estable para la imagen de ``url``: el mismo en cada ejecución, así se puede reanudar."""
+    return hashlib.sha1(url.encode()).hexdigest()[:16]
+
+
+def save_png(data: bytes, path: str) -> dict | None:
+    """Decodifica ``data`` y lo guarda como PNG en ``path``; ``None`` si no es una imagen.
+
+    Se ejecuta en el pool de procesos: solo viajan los bytes descargados y
+    el resultado (checksum y tamaño), no la imagen decodificada.
+    """
+    import cv2
+    import numpy as np
+
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        return None
+    ok, encoded = cv2.imencode(".png", image)
+    if not ok:
+        return None
+    encoded = encoded.tobytes()
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Escritura atómica: una descarga interrumpida nunca deja un PNG a medias
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    with os.fdopen(fd, "wb") as f:
+        f.write(encoded)
+    os.replace(tmp_path, path)
+    return {"sha256": content_hash(encoded), "bytes": len(encoded),
+            "height": image.shape[0], "width": image.shape[1]}
+
+
+class Manifest:
+    """Registro JSONL de las imágenes ya guardadas: ``url``, ``path`` (relativa a ``root``), ``sha256``...
+
+    Cada descarga terminada añade una línea y hace ``flush``, así que una
+    ejecución interrumpida conserva todo lo completado. Al cargar se
+    ignora una última línea truncada. Una entrada cuenta como hecha si su
+    fichero existe con el mismo tamaño (o el mismo SHA-256 con ``verify``).
+    """
+
+    def __init__(self, path: str | Path, root: str | Path):
+        self.path = Path(path)
+        self.root = Path(root)
+        self.entries = {}
+        self._lock = threading.Lock()
+        if self.path.exists():
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    self.entries[entry["url"]] = entry
+
+    def done(self, url: str, verify: bool = False) -> bool:
+        entry = self.entries.get(url)
+        if entry is None:
+            return False
+        path = self.root / entry["path"]
+        if not path.exists() or path.stat().st_size != entry["bytes"]:
+            return False
+        return not verify or file_hash(path) == entry["sha256"]
+
+    def add(self, entry: dict):
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+            self.entries[entry["url"]] = entry
+
+    def adopt(self, url: str, path: str | Path, rel_path: str) -> bool:
+        """Registra como descarga de ``url`` un PNG que ya está en disco, moviéndolo a ``rel_path``.
+
+        Si ``url`` ya está hecha con el mismo contenido, ``path`` es un
+        duplicado y se borra. Devuelve False (y no toca nada) si ``path``
+        no es un PNG o si ``url`` ya está hecha con otra imagen.
+        """
+        path = Path(path)
+        data = path.read_bytes()
+        if not data.startswith(PNG_SIGNATURE):
+            return False
+        sha256 = content_hash(data)
+        if self.done(url):
+            if self.entries[url]["sha256"] != sha256:
+                return False
+            path.unlink()
+            return True
+        target = self.root / rel_path
+        os.replace(path, target)
+        # Ancho y alto de la cabecera IHDR, sin decodificar la imagen
+        width, height = struct.unpack(">II", data[16:24])
+        self.add({"url": url, "path": rel_path, "sha256": sha256, "bytes": len(data), "height": height, "width": width})
+        return True
+
+
+class Downloader:
+    """Descarga ``(url, ruta relativa)`` en paralelo y las guarda como PNG con un manifiesto reanudable.
+
+    ``workers`` hilos comparten la ``Session`` (pool keep-alive y
+    reintentos) y la decodificación y el PNG se hacen en ``processes``
+    procesos, fuera del GIL. Cada hilo espera a que su imagen se guarde
+    antes de tomar la siguiente, así que en memoria hay como mucho
+    ``workers`` descargas a la vez. ``processes=0`` guarda en el propio hilo.
+    """
+
+    def __init__(self, root: str | Path, session: requests.Session | None = None,
+                 manifest: Manifest | None = None, workers: int = DOWNLOAD_WORKERS,
+                 processes: int | None = None, timeout: float = DOWNLOAD_TIMEOUT_S, verify: bool = False):
+        self.root = Path(root)
+        self.session = session or make_session(workers)
+        self.manifest = manifest or Manifest(self.root / MANIFEST_NAME, self.root)
+        self.workers = workers
+        self.processes = processes
+        self.timeout = timeout
+        self.verify = verify
+
+    def _download(self, url: str, rel_path: str, pool) -> dict | None:
+        response = self.session.get(url, timeout=self.timeout)
+        if response.status_code != 200:
+            logger.warning(f"DOWNLOAD_FAIL | url={url} | status={response.status_code}")
+            return None
+        path = str(self.root / rel_path)
+        saved = pool.submit(save_png, response.content, path).result() if pool else save_png(response.content, path)
+        if saved is None:
+            logger.warning(f"DOWNLOAD_NOT_AN_IMAGE | url={url}")
+            return None
+        return {"url": url, "path": rel_path, **saved}
+
+    def run(self, items) -> dict:
+        """Descarga lo que falte de ``items`` y devuelve ``{"saved", "skipped", "failed"}``."""
+        items = list(items)
+        pending = [(url, rel_path) for url, rel_path in items if not self.manifest.done(url, self.verify)]
+        stats = {"saved": 0, "skipped": len(items) - len(pending), "failed": 0}
+        if not pending:
+            return stats
+
+        pool = ProcessPoolExecutor(self.processes) if self.processes != 0 else None
+        threads = ThreadPoolExecutor(self.workers)
+        try:
+            futures = {threads.submit(self._download, url, rel_path, pool): url for url, rel_path in pending}
+            for future in as_completed(futures):
+                try:
+                    entry = future.result()
+                except requests.RequestException as e:
+                    logger.warning(f"DOWNLOAD_FAIL | url={futures[future]} | error={e}")
+                    entry = None
+                if entry is None:
+                    stats["failed"] += 1
+                else:
+                    self.manifest.add(entry)
+                    stats["saved"] += 1
+        finally:
+            # Con Ctrl+C no se esperan las descargas pendientes: la siguiente ejecución las retoma
+            threads.shutdown(cancel_futures=True)
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+        logger.info(f"DOWNLOAD_DONE | saved={stats['saved']} | skipped={stats['skipped']} | failed={stats['failed']}")
+        return stats
@@ -1,33 +1,15 @@
-from pathlib import Path
+import argparse
+import itertools
 import time
+from pathlib import Path
 
-import requests
-
-import numpy as np
-import cv2
+from backend.inference.data.downloader import DOWNLOAD_WORKERS, Downloader, image_name, make_session
 
-BASE_URL = "https://dog.ceo/api"
+DOG_API_URL = "https://dog.ceo/api"
+CAT_API_URL = "https://api.thecatapi.com/v1"
 DATASET_DIR = Path(__file__).parent
-DATASET_DIR.mkdir(parents=True, exist_ok=True)
-
-resp = requests.get(f"{BASE_URL}/breeds/list/all")
-resp_json = resp.json()
-
-if __name__ == "__main__":
-    if resp_json["status"] != "success":
-        raise RuntimeError("Failed to fetch breeds list.")
-    
-    all_breeds = []
-    for breed, sub_breeds in resp_json["message"].items():
-        if sub_breeds:
-            for sub in sub_breeds:
-                all_breeds.append(f"{breed}-{sub}")
-        else:
-            all_breeds.append(breed)
-            
-print(f"Total breeds found: {len(all_breeds)}")
 
-SELECTED_BREEDS = [
+DOG_BREEDS = [
     ("labrador", None),          # Labrador
     ("bulldog", "english"),      # English Bulldog
     ("bulldog", "french"),       # French Bulldog
@@ -50,52 +32,7 @@ SELECTED_BREEDS = [
     ("spaniel", "irish")         # Irish Spaniel
 ]
 
-print(f"Selected breeds ({len(SELECTED_BREEDS)}): {SELECTED_BREEDS}")
-
-for breed, sub_breed in SELECTED_BREEDS:
-    if sub_breed:
-        url = f"{BASE_URL}/breed/{breed}/{sub_breed}/images"
-    else:
-        url = f"{BASE_URL}/breed/{breed}/images"
-    
-    print(f"Fetching images for {breed} ...")
-    r = requests.get(url).json()
-    if r["status"] != "success":
-        print(f"  ⚠️ Skipped {breed}")
-        continue
-
-    img_urls = r["message"]
-    print(f"  Found {len(img_urls)} images")
-
-    breed_dir = DATASET_DIR / breed
-    breed_dir.mkdir(exist_ok=True)
-
-    for idx, img_url in enumerate(img_urls, start=1):
-        try:
-            img_resp = requests.get(img_url, stream=True)
-            if img_resp.status_code != 200:
-                print(f"    Failed to download {img_url}")
-                continue
-
-            arr = np.asarray(bytearray(img_resp.content), dtype=np.uint8)
-            img = cv2.imdecode(arr, cv2.IMREAD_COLOR)
-            if img is None:
-                print(f"    Failed to decode {img_url}")
-                continue
-
-            img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-
-            save_path = breed_dir / f"{idx}.png"
-            cv2.imwrite(str(save_path), cv2.cvtColor(img, cv2.COLOR_RGB2BGR)) 
-            print(f"    Saved {save_path}") 
-
-        except Exception as e:
-            print(f"    Failed {img_url}: {e}")
-            
-BASE_URL = "https://api.thecatapi.com/v1"
-IMAGES_PER_BREED = 180          
-IMAGES_PER_REQUEST = 20 
-SELECTED_BREEDS = {
+CAT_BREEDS = {
     "bengal": "beng",
     "siamese": "siam",
     "persian": "pers",
@@ -103,65 +40,150 @@ SELECTED_BREEDS = {
     "maine_coon": "mcoo",
     "british_shorthair": "bsho"
 }
-
-for breed_name, breed_id in SELECTED_BREEDS.items():
-    print(f"\n🐾 Fetching images for {breed_name} ({breed_id})")
-
-    breed_dir = DATASET_DIR / breed_name
-    breed_dir.mkdir(exist_ok=True)
-
-    downloaded = 0
+IMAGES_PER_BREED = 180
+IMAGES_PER_REQUEST = 20
+# Pausa entre páginas de TheCatAPI para no superar su límite de peticiones
+CAT_PAGE_DELAY_S = 0.25
+
+
+def list_dog_images(session, base_url: str = DOG_API_URL, breeds=DOG_BREEDS) -> list[tuple[str, list[str]]]:
+    """``(carpeta, urls)`` de cada raza o subraza de ``breeds``, en orden; las subrazas comparten la carpeta (la clase) de la raza."""
+    listings = []
+    for breed, sub_breed in breeds:
+        url = f"{base_url}/breed/{breed}/{sub_breed}/images" if sub_breed else f"{base_url}/breed/{breed}/images"
+        r = session.get(url, timeout=10).json()
+        if r["status"] != "success":
+            print(f"  ⚠️ Skipped {breed}")
+            continue
+        print(f"Found {len(r['message'])} images for {breed} {sub_breed or ''}")
+        listings.append((breed, r["message"]))
+    return listings
+
+
+def image_path(folder: str, url: str) -> str:
+    return f"{folder}/{image_name(url)}.png"
+
+
+def legacy_files(folder: Path) -> dict[int, Path]:
+    """Ficheros ``<n>.png`` que guardaba la versión anterior de este script, por número."""
+    if not folder.is_dir():
+        return {}
+    return {int(path.stem): path for path in folder.glob("*.png") if path.stem.isdigit()}
+
+
+def adopt_legacy_files(manifest, folder: str, urls_by_index: dict[int, str]) -> int:
+    """Pasa los ``<carpeta>/<n>.png`` de la versión anterior al nombre de su URL y los añade al manifiesto.
+
+    ``urls_by_index[n]`` es la URL que se guardó en ``<n>.png``. Así un
+    dataset descargado antes no se vuelve a descargar ni acaba con filas
+    repetidas en ``data.csv``. Devuelve cuántos ficheros se han adoptado.
+    """
+    adopted = 0
+    for index, path in sorted(legacy_files(manifest.root / folder).items()):
+        url = urls_by_index.get(index)
+        if url is not None and manifest.adopt(url, path, image_path(folder, url)):
+            adopted += 1
+    if adopted:
+        print(f"  ♻️ Adopted {adopted} existing images in {folder}")
+    return adopted
+
+
+def download_dog_images(downloader, listings) -> dict:
+    # El script anterior numeraba cada listado desde 1 (también las URLs que fallaban) y en las
+    # carpetas compartidas por varias subrazas cada <n>.png quedaba con la última que lo escribió
+    legacy = {}
+    for folder, urls in listings:
+        legacy.setdefault(folder, {}).update(enumerate(urls, start=1))
+    for folder, urls_by_index in legacy.items():
+        adopt_legacy_files(downloader.manifest, folder, urls_by_index)
+    return downloader.run((url, image_path(folder, url)) for folder, urls in listings for url in urls)
+
+
+def cat_image_urls(session, breed_id: str, base_url: str = CAT_API_URL, per_request: int = IMAGES_PER_REQUEST,
+                   delay: float = CAT_PAGE_DELAY_S):
+    """URLs (sin repetir) de TheCatAPI de ``breed_id``; pide páginas según se consumen, hasta un error o una vacía."""
+    seen = set()
     page = 0
-
-    while downloaded < IMAGES_PER_BREED:
-        params = {
+    while True:
+        resp = session.get(f"{base_url}/images/search", timeout=10, params={
             "breed_ids": breed_id,
-            "limit": IMAGES_PER_REQUEST,
+            "limit": per_request,
             "page": page,
             "order": "DESC"
-        }
-
-        resp = requests.get(
-            f"{BASE_URL}/images/search",
-            params=params
-        )
-
+        })
         if resp.status_code != 200:
             print(f"  ⚠️ API error on page {page}")
-            break
-
+            return
         images = resp.json()
         if not images:
             print("  ⚠️ No more images available")
-            break
-
-        for img_data in images:
-            if downloaded >= IMAGES_PER_BREED:
+            return
+        for img in images:
+            if img["url"] not in seen:
+                seen.add(img["url"])
+                yield img["url"]
+        page += 1
+        time.sleep(delay)
+
+
+def download_cat_images(downloader, session, base_url: str = CAT_API_URL, breeds=CAT_BREEDS,
+                        per_breed: int = IMAGES_PER_BREED, per_request: int = IMAGES_PER_REQUEST,
+                        delay: float = CAT_PAGE_DELAY_S) -> dict:
+    """Descarga hasta ``per_breed`` imágenes guardadas de cada raza de gato.
+
+    El límite cuenta imágenes en disco, no URLs listadas: se listan tantas
+    como falten, se descargan y, si alguna falla, se listan más hasta
+    completar la raza o agotar la API.
+    """
+    totals = {"saved": 0, "skipped": 0, "failed": 0}
+    for breed_name, breed_id in breeds.items():
+        stream = cat_image_urls(session, breed_id, base_url, per_request, delay)
+        legacy = legacy_files(downloader.root / breed_name)
+        if legacy:
+            # El script anterior guardaba en <n>.png la n-ésima imagen guardada de la raza, en el orden de la API
+            urls = list(itertools.islice(stream, max(legacy)))
+            adopt_legacy_files(downloader.manifest, breed_name, dict(enumerate(urls, start=1)))
+        else:
+            urls = []
+
+        have = 0
+        while have < per_breed:
+            wanted = per_breed - have
+            batch, urls = urls[:wanted], urls[wanted:]
+            batch += itertools.islice(stream, wanted - len(batch))
+            if not batch:
                 break
+            # Las ya adoptadas o descargadas cuentan como guardadas; de las demás, solo las que salgan bien
+            stats = downloader.run((url, image_path(breed_name, url)) for url in batch)
+            have += stats["saved"] + stats["skipped"]
+            for key in totals:
+                totals[key] += stats[key]
+        print(f"🐾 {have} images for {breed_name} ({breed_id})")
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Descarga (o completa) el dataset de perros y gatos')
+    parser.add_argument('--dest', type=Path, default=DATASET_DIR)
+    parser.add_argument('--workers', type=int, default=DOWNLOAD_WORKERS, help='Descargas simultáneas')
+    parser.add_argument('--processes', type=int, default=None,
+                        help='Procesos para decodificar y guardar los PNG (por defecto, uno por núcleo)')
+    parser.add_argument('--verify', action='store_true',
+                        help='Comprueba el SHA-256 de los ficheros ya descargados en lugar de solo su tamaño')
+    args = parser.parse_args()
+
+    session = make_session(args.workers)
+    downloader = Downloader(args.dest, session=session, workers=args.workers, processes=args.processes,
+                            verify=args.verify)
+    start = time.perf_counter()
+    listings = list_dog_images(session)
+    print(f"Total dog images listed: {sum(len(urls) for _, urls in listings)}")
+    dogs = download_dog_images(downloader, listings)
+    cats = download_cat_images(downloader, session)
+    stats = {key: dogs[key] + cats[key] for key in dogs}
+    print(f"✅ Dataset download complete! saved={stats['saved']} skipped={stats['skipped']} "
+          f"failed={stats['failed']} in {time.perf_counter() - start:.1f}s")
 
-            img_url = img_data["url"]
-
-            try:
-                img_resp = requests.get(img_url, timeout=10)
-                if img_resp.status_code != 200:
-                    continue
-
-                arr = np.asarray(bytearray(img_resp.content), dtype=np.uint8)
-                img = cv2.imdecode(arr, cv2.IMREAD_COLOR)
-
-                if img is None:
-                    continue
 
-                save_path = breed_dir / f"{downloaded + 1}.png"
-                cv2.imwrite(str(save_path), img)
-
-                downloaded += 1
-                print(f"    Saved {save_path}")
-
-            except Exception as e:
-                print(f"    Failed {img_url}: {e}")
-
-        page += 1
-        time.sleep(0.25) 
-
-print("✅ Dataset download complete!")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
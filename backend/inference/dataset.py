@@ -1,15 +1,17 @@
 from pathlib import Path
 
 import pandas as pd
-import cv2
 import torch
 from torch.utils.data import Dataset
-import numpy as np
+
+from backend.inference.preprocessing import IMAGE_SIZE, decode_image, to_tensor
 
 class PetDataset(Dataset):
-    def __init__(self, df: pd.DataFrame, dataset_path: str | Path, partition: str, transform: torch.nn.Module | None = None):
+    def __init__(self, df: pd.DataFrame, dataset_path: str | Path, partition: str, transform: torch.nn.Module | None = None,
+                 image_size: tuple[int, int] | None = IMAGE_SIZE):
         self.dataset_path = Path(dataset_path)
         self.partition = partition
+        self.image_size = image_size
 
         self.class_name_to_idx: dict[str, int] = {class_name: idx_class_name
                                                   for idx_class_name, class_name in enumerate(df['class'].sort_values().unique().tolist())}
@@ -22,9 +24,7 @@ class PetDataset(Dataset):
     def __getitem__(self, idx_item: int) -> tuple[torch.Tensor, int]:
        data_item = self.df.iloc[idx_item]
 
-       image = cv2.imread(self.dataset_path / data_item['path'], cv2.IMREAD_COLOR_RGB).transpose(2, 0, 1).astype(np.float32)
-       image /= 255
-       image = torch.from_numpy(image).to(torch.get_default_dtype())
+       image = to_tensor(decode_image(self.dataset_path / data_item['path'], size=self.image_size))
 
        if self.transform:
            image = self.transform(image)
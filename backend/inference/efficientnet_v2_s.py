@@ -1,5 +1,6 @@
 from math import ceil
 
+import torch
 from torch import nn
 from torchvision.models.efficientnet import efficientnet_v2_s
 
@@ -12,6 +13,18 @@ class EfficientNetV2(nn.Module):
             nn.Dropout(p=0.1),
             nn.Linear(in_features=1000, out_features=num_classes)
         )
+
+    def forward_features(self, x):
+        # Salida del average pooling de EfficientNetV2 (EMBEDDING_DIM en model.py), antes de los clasificadores
+        x = self.net.avgpool(self.net.features(x))
+        return torch.flatten(x, 1)
+
+    def classify(self, features):
+        return self.head(self.net.classifier(features))
+
+    def forward_with_embedding(self, x):
+        features = self.forward_features(x)
+        return self.classify(features), features
+
     def forward(self, x):
-        x = self.net(x)
-        return  self.head(x)
\ No newline at end of file
+        return self.classify(self.forward_features(x))
@@ -0,0 +1,120 @@
+from pathlib import Path
+
+import numpy as np
+import torch
+from torch import nn
+
+from backend.inference.efficientnet_v2_s import EfficientNetV2
+
+MODELS_PATH = Path(__file__).parent / 'models'
+NUM_CLASSES = 18
+
+# Ficheros que genera export_model.py para cada motor (``compile`` se construye al cargar)
+ENGINE_FILES = {
+    "eager": "best.pth",
+    "torchscript": "best.torchscript.pt",
+    "compile": "best.pth",
+    "int8": "best.int8.pt",
+    "onnx": "best.onnx",
+}
+
+
+class EmbeddingModel(nn.Module):
+    """Envoltorio exportable que devuelve ``(logits, embedding)`` en una sola salida."""
+
+    def __init__(self, model: EfficientNetV2):
+        super().__init__()
+        self.model = model
+        self.train(model.training)
+
+    def forward(self, x):
+        return self.model.forward_with_embedding(x)
+
+
+class Engine:
+    """Interfaz común de los motores para ``predict``/``predict_batch``.
+
+    Se comporta como el modelo eager: ``engine(batch)`` devuelve los logits
+    y ``forward_with_embedding(batch)`` los logits y el embedding.
+    """
+
+    def __init__(self, name, run, module=None):
+        self.name = name
+        self._run = run
+        self._module = module
+
+    def forward_with_embedding(self, x):
+        return self._run(x)
+
+    def __call__(self, x):
+        return self._run(x)[0]
+
+    # predict() llama a eval()/to() como con un nn.Module; el motor ya está preparado
+    def eval(self):
+        return self
+
+    def to(self, device):
+        return self
+
+    def share_memory(self):
+        # Pesos en memoria compartida para los workers de serve.py (ONNX Runtime gestiona los suyos)
+        if self._module is not None:
+            self._module.share_memory()
+        return self
+
+
+def load_eager(path: str | Path = MODELS_PATH / ENGINE_FILES["eager"], device="cpu") -> EfficientNetV2:
+    model = EfficientNetV2(num_classes=NUM_CLASSES)
+    model.load_state_dict(torch.load(path, map_location=device))
+    model.to(device)
+    model.eval()
+    return model
+
+
+def quantize_int8(model: EfficientNetV2) -> nn.Module:
+    # La cuantización dinámica solo cubre capas Linear (clasificador y cabeza); las convoluciones siguen en fp32
+    return torch.ao.quantization.quantize_dynamic(EmbeddingModel(model), {nn.Linear}, dtype=torch.qint8)
+
+
+def _onnx_session(path, device):
+    try:
+        import onnxruntime
+    except ImportError as e:
+        raise RuntimeError("El motor 'onnx' requiere onnxruntime (pip install petracker[onnx])") from e
+    providers = ["CUDAExecutionProvider"] if str(device).startswith("cuda") else []
+    sessions = []
+
+    def run(x):
+        # La sesión se crea en el primer uso: sus hilos no sobreviven a un fork (serve.py)
+        if not sessions:
+            sessions.append(onnxruntime.InferenceSession(str(path), providers=providers + ["CPUExecutionProvider"]))
+        logits, embedding = sessions[0].run(None, {"input": x.detach().cpu().numpy().astype(np.float32)})
+        return torch.from_numpy(logits), torch.from_numpy(embedding)
+    return run
+
+
+def load_engine(name: str = "eager", models_path: str | Path = MODELS_PATH, device="cpu"):
+    """Carga el motor ``name`` desde los ficheros de ``models_path``.
+
+    ``eager`` devuelve el ``EfficientNetV2`` de siempre; el resto devuelve
+    un ``Engine`` con la misma interfaz para ``predict``.
+    """
+    if name not in ENGINE_FILES:
+        raise ValueError(f"Unknown inference engine: {name}")
+    path = Path(models_path) / ENGINE_FILES[name]
+    if not path.exists():
+        raise FileNotFoundError(f"No se encontró '{path}'. Ejecuta backend/inference/export_model.py")
+
+    if name == "eager":
+        return load_eager(path, device)
+    if name == "compile":
+        module = EmbeddingModel(load_eager(path, device))
+        return Engine(name, torch.compile(module), module)
+    if name == "torchscript":
+        module = torch.jit.load(path, map_location=device)
+        return Engine(name, module, module)
+    if name == "int8":
+        # Los módulos cuantizados dinámicamente solo se ejecutan en CPU
+        module = torch.jit.load(path, map_location="cpu")
+        return Engine(name, lambda x: module(x.cpu()), module)
+    return Engine(name, _onnx_session(path, device))
@@ -0,0 +1,51 @@
+import argparse
+from pathlib import Path
+
+import torch
+
+from backend.inference.engines import ENGINE_FILES, MODELS_PATH, EmbeddingModel, load_eager, quantize_int8
+from backend.inference.preprocessing import IMAGE_SIZE
+
+
+def export_torchscript(model, example, output_path):
+    traced = torch.jit.trace(EmbeddingModel(model), example)
+    torch.jit.save(torch.jit.freeze(traced), output_path)
+
+
+def export_int8(model, example, output_path):
+    traced = torch.jit.trace(quantize_int8(model), example)
+    torch.jit.save(traced, output_path)
+
+
+def export_onnx(model, example, output_path):
+    torch.onnx.export(
+        EmbeddingModel(model), example, output_path,
+        input_names=["input"],
+        output_names=["logits", "embedding"],
+        dynamic_axes={"input": {0: "batch"}, "logits": {0: "batch"}, "embedding": {0: "batch"}},
+        opset_version=17,
+        dynamo=False
+    )
+
+
+EXPORTERS = {
+    "torchscript": export_torchscript,
+    "int8": export_int8,
+    "onnx": export_onnx,
+}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Exporta best.pth a TorchScript, int8 dinámico y ONNX')
+    parser.add_argument('--models-path', type=Path, default=MODELS_PATH)
+    parser.add_argument('--engines', nargs='+', choices=list(EXPORTERS), default=list(EXPORTERS))
+    args = parser.parse_args()
+
+    model = load_eager(args.models_path / ENGINE_FILES["eager"], device='cpu')
+    example = torch.rand(1, 3, *IMAGE_SIZE)
+    with torch.inference_mode():
+        for engine in args.engines:
+            output_path = args.models_path / ENGINE_FILES[engine]
+            EXPORTERS[engine](model, example, output_path)
+            print(f'[EXPORT] {engine}: {output_path}')
+    # torch.compile no se serializa: el motor 'compile' compila best.pth al cargarlo
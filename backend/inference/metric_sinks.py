@@ -0,0 +1,192 @@
+import abc
+import argparse
+import csv
+import json
+import multiprocessing as mp
+import queue
+import threading
+from pathlib import Path
+
+METRICS_JSONL = 'metrics.jsonl'
+METRICS_CSV = 'metrics.csv'
+# Curvas que dibuja plot_metrics: fichero -> (título, eje y, clave de train, clave de val)
+CURVES = {
+    'loss_curve.png': ('Training and validation loss curve', 'Loss', 'train_loss', 'val_loss'),
+    'acc_curve.png': ('Training and validation accuracy curve', 'Accuracy', 'train_acc', 'val_acc'),
+}
+
+
+class MetricSink(abc.ABC):
+    """Destino de las métricas de cada época. ``write`` recibe un dict de escalares.
+
+    Se llama siempre desde el hilo de ``AsyncMetricsWriter``, nunca desde el
+    bucle de entrenamiento, así que puede hacer E/S lenta (ficheros, red...).
+    Un sink sin ``write`` falla al crearlo, no dentro de ese hilo.
+    """
+
+    @abc.abstractmethod
+    def write(self, record: dict):
+        ...
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.flush()
+
+
+class JSONLSink(MetricSink):
+    """Una línea JSON por época, añadida al final (una ejecución reanudada sigue el mismo fichero)."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def write(self, record: dict):
+        self._file.write(json.dumps(record) + '\n')
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class CSVSink(MetricSink):
+    """CSV con las columnas del primer registro (o las de la cabecera si el fichero ya existe)."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fields = None
+        if self.path.exists() and self.path.stat().st_size:
+            with open(self.path, newline='', encoding='utf-8') as f:
+                fields = next(csv.reader(f), None)
+        self._file = open(self.path, 'a', newline='', encoding='utf-8')
+        self._writer = csv.DictWriter(self._file, fieldnames=fields, extrasaction='ignore') if fields else None
+
+    def write(self, record: dict):
+        if self._writer is None:
+            self._writer = csv.DictWriter(self._file, fieldnames=list(record), extrasaction='ignore')
+            self._writer.writeheader()
+        self._writer.writerow(record)
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class AsyncMetricsWriter:
+    """Pasa los registros de ``log`` a los ``sinks`` en un hilo en segundo plano.
+
+    ``log`` solo encola (nunca espera a la E/S). El hilo escribe lo que
+    haya en la cola y hace ``flush`` de los sinks cuando la vacía, así que
+    tras un corte solo se pierden las épocas aún no escritas. Un error en
+    un sink se registra una vez y no detiene el entrenamiento.
+    """
+
+    def __init__(self, sinks: list[MetricSink]):
+        self.sinks = list(sinks)
+        self._queue = queue.Queue()
+        self._failed = set()
+        self._thread = threading.Thread(target=self._run, name='metrics-writer', daemon=True)
+        self._thread.start()
+
+    def log(self, record: dict):
+        self._queue.put(dict(record))
+
+    def _call(self, sink, method: str, *args):
+        if sink in self._failed:
+            return
+        try:
+            getattr(sink, method)(*args)
+        except Exception as e:
+            self._failed.add(sink)
+            print(f'[METRICS] {type(sink).__name__} disabled: {e}')
+
+    def _run(self):
+        while True:
+            record = self._queue.get()
+            if record is not None:
+                for sink in self.sinks:
+                    self._call(sink, 'write', record)
+            if record is None or self._queue.empty():
+                for sink in self.sinks:
+                    self._call(sink, 'flush')
+            self._queue.task_done()
+            if record is None:
+                return
+
+    def flush(self):
+        """Espera a que se haya escrito todo lo encolado."""
+        self._queue.join()
+
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        for sink in self.sinks:
+            self._call(sink, 'close')
+
+
+def load_metrics(path: str | Path) -> list[dict]:
+    """Registros de un ``metrics.jsonl``; si una época se repite (ejecución reanudada), vale la última."""
+    records = {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            records[record['epoch']] = record
+    return [records[epoch] for epoch in sorted(records)]
+
+
+def plot_metrics(records: list[dict] | str | Path, output_dir: str | Path | None = None) -> list[Path]:
+    """Dibuja ``CURVES`` a partir de los registros o de un ``metrics.jsonl``. matplotlib solo se importa aquí."""
+    import matplotlib
+    matplotlib.use('Agg')
+    from matplotlib import pyplot as plt
+
+    if isinstance(records, (str, Path)):
+        output_dir = output_dir or Path(records).parent
+        records = load_metrics(records)
+    output_dir = Path(output_dir)
+    epochs = [record['epoch'] for record in records]
+    plt.style.use('ggplot')
+
+    written = []
+    for name, (title, ylabel, train_key, val_key) in CURVES.items():
+        plt.figure(figsize=(10,7))
+        plt.title(title)
+        plt.plot(epochs, [r[train_key] for r in records], label='Training', marker='o', markevery=[-1], color='red')
+        plt.plot(epochs, [r[val_key] for r in records], label='Validation', marker='o', markevery=[-1], color='blue')
+        plt.xlabel('Epoch')
+        plt.ylabel(ylabel)
+        plt.legend()
+        plt.tight_layout()
+        plt.savefig(output_dir / name)
+        plt.close()
+        written.append(output_dir / name)
+    return written
+
+
+def plot_metrics_async(records: list[dict] | str | Path, output_dir: str | Path | None = None) -> mp.Process:
+    """``plot_metrics`` en otro proceso (``spawn``: no hereda los hilos ni la memoria del entrenamiento)."""
+    process = mp.get_context('spawn').Process(target=plot_metrics, args=(records, output_dir), name='plot-metrics')
+    process.start()
+    return process
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Dibuja las curvas de entrenamiento de un metrics.jsonl')
+    parser.add_argument('metrics', type=Path, help='metrics.jsonl o la carpeta del modelo que lo contiene')
+    parser.add_argument('--out', type=Path, default=None)
+    args = parser.parse_args()
+
+    path = args.metrics / METRICS_JSONL if args.metrics.is_dir() else args.metrics
+    for png in plot_metrics(path, args.out):
+        print(f'[METRICS] {png}')
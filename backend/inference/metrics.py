@@ -1,2 +1,3 @@
 def acc_fn(y_preds, y_true):
-    return len(y_preds[y_preds == y_true]) / len(y_preds)
\ No newline at end of file
+    # Tensor 0-d en el dispositivo de las predicciones: no fuerza una sincronización por lote
+    return (y_preds == y_true).float().mean()
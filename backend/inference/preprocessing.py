@@ -0,0 +1,109 @@
+from pathlib import Path
+
+import cv2
+import numpy as np
+import torch
+
+IMAGE_SIZE = (224, 224)
+
+_JPEG_REDUCED_FLAGS = {
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+}
+# Marcadores SOF con las dimensiones de la imagen (se excluyen DHT, JPG y DAC)
+_JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def read_image_size(buffer) -> tuple[int, int] | None:
+    """Devuelve (alto, ancho) leyendo solo la cabecera JPEG/PNG, sin decodificar."""
+    data = memoryview(buffer)
+    if data[:8] == b'\x89PNG\r\n\x1a\n' and len(data) >= 24:
+        width = int.from_bytes(data[16:20], 'big')
+        height = int.from_bytes(data[20:24], 'big')
+        return height, width
+
+    if data[:2] != b'\xff\xd8':
+        return None
+    pos = 2
+    while pos + 4 <= len(data):
+        if data[pos] != 0xFF:
+            return None
+        marker = data[pos + 1]
+        if marker == 0xFF:
+            pos += 1
+            continue
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+            pos += 2
+            continue
+        length = int.from_bytes(data[pos + 2:pos + 4], 'big')
+        if marker in _JPEG_SOF_MARKERS and pos + 9 <= len(data):
+            height = int.from_bytes(data[pos + 5:pos + 7], 'big')
+            width = int.from_bytes(data[pos + 7:pos + 9], 'big')
+            return height, width
+        pos += 2 + length
+    return None
+
+
+def _reduced_decode_flag(buffer, size: tuple[int, int]) -> int | None:
+    if memoryview(buffer)[:2] != b'\xff\xd8':
+        return None
+    shape = read_image_size(buffer)
+    if shape is None:
+        return None
+    height, width = shape
+    for factor, flag in _JPEG_REDUCED_FLAGS.items():
+        if height // factor >= size[0] and width // factor >= size[1]:
+            return flag
+    return None
+
+
+def decode_image(source: str | Path | bytes | bytearray | memoryview | np.ndarray,
+                 size: tuple[int, int] | None = IMAGE_SIZE,
+                 center_crop: bool = False) -> np.ndarray | None:
+    """Decodifica una imagen a RGB uint8 (H, W, C) redimensionada a ``size``.
+
+    Para JPEG se usa la decodificación reducida de libjpeg (1/2, 1/4, 1/8)
+    cuando la imagen es suficientemente grande, de modo que nunca se
+    materializa la resolución original completa.
+    """
+    if isinstance(source, (str, Path)):
+        buffer = np.fromfile(str(source), dtype=np.uint8)
+    else:
+        buffer = np.frombuffer(source, dtype=np.uint8)
+    if buffer.size == 0:
+        return None
+
+    flag = _reduced_decode_flag(buffer, size) if size is not None else None
+    image = cv2.imdecode(buffer, flag if flag is not None else cv2.IMREAD_COLOR)
+    if image is None:
+        return None
+    image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
+    if size is None:
+        return image
+
+    if center_crop:
+        height, width = image.shape[:2]
+        scale = max(size[0] / height, size[1] / width)
+        image = cv2.resize(image, (max(size[1], round(width * scale)), max(size[0], round(height * scale))),
+                           interpolation=cv2.INTER_AREA)
+        top = (image.shape[0] - size[0]) // 2
+        left = (image.shape[1] - size[1]) // 2
+        return image[top:top + size[0], left:left + size[1]]
+
+    # Mismo redimensionado sin conservar proporción que v2.Resize en el entrenamiento
+    return cv2.resize(image, (size[1], size[0]), interpolation=cv2.INTER_AREA)
+
+
+def to_tensor(image: np.ndarray) -> torch.Tensor:
+    """RGB uint8 (H, W, C) -> float (C, H, W) en [0, 1]."""
+    tensor = torch.from_numpy(np.ascontiguousarray(image.transpose(2, 0, 1)))
+    return tensor.to(torch.get_default_dtype()).div_(255)
+
+
+def preprocess(source, size: tuple[int, int] | None = IMAGE_SIZE, center_crop: bool = False) -> torch.Tensor | None:
+    image = decode_image(source, size=size, center_crop=center_crop)
+    if image is None:
+        return None
+    return to_tensor(image)
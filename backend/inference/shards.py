@@ -0,0 +1,189 @@
+import argparse
+import bisect
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import torch
+from torch.utils.data import Dataset
+
+from backend.inference.preprocessing import IMAGE_SIZE, decode_image, to_tensor
+
+# Imágenes por fichero de shard (224x224x3 uint8: ~300 MB)
+SHARD_SIZE = 2048
+INDEX_NAME = "index.json"
+SHARDS_VERSION = 1
+
+
+def dataset_digest(df: pd.DataFrame, image_size: tuple[int, int]) -> str:
+    """Huella del CSV (rutas, particiones y clases) y del tamaño: si cambia, hay que recompilar."""
+    rows = df[['path', 'partition', 'class']].astype(str).to_csv(index=False)
+    return hashlib.sha256(f"{SHARDS_VERSION}|{image_size}|{rows}".encode()).hexdigest()
+
+
+def _decode(path: str, size: tuple[int, int]) -> np.ndarray:
+    image = decode_image(path, size=size)
+    if image is None:
+        raise ValueError(f"No se pudo decodificar {path}")
+    return image
+
+
+def _write_atomic_npy(path: Path, array: np.ndarray):
+    tmp_path = path.with_name(f".tmp-{path.name}")
+    np.save(tmp_path, array)
+    os.replace(tmp_path, path)
+
+
+def compile_shards(df: pd.DataFrame, dataset_path: str | Path, output_dir: str | Path,
+                   image_size: tuple[int, int] = IMAGE_SIZE, shard_size: int = SHARD_SIZE,
+                   workers: int | None = None) -> dict:
+    """Decodifica una vez cada imagen del CSV a ``image_size`` y la guarda en shards ``.npy`` uint8.
+
+    Cada partición se escribe en ``<partición>-NNNNN.npy`` de forma
+    ``(N, H, W, 3)`` (el mismo redimensionado que ``PetDataset``) y sus
+    etiquetas en ``<partición>-labels.npy``. ``index.json`` se escribe el
+    último: sin él, la compilación no terminó. Devuelve el índice.
+    """
+    dataset_path = Path(dataset_path)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    classes = df['class'].sort_values().unique().tolist()
+    class_name_to_idx = {class_name: idx for idx, class_name in enumerate(classes)}
+
+    index = {"version": SHARDS_VERSION, "digest": dataset_digest(df, image_size), "image_size": list(image_size),
+             "classes": classes, "partitions": {}}
+    decode = partial(_decode, size=tuple(image_size))
+    with ProcessPoolExecutor(workers) as pool:
+        for partition, part_df in df.groupby('partition', sort=True):
+            paths = [str(dataset_path / path) for path in part_df['path']]
+            labels = part_df['class'].map(class_name_to_idx).to_numpy(dtype=np.int64)
+            _write_atomic_npy(output_dir / f"{partition}-labels.npy", labels)
+
+            shards = []
+            for start in range(0, len(paths), shard_size):
+                chunk = paths[start:start + shard_size]
+                name = f"{partition}-{len(shards):05d}.npy"
+                tmp_path = output_dir / f".tmp-{name}"
+                # Se escribe directamente en el fichero mapeado: el shard nunca está entero en memoria
+                shard = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.uint8,
+                                                  shape=(len(chunk), *image_size, 3))
+                for i, image in enumerate(pool.map(decode, chunk, chunksize=32)):
+                    shard[i] = image
+                shard.flush()
+                del shard
+                os.replace(tmp_path, output_dir / name)
+                shards.append({"file": name, "count": len(chunk)})
+            index["partitions"][partition] = {"labels": f"{partition}-labels.npy", "shards": shards}
+
+    with open(output_dir / f".tmp-{INDEX_NAME}", "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2)
+    os.replace(output_dir / f".tmp-{INDEX_NAME}", output_dir / INDEX_NAME)
+    # Shards de una compilación anterior que ya no están en el índice (particiones que desaparecen)
+    current = {part["labels"] for part in index["partitions"].values()}
+    current |= {shard["file"] for part in index["partitions"].values() for shard in part["shards"]}
+    for path in output_dir.glob("*.npy"):
+        if path.name not in current:
+            path.unlink()
+    return index
+
+
+def load_index(shards_dir: str | Path) -> dict | None:
+    path = Path(shards_dir) / INDEX_NAME
+    if not path.exists():
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def ensure_shards(df: pd.DataFrame, dataset_path: str | Path, shards_dir: str | Path,
+                  image_size: tuple[int, int] = IMAGE_SIZE, workers: int | None = None) -> dict:
+    """Índice de los shards de ``df``; los compila si no existen o el CSV ha cambiado."""
+    index = load_index(shards_dir)
+    if index is not None and index["digest"] == dataset_digest(df, image_size):
+        return index
+    print(f'[SHARDS] Compiling {len(df)} images into {shards_dir} ...')
+    start = time.perf_counter()
+    index = compile_shards(df, dataset_path, shards_dir, image_size=image_size, workers=workers)
+    print(f'[SHARDS] Done in {time.perf_counter() - start:.1f}s')
+    return index
+
+
+class ShardedPetDataset(Dataset):
+    """``PetDataset`` sobre shards compilados: cada muestra es un slice de un ``.npy`` mapeado en memoria.
+
+    No decodifica ni redimensiona nada; la página del shard se lee de la
+    caché del sistema sin copias intermedias y solo se convierte a float.
+    Los mapas se abren en cada proceso del ``DataLoader`` al primer acceso
+    (un ``memmap`` no debe viajar serializado a los workers).
+    Con ``uint8=True`` devuelve la vista HWC sin convertir, para juntarla
+    con ``collate_uint8`` y aumentarla por lotes (``augmentation.py``).
+    """
+
+    def __init__(self, shards_dir: str | Path, partition: str, transform: torch.nn.Module | None = None,
+                 uint8: bool = False):
+        self.shards_dir = Path(shards_dir)
+        self.partition = partition
+        self.transform = transform
+        self.uint8 = uint8
+
+        index = load_index(self.shards_dir)
+        if index is None:
+            raise FileNotFoundError(f"No hay shards compilados en {self.shards_dir}")
+        self.image_size = tuple(index["image_size"])
+        self.class_name_to_idx: dict[str, int] = {class_name: idx for idx, class_name in enumerate(index["classes"])}
+        self.class_idx_to_name: dict[int, str] = {idx: class_name for class_name, idx in self.class_name_to_idx.items()}
+
+        part = index["partitions"].get(partition, {"labels": None, "shards": []})
+        self.labels = np.load(self.shards_dir / part["labels"]) if part["labels"] else np.empty(0, dtype=np.int64)
+        self.shard_files = [self.shards_dir / shard["file"] for shard in part["shards"]]
+        # Primer índice global de cada shard, para localizar una muestra con bisect
+        self.offsets = np.cumsum([0] + [shard["count"] for shard in part["shards"]])[:-1].tolist()
+        self._shards = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_shards"] = None
+        return state
+
+    def shard_item(self, idx_item: int) -> np.ndarray:
+        if self._shards is None:
+            self._shards = [np.load(path, mmap_mode='r') for path in self.shard_files]
+        shard_idx = bisect.bisect_right(self.offsets, idx_item) - 1
+        return self._shards[shard_idx][idx_item - self.offsets[shard_idx]]
+
+    def __getitem__(self, idx_item: int) -> tuple[torch.Tensor | np.ndarray, int]:
+        if self.uint8:
+            # Vista HWC del shard: collate_uint8 la copia al lote y el aumento se hace por lotes
+            return self.shard_item(idx_item), int(self.labels[idx_item])
+
+        image = to_tensor(self.shard_item(idx_item))
+
+        if self.transform:
+            image = self.transform(image)
+
+        return image, int(self.labels[idx_item])
+
+    def __len__(self):
+        return len(self.labels)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compila el dataset de data.csv en shards uint8 ya redimensionados')
+    parser.add_argument('--data', type=Path, default=Path(__file__).parent / 'data')
+    parser.add_argument('--out', type=Path, default=None, help='Por defecto, <data>/shards')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--force', action='store_true', help='Recompila aunque el CSV no haya cambiado')
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.data / 'data.csv')
+    out = args.out or args.data / 'shards'
+    if args.force:
+        compile_shards(df, args.data, out, workers=args.workers)
+    else:
+        ensure_shards(df, args.data, out, workers=args.workers)
@@ -1,21 +1,40 @@
+import argparse
 import os
 from pathlib import Path
 
 import pandas as pd
 import torch
-from torchvision.transforms import v2
 from torch import nn
 from torch.utils.data import DataLoader
 
-from backend.inference.dataset import PetDataset
+from backend.inference.augmentation import BatchAugment, EvalTransform, collate_uint8
+from backend.inference.shards import ShardedPetDataset, ensure_shards
 from backend.inference.trainer import Trainer
 from backend.inference.efficientnet_v2_s import EfficientNetV2
 from backend.inference.metrics import acc_fn
 
 
+AMP_DTYPES = {'none': None, 'bf16': torch.bfloat16, 'fp16': torch.float16}
+
+
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Entrena EfficientNetV2 sobre el dataset de data.csv')
+    parser.add_argument('--epochs', type=int, default=100)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--amp', choices=AMP_DTYPES, default='none',
+                        help='Autocast: bf16 (CPU o GPU) o fp16 (GPU)')
+    parser.add_argument('--channels-last', action='store_true')
+    parser.add_argument('--compile', action='store_true')
+    parser.add_argument('--grad-accumulation', type=int, default=1,
+                        help='Lotes por paso del optimizador (lote efectivo = batch-size * N)')
+    parser.add_argument('--resume', action='store_true', help='Continúa desde models/EfficientNetV2/last.pt')
+    parser.add_argument('--checkpoint-every', type=int, default=1, help='Épocas entre checkpoints completos')
+    parser.add_argument('--patience', type=int, default=None,
+                        help='Épocas sin mejorar val_loss antes de parar (por defecto, nunca)')
+    parser.add_argument('--scheduler', choices=['none', 'cosine', 'plateau'], default='none')
+    args = parser.parse_args()
 
-    BATCH_SIZE = 32
+    BATCH_SIZE = args.batch_size
 
     device = 'cuda' if torch.cuda.is_available() else 'cpu'
 
@@ -24,33 +43,34 @@ if __name__ == '__main__':
     csv_path = data_path / 'data.csv'
     df = pd.read_csv(csv_path)
 
-    transforms = v2.Compose(
-        [
-            v2.Resize((224, 224)),
-            v2.RandomHorizontalFlip(),
-            v2.RandomVerticalFlip(),
-            v2.ColorJitter(
-                brightness=0.1,
-                contrast=0.1,
-                saturation=0.05,
-                hue=0.02
-            )
-        ]
-    )
-        
-    train_data = PetDataset(df, data_path, 'train', transform=transforms)
-    val_data = PetDataset(df, data_path, 'val', transform=transforms)
-
-    train_dataloader = DataLoader(dataset=train_data, batch_size=BATCH_SIZE, shuffle=True, num_workers=os.cpu_count())
-    val_dataloader = DataLoader(dataset=val_data, batch_size=BATCH_SIZE, shuffle=True, num_workers=os.cpu_count())
-              
+    # Las imágenes se decodifican una sola vez a shards uint8 (se recompilan si cambia data.csv)
+    shards_path = data_path / 'shards'
+    ensure_shards(df, data_path, shards_path)
+    # Los workers solo juntan lotes uint8; el aumento se hace por lotes en el dispositivo
+    train_data = ShardedPetDataset(shards_path, 'train', uint8=True)
+    val_data = ShardedPetDataset(shards_path, 'val', uint8=True)
+
+    train_dataloader = DataLoader(dataset=train_data, batch_size=BATCH_SIZE, shuffle=True, num_workers=os.cpu_count(),
+                                  collate_fn=collate_uint8, pin_memory=device == 'cuda')
+    val_dataloader = DataLoader(dataset=val_data, batch_size=BATCH_SIZE, shuffle=False, num_workers=os.cpu_count(),
+                                collate_fn=collate_uint8, pin_memory=device == 'cuda')
+
+    # Validación determinista: sin volteos ni jitter
+    train_transform = BatchAugment(hflip=0.5, vflip=0.5, brightness=0.1, contrast=0.1, saturation=0.05, hue=0.02)
+    eval_transform = EvalTransform()
+
     model = EfficientNetV2(num_classes=len(train_data.class_name_to_idx))
 
     loss_fn = nn.CrossEntropyLoss()
     optim = torch.optim.Adam(model.parameters(), lr=0.001)
+    schedulers = {
+        'none': lambda: None,
+        'cosine': lambda: torch.optim.lr_scheduler.CosineAnnealingLR(optim, T_max=args.epochs),
+        'plateau': lambda: torch.optim.lr_scheduler.ReduceLROnPlateau(optim, factor=0.5, patience=3),
+    }
     model_path = Path(__file__).parent / 'models'
     model_path.mkdir(parents=True, exist_ok=True)
-    trainer = Trainer(epochs=100,
+    trainer = Trainer(epochs=args.epochs,
                       model=model,
                       model_name='EfficientNetV2',
                       train_dataloader=train_dataloader,
@@ -59,5 +79,14 @@ if __name__ == '__main__':
                       output_path=model_path,
                       loss_fn=loss_fn,
                       acc_fn=acc_fn,
-                      device=device)        
-    trainer.train()
\ No newline at end of file
+                      device=device,
+                      train_transform=train_transform,
+                      eval_transform=eval_transform,
+                      amp_dtype=AMP_DTYPES[args.amp],
+                      channels_last=args.channels_last,
+                      compile_model=args.compile,
+                      grad_accumulation=args.grad_accumulation,
+                      scheduler=schedulers[args.scheduler](),
+                      checkpoint_every=args.checkpoint_every,
+                      patience=args.patience)
+    trainer.train(resume=args.resume)
\ No newline at end of file
@@ -1,13 +1,53 @@
+import os
+import random
 from pathlib import Path
 
 from tqdm import tqdm
 
-from matplotlib import pyplot as plt
 import torch
 from torch import nn
 import numpy as np
 
+from backend.inference.metric_sinks import METRICS_CSV, METRICS_JSONL, AsyncMetricsWriter, CSVSink, JSONLSink, \
+    plot_metrics_async
+
+# Estado completo del entrenamiento (modelo, optimizador, scheduler, época, RNG...) para reanudar
+CHECKPOINT_NAME = 'last.pt'
+
+
+def _atomic_save(obj, path: Path):
+    # Un corte a mitad de escritura deja el fichero anterior intacto
+    tmp_path = path.with_name(f'.tmp-{path.name}')
+    torch.save(obj, tmp_path)
+    os.replace(tmp_path, path)
+
+
 class Trainer:
+    """Bucle de entrenamiento y validación con modos opcionales para máquinas pequeñas.
+
+    - ``amp_dtype``: autocast a ``torch.bfloat16`` (CPU o GPU) o
+      ``torch.float16`` (GPU, con ``GradScaler``).
+    - ``channels_last``: modelo y lotes en formato NHWC, más rápido en las
+      convoluciones de oneDNN y de los tensor cores.
+    - ``compile_model``: pasos con ``torch.compile`` (el primero paga la compilación).
+    - ``grad_accumulation``: acumula gradientes de ``k`` lotes por paso del
+      optimizador, para un lote efectivo ``k`` veces mayor.
+
+    La pérdida y la exactitud se acumulan en el dispositivo y solo se leen
+    al final de cada época: no hay una sincronización por lote.
+
+    Cada ``checkpoint_every`` épocas se guarda ``last.pt`` con todo el
+    estado para ``train(resume=True)``. ``scheduler`` se avanza al final de
+    cada época (con la pérdida de validación si es ``ReduceLROnPlateau``) y
+    ``patience`` detiene el entrenamiento tras ese número de épocas sin
+    mejorar la validación en más de ``min_delta``.
+
+    Las métricas de cada época van a ``metric_sinks`` (por defecto
+    ``metrics.jsonl`` y ``metrics.csv``) desde un hilo en segundo plano, y
+    las curvas se dibujan al terminar en otro proceso (``plot_curves``), o
+    bajo demanda con ``python -m backend.inference.metric_sinks``.
+    """
+
     def __init__(self, 
                  epochs,
                  model: nn.Module,
@@ -18,10 +58,26 @@ class Trainer:
                  output_path: str | Path,
                  loss_fn,
                  acc_fn,
-                 device):
+                 device,
+                 train_transform: nn.Module | None = None,
+                 eval_transform: nn.Module | None = None,
+                 amp_dtype: torch.dtype | None = None,
+                 channels_last: bool = False,
+                 compile_model: bool = False,
+                 grad_accumulation: int = 1,
+                 scheduler=None,
+                 checkpoint_every: int = 1,
+                 patience: int | None = None,
+                 min_delta: float = 0.0,
+                 metric_sinks: list | None = None,
+                 plot_curves: bool = True):
         self.device = device
+        self.device_type = torch.device(device).type
         self.epochs = epochs
-        self.model = model.to(device)
+        self.memory_format = torch.channels_last if channels_last else torch.preserve_format
+        self.model = model.to(device, memory_format=self.memory_format)
+        # Los checkpoints se guardan del módulo original: sus claves no llevan el prefijo de torch.compile
+        self.step_model = torch.compile(self.model) if compile_model else self.model
         self.model_name = model_name
         self.train_dataloader = train_dataloader
         self.val_dataloader = val_dataloader
@@ -29,85 +85,173 @@ class Trainer:
         self.output_path = Path(output_path) / self.model_name
         self.loss_fn = loss_fn
         self.acc_fn = acc_fn
-        plt.style.use('ggplot')
+        # Transformaciones por lote, ya en el dispositivo (p. ej. BatchAugment / EvalTransform de augmentation.py)
+        self.train_transform = train_transform
+        self.eval_transform = eval_transform
+        self.amp_dtype = amp_dtype
+        self.grad_accumulation = max(1, grad_accumulation)
+        # float16 necesita escalar la pérdida; bfloat16 tiene el rango de float32 y no
+        self.scaler = torch.amp.GradScaler(self.device_type, enabled=amp_dtype == torch.float16)
+        self.scheduler = scheduler
+        self.checkpoint_every = max(1, checkpoint_every)
+        self.patience = patience
+        self.min_delta = min_delta
+        self.epoch = 0
+        self.history = {key: [] for key in ('epoch', 'train_loss', 'train_acc', 'val_loss', 'val_acc', 'lr')}
+        self.best_val = np.inf
+        self.epochs_without_improvement = 0
         self.output_path.mkdir(exist_ok=True, parents=True)
+        self.metric_sinks = metric_sinks
+        self.plot_curves = plot_curves
+        self.plot_process = None
+
+    def _autocast(self):
+        return torch.autocast(self.device_type, dtype=self.amp_dtype, enabled=self.amp_dtype is not None)
+
+    def _batch(self, images, labels, transform):
+        images = images.to(self.device, non_blocking=True)
+        if transform is not None:
+            images = transform(images)
+        images = images.contiguous(memory_format=self.memory_format)
+        return images, labels.to(self.device, non_blocking=True)
 
     def train_one_epoch(self, dataloader: torch.utils.data.DataLoader):
-        epoch_loss = 0
-        epoch_acc = 0
-        
+        epoch_loss = torch.zeros((), device=self.device)
+        epoch_acc = torch.zeros((), device=self.device)
+        samples = 0
+
         self.model.train()
-        for images, labels in dataloader:
-            self.optimizer.zero_grad()
-            logits = self.model(images.to(self.device))
-            loss = self.loss_fn(logits, labels.to(self.device))
-            loss.backward()
-            self.optimizer.step()
-            acc = self.acc_fn(logits.softmax(dim=1).argmax(dim=1).cpu(), labels)
-    
-            epoch_loss += loss.item()
-            epoch_acc += acc
+        self.optimizer.zero_grad(set_to_none=True)
+        for step, (images, labels) in enumerate(dataloader, start=1):
+            images, labels = self._batch(images, labels, self.train_transform)
+            with self._autocast():
+                logits = self.step_model(images)
+                loss = self.loss_fn(logits, labels)
+            self.scaler.scale(loss / self.grad_accumulation).backward()
+            # El último grupo de la época se aplica aunque tenga menos lotes
+            if step % self.grad_accumulation == 0 or step == len(dataloader):
+                self.scaler.step(self.optimizer)
+                self.scaler.update()
+                self.optimizer.zero_grad(set_to_none=True)
+
+            batch_size = labels.shape[0]
+            epoch_loss += loss.detach().float() * batch_size
+            epoch_acc += self.acc_fn(logits.detach().argmax(dim=1), labels) * batch_size
+            samples += batch_size
 
-        return epoch_loss / len(dataloader), epoch_acc / len(dataloader)
+        return epoch_loss.item() / samples, epoch_acc.item() / samples
  
     def val_one_epoch(self, dataloader: torch.utils.data.DataLoader):
-        epoch_loss = 0
-        epoch_acc = 0
+        epoch_loss = torch.zeros((), device=self.device)
+        epoch_acc = torch.zeros((), device=self.device)
+        samples = 0
 
         self.model.eval()
-        with torch.inference_mode():
+        with torch.inference_mode(), self._autocast():
             for images, labels in dataloader:
-                logits = self.model(images.to(self.device))
-                loss = self.loss_fn(logits, labels.to(self.device))
-                acc = self.acc_fn(logits.softmax(dim=1).argmax(dim=1).cpu(), labels)
-        
-                epoch_loss += loss.item()
-                epoch_acc += acc
-
-        return epoch_loss / len(dataloader), epoch_acc / len(dataloader)
+                images, labels = self._batch(images, labels, self.eval_transform)
+                logits = self.step_model(images)
+                loss = self.loss_fn(logits, labels)
+
+                batch_size = labels.shape[0]
+                epoch_loss += loss.float() * batch_size
+                epoch_acc += self.acc_fn(logits.argmax(dim=1), labels) * batch_size
+                samples += batch_size
+
+        return epoch_loss.item() / samples, epoch_acc.item() / samples
     
-    def train(self):
-        train_loss_list = []
-        val_loss_list = []
-        train_acc_list = []
-        val_acc_list = []
-        epochs = []
-        best_val = np.inf
-
-        for epoch in (pbar := tqdm(range(self.epochs))):
-            train_loss, train_acc = self.train_one_epoch(dataloader=self.train_dataloader)
-            train_loss_list.append(train_loss)
-            train_acc_list.append(train_acc)
+    def save_checkpoint(self, path: str | Path | None = None):
+        """Guarda de forma atómica todo el estado necesario para reanudar (por defecto en ``last.pt``)."""
+        path = Path(path or self.output_path / CHECKPOINT_NAME)
+        state = {
+            "epoch": self.epoch,
+            "model": self.model.state_dict(),
+            "optimizer": self.optimizer.state_dict(),
+            "scheduler": self.scheduler.state_dict() if self.scheduler is not None else None,
+            "scaler": self.scaler.state_dict(),
+            "history": self.history,
+            "best_val": self.best_val,
+            "epochs_without_improvement": self.epochs_without_improvement,
+            "rng": {"torch": torch.get_rng_state(), "numpy": np.random.get_state(), "python": random.getstate(),
+                    "cuda": torch.cuda.get_rng_state_all() if torch.cuda.is_available() else None},
+        }
+        _atomic_save(state, path)
+
+    def load_checkpoint(self, path: str | Path | None = None):
+        path = Path(path or self.output_path / CHECKPOINT_NAME)
+        # weights_only=False: el checkpoint guarda los estados de los RNG (objetos numpy y de Python)
+        state = torch.load(path, map_location=self.device, weights_only=False)
+        self.model.load_state_dict(state["model"])
+        self.optimizer.load_state_dict(state["optimizer"])
+        if self.scheduler is not None and state["scheduler"] is not None:
+            self.scheduler.load_state_dict(state["scheduler"])
+        self.scaler.load_state_dict(state["scaler"])
+        self.epoch = state["epoch"]
+        self.history = state["history"]
+        self.best_val = state["best_val"]
+        self.epochs_without_improvement = state["epochs_without_improvement"]
+        torch.set_rng_state(state["rng"]["torch"])
+        np.random.set_state(state["rng"]["numpy"])
+        random.setstate(state["rng"]["python"])
+        if state["rng"]["cuda"] is not None and torch.cuda.is_available():
+            torch.cuda.set_rng_state_all(state["rng"]["cuda"])
+
+    def _step_scheduler(self, val_loss: float):
+        if self.scheduler is None:
+            return
+        if isinstance(self.scheduler, torch.optim.lr_scheduler.ReduceLROnPlateau):
+            self.scheduler.step(val_loss)
+        else:
+            self.scheduler.step()
 
+    def train(self, resume: bool = False):
+        """Entrena hasta ``epochs`` épocas; con ``resume`` continúa desde ``last.pt`` si existe.
+
+        Devuelve el número de épocas completadas (menos de ``epochs`` si
+        saltó la parada temprana).
+        """
+        if resume and (self.output_path / CHECKPOINT_NAME).exists():
+            self.load_checkpoint()
+            print(f'[TRAINER] Resuming from epoch {self.epoch} (best val_loss={self.best_val:.4f})')
+
+        sinks = self.metric_sinks
+        if sinks is None:
+            sinks = [JSONLSink(self.output_path / METRICS_JSONL), CSVSink(self.output_path / METRICS_CSV)]
+        metrics = AsyncMetricsWriter(sinks)
+        try:
+            self._train_epochs(metrics)
+        finally:
+            metrics.close()
+        if self.plot_curves and self.history['epoch']:
+            records = [dict(zip(self.history, values)) for values in zip(*self.history.values())]
+            self.plot_process = plot_metrics_async(records, self.output_path)
+        return self.epoch
+
+    def _train_epochs(self, metrics: AsyncMetricsWriter):
+        for epoch in (pbar := tqdm(range(self.epoch, self.epochs), initial=self.epoch, total=self.epochs)):
+            train_loss, train_acc = self.train_one_epoch(dataloader=self.train_dataloader)
             val_loss, val_acc = self.val_one_epoch(dataloader=self.val_dataloader)
-            val_loss_list.append(val_loss)
-            val_acc_list.append(val_acc)
             pbar.set_description(f'[TRAINER] Training model [train_loss={train_loss:.4f}, train_acc={train_acc:.4f}] [val_loss={val_loss:.4f}, val_acc={val_acc:.4f}]')
-            
-            epochs.append(epoch)
-
-            plt.figure(figsize=(10,7))
-            plt.title('Training and validation loss curve')
-            plt.plot(epochs, train_loss_list, label='Training', marker='o', markevery=[-1], color='red')
-            plt.plot(epochs, val_loss_list, label='Validation', marker='o', markevery=[-1], color='blue')
-            plt.xlabel('Epoch')
-            plt.ylabel('Loss')
-            plt.legend()
-            plt.tight_layout()
-            plt.savefig(self.output_path / 'loss_curve.png')
-            plt.close()
-
-            plt.figure(figsize=(10,7))
-            plt.title('Training and validation accuracy curve')
-            plt.plot(epochs, train_acc_list, label='Training', marker='o', markevery=[-1], color='red')
-            plt.plot(epochs, val_acc_list, label='Validation', marker='o', markevery=[-1], color='blue')
-            plt.xlabel('Epoch')
-            plt.ylabel('Accuracy')
-            plt.legend()
-            plt.tight_layout()
-            plt.savefig(self.output_path / 'acc_curve.png')
-            plt.close()
-
-            if val_loss < best_val:
-                torch.save(self.model.state_dict(), self.output_path / 'best.pth')
-                best_val = val_loss
\ No newline at end of file
+            record = {'epoch': epoch, 'train_loss': train_loss, 'train_acc': train_acc,
+                      'val_loss': val_loss, 'val_acc': val_acc, 'lr': self.optimizer.param_groups[0]['lr']}
+            for key, value in record.items():
+                self.history[key].append(value)
+            # Solo encola: la escritura la hace el hilo de AsyncMetricsWriter
+            metrics.log(record)
+            self._step_scheduler(val_loss)
+            self.epoch = epoch + 1
+
+            if val_loss < self.best_val - self.min_delta:
+                _atomic_save(self.model.state_dict(), self.output_path / 'best.pth')
+                self.best_val = val_loss
+                self.epochs_without_improvement = 0
+            else:
+                self.epochs_without_improvement += 1
+
+            stop = self.patience is not None and self.epochs_without_improvement >= self.patience
+            if stop or self.epoch % self.checkpoint_every == 0 or self.epoch == self.epochs:
+                self.save_checkpoint()
+            if stop:
+                print(f'[TRAINER] Early stopping at epoch {self.epoch}: '
+                      f'no val_loss improvement in {self.patience} epochs (best={self.best_val:.4f})')
+                break
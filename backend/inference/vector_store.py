@@ -0,0 +1,163 @@
+import fcntl
+import threading
+from pathlib import Path
+
+import numpy as np
+
+# Filas por bloque en la búsqueda por fuerza bruta (acota la memoria de la conversión a float32)
+SEARCH_CHUNK_ROWS = 4096
+
+
+class BruteForceIndex:
+    """Búsqueda exacta por producto escalar sobre todos los vectores, en bloques.
+
+    Cualquier índice con el mismo método ``search`` (IVF, HNSW...) puede
+    sustituirlo pasando su clase como ``index_cls`` a ``VectorStore``.
+    """
+
+    def __init__(self, store):
+        self.store = store
+
+    def search(self, query, k):
+        vectors, scales, keys = self.store.arrays()
+        if len(keys) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        similarities = np.empty(len(keys), dtype=np.float32)
+        for start in range(0, len(keys), SEARCH_CHUNK_ROWS):
+            chunk = vectors[start:start + SEARCH_CHUNK_ROWS].astype(np.float32)
+            similarities[start:start + len(chunk)] = chunk @ query
+        if scales is not None:
+            similarities *= scales
+
+        k = min(k, len(keys))
+        top = np.argpartition(-similarities, k - 1)[:k]
+        top = top[np.argsort(-similarities[top], kind="stable")]
+        return np.asarray(keys[top]), similarities[top]
+
+
+class VectorStore:
+    """Vectores L2-normalizados en float16 o int8 sobre ficheros memory-mapped.
+
+    Los vectores se añaden al final de ``vectors.bin`` junto a su clave
+    (``keys.bin``, int64) y, en int8, su escala (``scales.bin``, float32).
+    """
+
+    def __init__(self, path: str | Path, dim: int, dtype: str = "float16", index_cls=BruteForceIndex):
+        if dtype not in ("float16", "int8"):
+            raise ValueError(f"Unsupported dtype: {dtype}")
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.dim = dim
+        self.dtype = np.dtype(dtype)
+        self._lock = threading.Lock()
+        self._cached = None
+        self.index = index_cls(self)
+        with self._lock, self._append_lock():
+            self._repair()
+
+    @property
+    def _vectors_file(self):
+        return self.path / "vectors.bin"
+
+    @property
+    def _keys_file(self):
+        return self.path / "keys.bin"
+
+    @property
+    def _scales_file(self):
+        return self.path / "scales.bin"
+
+    def _files(self):
+        """(fichero, bytes por fila) de cada fichero del store."""
+        files = [(self._vectors_file, self.dim * self.dtype.itemsize), (self._keys_file, 8)]
+        if self.dtype == np.int8:
+            files.append((self._scales_file, 4))
+        return files
+
+    def _append_lock(self):
+        # flock además del lock de hilos: los workers de serve.py escriben en los mismos ficheros
+        lock_file = open(self.path / "append.lock", "w")
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        return lock_file
+
+    def _repair(self, rows=None):
+        """Recorta los ficheros a ``rows`` filas (por defecto, las del más corto).
+
+        Un ``add`` interrumpido entre escrituras deja un vector o una escala
+        sin clave; si no se recortara, las claves siguientes quedarían
+        desplazadas una fila respecto a sus vectores.
+        """
+        sizes = [(file, row_bytes, file.stat().st_size if file.exists() else 0) for file, row_bytes in self._files()]
+        if rows is None:
+            rows = min(size // row_bytes for _, row_bytes, size in sizes)
+        for file, row_bytes, size in sizes:
+            if size != rows * row_bytes:
+                with open(file, "ab") as f:
+                    f.truncate(rows * row_bytes)
+
+    def __len__(self):
+        return self._keys_file.stat().st_size // 8 if self._keys_file.exists() else 0
+
+    def _encode(self, vector):
+        vector = np.asarray(vector, dtype=np.float32).reshape(self.dim)
+        vector = vector / max(np.linalg.norm(vector), 1e-12)
+        if self.dtype == np.int8:
+            scale = max(np.abs(vector).max() / 127.0, 1e-12)
+            return np.round(vector / scale).astype(np.int8), np.float32(scale)
+        return vector.astype(np.float16), None
+
+    def add(self, key: int, vector):
+        encoded, scale = self._encode(vector)
+        with self._lock, self._append_lock():
+            self._repair(len(self))
+            with open(self._vectors_file, "ab") as f:
+                f.write(encoded.tobytes())
+            if scale is not None:
+                with open(self._scales_file, "ab") as f:
+                    f.write(scale.tobytes())
+            # Las claves se escriben al final: len() nunca cuenta un vector a medio escribir
+            with open(self._keys_file, "ab") as f:
+                f.write(np.int64(key).tobytes())
+
+    def arrays(self):
+        """(vectores, escalas o None, claves) como memmaps de solo lectura."""
+        n = len(self)
+        with self._lock:
+            if self._cached is not None and len(self._cached[2]) == n:
+                return self._cached
+            if n == 0:
+                return np.empty((0, self.dim), dtype=self.dtype), None, np.empty(0, dtype=np.int64)
+            vectors = np.memmap(self._vectors_file, dtype=self.dtype, mode="r", shape=(n, self.dim))
+            keys = np.memmap(self._keys_file, dtype=np.int64, mode="r", shape=(n,))
+            scales = (np.memmap(self._scales_file, dtype=np.float32, mode="r", shape=(n,))
+                      if self.dtype == np.int8 else None)
+            self._cached = (vectors, scales, keys)
+            return self._cached
+
+    def similarities(self, query, keys):
+        """Similitud coseno de ``query`` con los vectores de ``keys`` (NaN si la clave no está)."""
+        query = np.asarray(query, dtype=np.float32).reshape(self.dim)
+        query = query / max(np.linalg.norm(query), 1e-12)
+        keys = np.asarray(keys, dtype=np.int64)
+        result = np.full(len(keys), np.nan, dtype=np.float32)
+        vectors, scales, stored_keys = self.arrays()
+        if len(stored_keys) == 0 or len(keys) == 0:
+            return result
+
+        order = np.argsort(stored_keys, kind="stable")
+        sorted_keys = stored_keys[order]
+        positions = np.minimum(np.searchsorted(sorted_keys, keys), len(sorted_keys) - 1)
+        found = sorted_keys[positions] == keys
+        rows = order[positions[found]]
+        similarities = vectors[rows].astype(np.float32) @ query
+        if scales is not None:
+            similarities *= scales[rows]
+        result[found] = similarities
+        return result
+
+    def search(self, query, k=50):
+        """Las ``k`` claves más similares (similitud coseno) a ``query``."""
+        query = np.asarray(query, dtype=np.float32).reshape(self.dim)
+        query = query / max(np.linalg.norm(query), 1e-12)
+        return self.index.search(query, k)
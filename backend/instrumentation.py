@@ -0,0 +1,111 @@
+import re
+import time
+from collections import Counter
+
+from flask import current_app, g, has_app_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import StaticPool
+
+from backend.utils.logger import setup_logger
+
+logger = setup_logger()
+
+# Literales que se sustituyen para agrupar sentencias iguales con distintos parámetros
+_LITERALS = re.compile(r"'[^']*'|\b\d+(\.\d+)?\b")
+_SQLITE_INDEX = re.compile(r"USING (?:COVERING )?INDEX (\w+)")
+
+
+def engine_options(uri: str, config: dict) -> dict:
+    """``SQLALCHEMY_ENGINE_OPTIONS`` para ``uri`` a partir de las claves ``db_pool_*`` de config.json."""
+    if uri.startswith("sqlite"):
+        if uri in ("sqlite://", "sqlite:///:memory:"):
+            # Una única conexión compartida: cada conexión nueva sería una base de datos vacía
+            return {"poolclass": StaticPool, "connect_args": {"check_same_thread": False}}
+        return {"connect_args": {"check_same_thread": False}}
+    return {
+        "pool_size": config.get('db_pool_size', 10),
+        "max_overflow": config.get('db_pool_max_overflow', 20),
+        "pool_timeout": config.get('db_pool_timeout_s', 30),
+        # MySQL cierra las conexiones inactivas tras wait_timeout (8 h por defecto)
+        "pool_recycle": config.get('db_pool_recycle_s', 1800),
+        "pool_pre_ping": config.get('db_pool_pre_ping', True),
+    }
+
+
+def normalize_statement(statement: str) -> str:
+    return _LITERALS.sub("?", " ".join(statement.split()))
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # En el contexto de ejecución y no en una pila de la conexión: una sentencia que
+    # falla no llega a after_cursor_execute y descuadraría los tiempos de las siguientes
+    context.query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context.query_start
+    if not has_app_context():
+        return
+    stats = g.get("query_stats")
+    if stats is not None:
+        stats["count"] += 1
+        stats["time"] += elapsed
+        stats["statements"][normalize_statement(statement)] += 1
+    slow_ms = current_app.config.get('DB_SLOW_QUERY_MS')
+    if slow_ms is not None and elapsed * 1000 >= slow_ms:
+        logger.warning(f"SLOW_QUERY | duration={elapsed * 1000:.1f}ms | statement={normalize_statement(statement)}")
+
+
+def init_query_instrumentation(app):
+    """Cuenta y cronometra las consultas de cada petición (``g.query_stats``).
+
+    Registra en el log las consultas más lentas que ``DB_SLOW_QUERY_MS`` y
+    las sentencias que se repiten ``DB_N_PLUS_ONE_THRESHOLD`` veces o más en
+    una misma petición (patrón N+1). Añade las cabeceras ``X-Query-Count`` y
+    ``Server-Timing``. En las respuestas en streaming (NDJSON) el resumen y
+    la detección N+1 esperan a que se cierre la respuesta, así que incluyen
+    las consultas hechas al generar el cuerpo; las cabeceras, que se envían
+    antes, solo cuentan las previas.
+    """
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+    @app.before_request
+    def reset_query_stats():
+        g.query_stats = {"count": 0, "time": 0.0, "statements": Counter()}
+
+    @app.after_request
+    def report_query_stats(response):
+        stats = g.get("query_stats")
+        if stats is None:
+            return response
+        response.headers["X-Query-Count"] = str(stats["count"])
+        response.headers["Server-Timing"] = f"db;desc=\"{stats['count']} queries\";dur={stats['time'] * 1000:.1f}"
+        # Al cerrar la respuesta ya no hay contexto de petición: la ruta y el umbral se leen aquí
+        path = request.path
+        threshold = app.config['DB_N_PLUS_ONE_THRESHOLD']
+
+        def finalize_query_stats():
+            logger.debug(
+                f"REQUEST_QUERIES | path={path} | queries={stats['count']} | db_time={stats['time'] * 1000:.1f}ms"
+            )
+            for statement, count in stats["statements"].items():
+                if count >= threshold:
+                    logger.warning(f"N_PLUS_ONE | path={path} | count={count} | statement={statement}")
+
+        if response.is_streamed:
+            response.call_on_close(finalize_query_stats)
+        else:
+            finalize_query_stats()
+        return response
+
+
+def explain_indexes(conn, statement) -> set:
+    """Índices que el planificador usaría para ``statement`` (EXPLAIN en MySQL, EXPLAIN QUERY PLAN en SQLite)."""
+    compiled = statement.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True})
+    if conn.dialect.name == "sqlite":
+        details = [row.detail for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}")]
+        return {match.group(1) for detail in details for match in [_SQLITE_INDEX.search(detail)] if match}
+    return {row.key for row in conn.exec_driver_sql(f"EXPLAIN {compiled}") if row.key}
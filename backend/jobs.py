@@ -0,0 +1,199 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+from backend.utils.logger import setup_logger
+
+logger = setup_logger()
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+# Número de tiempos por etapa que se conservan para las métricas
+STAGE_WINDOW = 1000
+
+
+class StageTimer:
+    """Acumula la duración de cada etapa de un trabajo (``with timer("inference"): ...``)."""
+
+    def __init__(self):
+        self.stages: dict[str, float] = {}
+
+    @contextmanager
+    def __call__(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[stage] = self.stages.get(stage, 0.0) + time.perf_counter() - start
+
+
+@contextmanager
+def sqlite_connection(db_path: str | Path):
+    """Conexión en una transacción que se cierra al salir (``with conn`` solo confirma o deshace)."""
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def requeue_interrupted(db_path: str | Path) -> int:
+    """Vuelve a encolar los trabajos que quedaron ``running`` al parar el servidor."""
+    if not Path(db_path).exists():
+        return 0
+    with sqlite_connection(db_path) as conn:
+        exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'jobs'").fetchone()
+        if exists is None:
+            return 0
+        return conn.execute("UPDATE jobs SET status = ? WHERE status = ?", (QUEUED, RUNNING)).rowcount
+
+
+class JobQueue:
+    """Cola de trabajos con un pool de hilos local y SQLite como broker.
+
+    Los trabajos se persisten antes de ejecutarse, de modo que los que
+    quedasen pendientes al parar el servidor se reencolan al arrancar.
+    Con varios procesos sobre el mismo fichero (``serve.py``) la recuperación
+    se hace una sola vez con ``requeue_interrupted`` y cada proceso usa
+    ``recover=False``.
+    """
+
+    def __init__(self, db_path: str | Path, handlers: dict, workers: int = 2, recover: bool = True):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.handlers = handlers
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job-worker")
+        self._lock = threading.Lock()
+        self._stage_latencies = defaultdict(lambda: deque(maxlen=STAGE_WINDOW))
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, kind TEXT NOT NULL, owner TEXT, status TEXT NOT NULL, "
+                "payload TEXT NOT NULL, result TEXT, error TEXT, stages TEXT, "
+                "created REAL NOT NULL, started REAL, finished REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_jobs_status ON jobs (status)")
+        if recover:
+            requeue_interrupted(self.db_path)
+        with self._connect() as conn:
+            pending = conn.execute(
+                "SELECT id FROM jobs WHERE status = ? ORDER BY created", (QUEUED,)
+            ).fetchall()
+        for (job_id,) in pending:
+            logger.info(f"JOB_REQUEUED | id={job_id}")
+            self._executor.submit(self._run, job_id)
+
+    def _connect(self):
+        return sqlite_connection(self.db_path)
+
+    def _execute(self, sql, params=()):
+        with self._lock, self._connect() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def submit(self, kind: str, payload: dict, owner: str | None = None) -> str:
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        job_id = uuid.uuid4().hex
+        self._execute(
+            "INSERT INTO jobs (id, kind, owner, status, payload, created) VALUES (?, ?, ?, ?, ?, ?)",
+            (job_id, kind, owner, QUEUED, json.dumps(payload), time.time())
+        )
+        self._executor.submit(self._run, job_id)
+        logger.debug(f"JOB_QUEUED | id={job_id} | kind={kind} | owner={owner}")
+        return job_id
+
+    def get(self, job_id: str) -> dict | None:
+        rows = self._execute(
+            "SELECT id, kind, owner, status, result, error, stages, created, started, finished FROM jobs WHERE id = ?",
+            (job_id,)
+        )
+        if not rows:
+            return None
+        job_id, kind, owner, status, result, error, stages, created, started, finished = rows[0]
+        return {
+            "id": job_id,
+            "kind": kind,
+            "owner": owner,
+            "status": status,
+            "result": json.loads(result) if result else None,
+            "error": error,
+            "stages": json.loads(stages) if stages else {},
+            "created": created,
+            "started": started,
+            "finished": finished,
+        }
+
+    def _run(self, job_id: str):
+        rows = self._execute("SELECT kind, payload, created FROM jobs WHERE id = ?", (job_id,))
+        if not rows:
+            return
+        kind, payload, created = rows[0]
+        started = time.time()
+        # Reclamo atómico: con varios procesos sobre el mismo fichero, solo uno ejecuta cada trabajo
+        with self._lock, self._connect() as conn:
+            claimed = conn.execute(
+                "UPDATE jobs SET status = ?, started = ? WHERE id = ? AND status = ?", (RUNNING, started, job_id, QUEUED)
+            ).rowcount
+        if not claimed:
+            return
+
+        timer = StageTimer()
+        timer.stages["queue_wait"] = started - created
+        try:
+            result = self.handlers[kind](json.loads(payload), timer)
+        except Exception as e:
+            logger.error(f"JOB_FAILED | id={job_id} | kind={kind} | error={str(e)}", exc_info=True)
+            self._finish(job_id, FAILED, timer, error=str(e))
+            return
+        self._finish(job_id, DONE, timer, result=result)
+        logger.info(
+            f"JOB_DONE | id={job_id} | kind={kind} | "
+            + " | ".join(f"{stage}={duration:.3f}s" for stage, duration in timer.stages.items())
+        )
+
+    def _finish(self, job_id, status, timer, result=None, error=None):
+        self._execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, stages = ?, finished = ? WHERE id = ?",
+            (status, json.dumps(result) if result is not None else None, error,
+             json.dumps(timer.stages), time.time(), job_id)
+        )
+        with self._lock:
+            for stage, duration in timer.stages.items():
+                self._stage_latencies[stage].append(duration)
+
+    def metrics(self) -> dict:
+        counts = dict(self._execute("SELECT status, COUNT(*) FROM jobs GROUP BY status"))
+        with self._lock:
+            latencies = {stage: np.array(values) for stage, values in self._stage_latencies.items()}
+        return {
+            "queue_depth": counts.get(QUEUED, 0),
+            "running": counts.get(RUNNING, 0),
+            "done": counts.get(DONE, 0),
+            "failed": counts.get(FAILED, 0),
+            "stages": {
+                stage: {
+                    "count": int(values.size),
+                    "mean_s": float(values.mean()),
+                    "p50_s": float(np.percentile(values, 50)),
+                    "p99_s": float(np.percentile(values, 99)),
+                }
+                for stage, values in latencies.items() if values.size
+            },
+        }
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
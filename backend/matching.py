@@ -0,0 +1,41 @@
+import math
+from datetime import datetime, timedelta
+
+from backend.similarity import DISTANCE_SCALE_KM, rank_visual_matches
+from backend.spatial import nearby_reports
+
+# Días durante los que un reporte de pérdida sigue abierto a nuevas coincidencias
+MATCH_WINDOW_DAYS = 90
+# Radio (km) y número máximo de coincidencias que se guardan por reporte nuevo
+MATCH_RADIUS_KM = 100.0
+MATCH_LIMIT = 20
+# Similitud mínima para aceptar un vecino visual de otra raza
+MATCH_MIN_SIMILARITY = 0.5
+
+
+def open_lost_reports(lost_model, window_days, now=None):
+    cutoff = (now or datetime.now()) - timedelta(days=window_days)
+    return lost_model.query.filter(lost_model.fecha >= cutoff)
+
+
+def find_matches(report, lost_model, store=None, embedding=None, window_days=MATCH_WINDOW_DAYS,
+                 radius_km=MATCH_RADIUS_KM, limit=MATCH_LIMIT, distance_scale_km=DISTANCE_SCALE_KM,
+                 min_similarity=MATCH_MIN_SIMILARITY):
+    """Reportes de pérdida abiertos que coinciden con el reporte de protectora ``report``.
+
+    Solo se consideran los de la misma raza dentro de ``radius_km`` (índices
+    geohash y (raza, fecha)) y, si hay ``embedding``, sus vecinos del vector
+    store con similitud de al menos ``min_similarity``: el trabajo depende
+    del reporte nuevo y no del histórico. Devuelve tuplas ``(reporte,
+    distancia_km, similitud | None, puntuacion)``.
+    """
+    open_reports = open_lost_reports(lost_model, window_days)
+    same_breed = nearby_reports(open_reports.filter(lost_model.raza == report.raza), lost_model,
+                                report.latitud, report.longitud, radius_km=radius_km)
+    if embedding is not None and store is not None:
+        ranked = rank_visual_matches(lost_model, store, embedding, same_breed, report.latitud, report.longitud,
+                                     radius_km=radius_km, distance_scale_km=distance_scale_km, query=open_reports)
+        return [match for match in ranked
+                if match[0].raza == report.raza or (match[2] is not None and match[2] >= min_similarity)][:limit]
+    # Sin embedding solo cuenta la distancia (nearby_reports ya los devuelve ordenados)
+    return [(r, distance, None, math.exp(-distance / distance_scale_km)) for r, distance in same_breed[:limit]]
@@ -0,0 +1,156 @@
+import argparse
+import importlib.util
+import json
+from datetime import datetime
+from pathlib import Path
+
+import sqlalchemy as sa
+
+from backend.utils.logger import setup_logger
+
+logger = setup_logger()
+
+VERSIONS_DIR = Path(__file__).parent / "versions"
+
+schema_version = sa.Table(
+    "schema_version", sa.MetaData(),
+    sa.Column("revision", sa.String(32), primary_key=True),
+    sa.Column("aplicada", sa.DateTime, nullable=False)
+)
+
+
+def load_migrations(versions_dir=VERSIONS_DIR):
+    """Módulos de ``versions/NNNN_*.py`` ordenados de la más antigua a la más reciente.
+
+    Cada módulo define ``revision``, ``down_revision`` y las funciones
+    ``upgrade(conn)`` y ``downgrade(conn)``.
+    """
+    migrations = []
+    for path in sorted(versions_dir.glob("[0-9][0-9][0-9][0-9]_*.py")):
+        spec = importlib.util.spec_from_file_location(f"backend.migrations.versions.{path.stem}", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        migrations.append(module)
+
+    previous = None
+    for module in migrations:
+        if module.down_revision != previous:
+            raise RuntimeError(f"La migración {module.revision} no sigue a {previous}")
+        previous = module.revision
+    return migrations
+
+
+def applied_revisions(conn):
+    if not sa.inspect(conn).has_table(schema_version.name):
+        return []
+    return [row.revision for row in conn.execute(sa.select(schema_version.c.revision).order_by(schema_version.c.revision))]
+
+
+def current_revision(engine):
+    with engine.connect() as conn:
+        applied = applied_revisions(conn)
+    return applied[-1] if applied else None
+
+
+def upgrade(engine, target=None, migrations=None):
+    """Aplica en orden las migraciones pendientes hasta ``target`` (la última si es None)."""
+    migrations = migrations if migrations is not None else load_migrations()
+    with engine.begin() as conn:
+        schema_version.create(conn, checkfirst=True)
+        applied = set(applied_revisions(conn))
+
+    for module in migrations:
+        if module.revision not in applied:
+            # Una transacción por migración (en MySQL el DDL hace commit implícito)
+            with engine.begin() as conn:
+                module.upgrade(conn)
+                conn.execute(schema_version.insert().values(revision=module.revision, aplicada=datetime.now()))
+            logger.info(f"MIGRATION_UPGRADE | revision={module.revision} | {module.__doc__.strip().splitlines()[0]}")
+        if module.revision == target:
+            break
+
+
+def downgrade(engine, target, migrations=None):
+    """Revierte las migraciones aplicadas posteriores a ``target`` (None revierte todas)."""
+    migrations = migrations if migrations is not None else load_migrations()
+    with engine.connect() as conn:
+        applied = set(applied_revisions(conn))
+
+    for module in reversed(migrations):
+        if module.revision == target:
+            break
+        if module.revision in applied:
+            with engine.begin() as conn:
+                module.downgrade(conn)
+                conn.execute(schema_version.delete().where(schema_version.c.revision == module.revision))
+            logger.info(f"MIGRATION_DOWNGRADE | revision={module.revision}")
+
+
+def stamp(engine, revision, migrations=None):
+    """Marca como aplicadas las migraciones hasta ``revision`` sin ejecutarlas (esquema creado a mano)."""
+    migrations = migrations if migrations is not None else load_migrations()
+    with engine.begin() as conn:
+        schema_version.create(conn, checkfirst=True)
+        applied = set(applied_revisions(conn))
+        for module in migrations:
+            if module.revision not in applied:
+                conn.execute(schema_version.insert().values(revision=module.revision, aplicada=datetime.now()))
+            if module.revision == revision:
+                break
+
+
+# Operaciones para las migraciones
+
+def _indexes(conn, table):
+    return {index["name"]: index for index in sa.inspect(conn).get_indexes(table)}
+
+
+def has_index(conn, table, name):
+    return name in _indexes(conn, table)
+
+
+def has_column(conn, table, name):
+    return any(column["name"] == name for column in sa.inspect(conn).get_columns(table))
+
+
+def _index(name, table, columns, **kwargs):
+    # Basta con los nombres de las columnas para generar el DDL del índice
+    table = sa.Table(table, sa.MetaData(), *[sa.Column(column) for column in columns])
+    return sa.Index(name, *[table.c[column] for column in columns], **kwargs)
+
+
+def create_index(conn, name, table, *columns, **kwargs):
+    if not has_index(conn, table, name):
+        _index(name, table, columns, **kwargs).create(conn)
+
+
+def drop_index(conn, name, table):
+    index = _indexes(conn, table).get(name)
+    if index is not None:
+        _index(name, table, index["column_names"]).drop(conn)
+
+
+if __name__ == "__main__":
+    from backend.app import database_uri
+
+    parser = argparse.ArgumentParser(description='Migraciones del esquema de la base de datos')
+    parser.add_argument('command', choices=['upgrade', 'downgrade', 'stamp', 'current', 'history'])
+    parser.add_argument('revision', nargs='?', default=None, help='Revisión destino (por defecto, la última)')
+    parser.add_argument('--database', default=None, help='URI de SQLAlchemy (por defecto, perros_app de config.json)')
+    args = parser.parse_args()
+
+    if args.database is None:
+        args.database = database_uri(json.loads(Path("config.json").read_text()))
+    engine = sa.create_engine(args.database)
+    migrations = load_migrations()
+
+    if args.command == 'upgrade':
+        upgrade(engine, args.revision, migrations)
+    elif args.command == 'downgrade':
+        downgrade(engine, args.revision, migrations)
+    elif args.command == 'stamp':
+        stamp(engine, args.revision, migrations)
+    elif args.command == 'history':
+        for module in migrations:
+            print(f'{module.revision} | {module.__doc__.strip().splitlines()[0]}')
+    print(f'[MIGRATIONS] revisión actual: {current_revision(engine)}')
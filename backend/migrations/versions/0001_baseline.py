@@ -0,0 +1,53 @@
+"""Esquema original de init/mysql/petracker.db.sql, anterior a las migraciones.
+
+Las tablas se crean solo si no existen, de modo que las bases de datos
+creadas con el script de inicialización quedan en esta revisión.
+"""
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+
+metadata = sa.MetaData()
+
+sa.Table(
+    "usuarios", metadata,
+    sa.Column("nombre", sa.String(50), primary_key=True),
+    sa.Column("contrasena_hash", sa.String(255), nullable=False)
+)
+
+sa.Table(
+    "protectoras", metadata,
+    sa.Column("nombre", sa.String(50), primary_key=True),
+    sa.Column("contrasena_hash", sa.String(255), nullable=False)
+)
+
+sa.Table(
+    "mascotas_perdidas", metadata,
+    sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+    sa.Column("username", sa.String(50), sa.ForeignKey("usuarios.nombre", ondelete="CASCADE"), nullable=False),
+    sa.Column("raza", sa.String(50)),
+    sa.Column("latitud", sa.Numeric(9, 6)),
+    sa.Column("longitud", sa.Numeric(9, 6)),
+    sa.Column("path_imagen", sa.String(255), nullable=False),
+    sa.Column("fecha", sa.TIMESTAMP, server_default=sa.func.current_timestamp())
+)
+
+sa.Table(
+    "mascotas_acogidas", metadata,
+    sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+    sa.Column("protectora", sa.String(50), sa.ForeignKey("protectoras.nombre", ondelete="CASCADE"), nullable=False),
+    sa.Column("raza", sa.String(50)),
+    sa.Column("latitud", sa.Numeric(9, 6)),
+    sa.Column("longitud", sa.Numeric(9, 6)),
+    sa.Column("path_imagen", sa.String(255), nullable=False),
+    sa.Column("fecha", sa.TIMESTAMP, server_default=sa.func.current_timestamp())
+)
+
+
+def upgrade(conn):
+    metadata.create_all(conn, checkfirst=True)
+
+
+def downgrade(conn):
+    metadata.drop_all(conn, checkfirst=True)
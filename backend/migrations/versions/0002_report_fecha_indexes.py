@@ -0,0 +1,21 @@
+"""Índices compuestos (raza, fecha) y (protectora, fecha) de los reportes.
+
+Sirven las consultas de coincidencias por raza (las más recientes primero)
+y los listados de cada protectora sin recorrer la tabla completa.
+"""
+from backend.migrations.runner import create_index, drop_index
+
+revision = "0002"
+down_revision = "0001"
+
+
+def upgrade(conn):
+    create_index(conn, "ix_mascotas_perdidas_raza_fecha", "mascotas_perdidas", "raza", "fecha")
+    create_index(conn, "ix_mascotas_acogidas_raza_fecha", "mascotas_acogidas", "raza", "fecha")
+    create_index(conn, "ix_mascotas_acogidas_protectora_fecha", "mascotas_acogidas", "protectora", "fecha")
+
+
+def downgrade(conn):
+    drop_index(conn, "ix_mascotas_acogidas_protectora_fecha", "mascotas_acogidas")
+    drop_index(conn, "ix_mascotas_acogidas_raza_fecha", "mascotas_acogidas")
+    drop_index(conn, "ix_mascotas_perdidas_raza_fecha", "mascotas_perdidas")
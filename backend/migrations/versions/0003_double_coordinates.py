@@ -0,0 +1,25 @@
+"""Latitud y longitud como DOUBLE NOT NULL en lugar de DECIMAL(9,6).
+
+El driver devuelve los DECIMAL como ``Decimal`` y cada fila se convertía
+con ``float()``. En SQLite las columnas ya son REAL y no hay nada que hacer.
+"""
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+
+TABLES = ("mascotas_perdidas", "mascotas_acogidas")
+
+
+def upgrade(conn):
+    if conn.dialect.name != "mysql":
+        return
+    for table in TABLES:
+        conn.execute(sa.text(f"ALTER TABLE {table} MODIFY latitud DOUBLE NOT NULL, MODIFY longitud DOUBLE NOT NULL"))
+
+
+def downgrade(conn):
+    if conn.dialect.name != "mysql":
+        return
+    for table in TABLES:
+        conn.execute(sa.text(f"ALTER TABLE {table} MODIFY latitud DECIMAL(9,6), MODIFY longitud DECIMAL(9,6)"))
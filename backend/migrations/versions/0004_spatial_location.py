@@ -0,0 +1,36 @@
+"""Columna POINT ``ubicacion`` con índice SPATIAL (solo MySQL).
+
+Es una columna generada STORED a partir de (longitud, latitud) con SRID 0:
+la base de datos la mantiene sola y las consultas por viewport de
+/shelter/maps usan el índice R-tree. SQLite no tiene tipos espaciales y
+sigue filtrando por el índice (latitud, longitud).
+"""
+import sqlalchemy as sa
+
+from backend.migrations.runner import create_index, drop_index, has_column
+
+revision = "0004"
+down_revision = "0003"
+
+TABLES = ("mascotas_perdidas", "mascotas_acogidas")
+
+
+def upgrade(conn):
+    if conn.dialect.name != "mysql":
+        return
+    for table in TABLES:
+        if not has_column(conn, table, "ubicacion"):
+            conn.execute(sa.text(
+                f"ALTER TABLE {table} ADD COLUMN ubicacion POINT "
+                f"GENERATED ALWAYS AS (POINT(longitud, latitud)) STORED NOT NULL SRID 0"
+            ))
+        create_index(conn, f"ix_{table}_ubicacion", table, "ubicacion", mysql_prefix="SPATIAL")
+
+
+def downgrade(conn):
+    if conn.dialect.name != "mysql":
+        return
+    for table in TABLES:
+        drop_index(conn, f"ix_{table}_ubicacion", table)
+        if has_column(conn, table, "ubicacion"):
+            conn.execute(sa.text(f"ALTER TABLE {table} DROP COLUMN ubicacion"))
@@ -0,0 +1,42 @@
+"""Tabla ``matches`` con las coincidencias entre reportes de pérdida y de protectora.
+
+Se rellena de forma incremental al llegar cada reporte de protectora y
+``/matches`` la lee sin recalcular distancias. El índice sobre
+``mascotas_perdidas.username`` sirve las lecturas de cada usuario.
+"""
+import sqlalchemy as sa
+
+from backend.migrations.runner import create_index, drop_index
+
+revision = "0005"
+down_revision = "0004"
+
+metadata = sa.MetaData()
+
+# Tablas referenciadas, solo para resolver las claves foráneas
+sa.Table("mascotas_perdidas", metadata, sa.Column("id", sa.Integer, primary_key=True))
+sa.Table("mascotas_acogidas", metadata, sa.Column("id", sa.Integer, primary_key=True))
+
+matches = sa.Table(
+    "matches", metadata,
+    sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+    sa.Column("perdido_id", sa.Integer, sa.ForeignKey("mascotas_perdidas.id", ondelete="CASCADE"), nullable=False),
+    sa.Column("acogido_id", sa.Integer, sa.ForeignKey("mascotas_acogidas.id", ondelete="CASCADE"), nullable=False),
+    sa.Column("distancia_km", sa.Double, nullable=False),
+    sa.Column("similitud", sa.Double),
+    sa.Column("puntuacion", sa.Double, nullable=False),
+    sa.Column("fecha", sa.DateTime),
+    sa.UniqueConstraint("perdido_id", "acogido_id", name="uq_matches_perdido_acogido"),
+    sa.Index("ix_matches_perdido_id", "perdido_id"),
+    sa.Index("ix_matches_acogido_id", "acogido_id")
+)
+
+
+def upgrade(conn):
+    matches.create(conn, checkfirst=True)
+    create_index(conn, "ix_mascotas_perdidas_username", "mascotas_perdidas", "username")
+
+
+def downgrade(conn):
+    drop_index(conn, "ix_mascotas_perdidas_username", "mascotas_perdidas")
+    matches.drop(conn, checkfirst=True)
@@ -0,0 +1,28 @@
+"""Columnas ``path_miniatura`` y ``path_previa`` con las variantes WebP de cada imagen.
+
+Las genera ``backend/storage.py`` al subir la imagen. Los reportes
+anteriores quedan a NULL y el frontend sigue mostrando ``path_imagen``.
+"""
+import sqlalchemy as sa
+
+from backend.migrations.runner import has_column
+
+revision = "0006"
+down_revision = "0005"
+
+TABLES = ("mascotas_perdidas", "mascotas_acogidas")
+COLUMNS = ("path_miniatura", "path_previa")
+
+
+def upgrade(conn):
+    for table in TABLES:
+        for column in COLUMNS:
+            if not has_column(conn, table, column):
+                conn.execute(sa.text(f"ALTER TABLE {table} ADD COLUMN {column} VARCHAR(255)"))
+
+
+def downgrade(conn):
+    for table in TABLES:
+        for column in COLUMNS:
+            if has_column(conn, table, column):
+                conn.execute(sa.text(f"ALTER TABLE {table} DROP COLUMN {column}"))
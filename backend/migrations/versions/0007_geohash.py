@@ -0,0 +1,61 @@
+"""Columna ``geohash`` de los reportes, sus índices y el índice (latitud, longitud).
+
+El ORM rellena ``geohash`` al insertar, pero las filas anteriores quedan
+a NULL y las búsquedas por radio las descartarían, así que se calcula
+aquí con ``geohash_encode(latitud, longitud)`` por lotes.
+"""
+import sqlalchemy as sa
+
+from backend.migrations.runner import create_index, drop_index, has_column
+from backend.utils.geo import geohash_encode
+
+revision = "0007"
+down_revision = "0006"
+
+BATCH_SIZE = 1000
+
+INDEXES = (
+    ("ix_mascotas_perdidas_geohash", "mascotas_perdidas", ("geohash",)),
+    ("ix_mascotas_perdidas_lat_lon", "mascotas_perdidas", ("latitud", "longitud")),
+    ("ix_mascotas_acogidas_geohash", "mascotas_acogidas", ("geohash",)),
+    ("ix_mascotas_acogidas_raza_geohash", "mascotas_acogidas", ("raza", "geohash")),
+    ("ix_mascotas_acogidas_protectora_lat_lon", "mascotas_acogidas", ("protectora", "latitud", "longitud")),
+)
+
+
+def backfill(conn, table):
+    """Calcula ``geohash`` de las filas que no lo tienen. Devuelve cuántas se han actualizado."""
+    reports = sa.table(table, sa.column("id"), sa.column("latitud"), sa.column("longitud"), sa.column("geohash"))
+    pending = (sa.select(reports.c.id, reports.c.latitud, reports.c.longitud)
+               .where(reports.c.geohash.is_(None), reports.c.latitud.is_not(None), reports.c.longitud.is_not(None))
+               .order_by(reports.c.id))
+    update = reports.update().where(reports.c.id == sa.bindparam("b_id")).values(geohash=sa.bindparam("b_geohash"))
+
+    updated = 0
+    last_id = None
+    while True:
+        query = pending if last_id is None else pending.where(reports.c.id > last_id)
+        rows = conn.execute(query.limit(BATCH_SIZE)).all()
+        if not rows:
+            return updated
+        conn.execute(update, [{"b_id": row.id, "b_geohash": geohash_encode(row.latitud, row.longitud)}
+                              for row in rows])
+        updated += len(rows)
+        last_id = rows[-1].id
+
+
+def upgrade(conn):
+    for table in ("mascotas_perdidas", "mascotas_acogidas"):
+        if not has_column(conn, table, "geohash"):
+            conn.execute(sa.text(f"ALTER TABLE {table} ADD COLUMN geohash VARCHAR(12)"))
+        backfill(conn, table)
+    for name, table, columns in INDEXES:
+        create_index(conn, name, table, *columns)
+
+
+def downgrade(conn):
+    for name, table, _ in reversed(INDEXES):
+        drop_index(conn, name, table)
+    for table in ("mascotas_perdidas", "mascotas_acogidas"):
+        if has_column(conn, table, "geohash"):
+            conn.execute(sa.text(f"ALTER TABLE {table} DROP COLUMN geohash"))
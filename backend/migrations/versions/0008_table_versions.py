@@ -0,0 +1,36 @@
+"""Tabla ``versiones_tablas`` con una versión por tabla de reportes.
+
+La incrementa el ORM en cada alta, edición o baja (``track_table_versions``
+en ``backend/http_cache.py``) y forma parte de la huella de /shelter/maps,
+de modo que una edición en el sitio también invalida ETags y cachés.
+"""
+from datetime import datetime, timezone
+
+import sqlalchemy as sa
+
+revision = "0008"
+down_revision = "0007"
+
+TABLES = ("mascotas_perdidas", "mascotas_acogidas")
+
+metadata = sa.MetaData()
+
+table_versions = sa.Table(
+    "versiones_tablas", metadata,
+    sa.Column("tabla", sa.String(64), primary_key=True),
+    sa.Column("version", sa.BigInteger, nullable=False),
+    sa.Column("modificada", sa.DateTime, nullable=False)
+)
+
+
+def upgrade(conn):
+    table_versions.create(conn, checkfirst=True)
+    existing = set(conn.execute(sa.select(table_versions.c.tabla)).scalars())
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    rows = [{"tabla": table, "version": 0, "modificada": now} for table in TABLES if table not in existing]
+    if rows:
+        conn.execute(table_versions.insert(), rows)
+
+
+def downgrade(conn):
+    table_versions.drop(conn, checkfirst=True)
@@ -1,9 +1,7 @@
-from backend.inference.efficientnet_v2_s import EfficientNetV2
-from pathlib import Path
+# torch y OpenCV se importan al predecir: importar este módulo no carga el stack de ML
 
-import numpy as np
-import torch
-import cv2
+# Salida del average pooling de EfficientNetV2-S, usada como embedding
+EMBEDDING_DIM = 1280
 
 IDX_TO_CLASSNAME = {
     0: "beagle",
@@ -26,16 +24,39 @@ IDX_TO_CLASSNAME = {
     17: "spaniel",
 }
 
-def predict(model, image_path, device):
+def load_image(source):
+    from backend.inference.preprocessing import preprocess
+    return preprocess(source)
+
+def predict_batch(model, images, device, return_embeddings=False):
+    import torch
+    with torch.inference_mode():
+        batch = torch.stack(images).to(device)
+        embeddings = None
+        if return_embeddings and hasattr(model, "forward_with_embedding"):
+            logits, features = model.forward_with_embedding(batch)
+            embeddings = features.float().cpu().numpy()
+        else:
+            logits = model(batch)
+        predicted_class_idxs = logits.softmax(dim=1).argmax(dim=1).tolist()
+    categories = [IDX_TO_CLASSNAME[idx] for idx in predicted_class_idxs]
+    if return_embeddings:
+        return categories, embeddings
+    return categories
+
+def predict(model, source, device, batcher=None, return_embedding=False):
+    """Clase predicha (``str | None``); con ``return_embedding`` devuelve ``(clase, embedding | None)``.
+
+    ``source`` es la ruta de la imagen o sus bytes ya leídos (se decodifican en memoria).
+    """
+    image = load_image(source)
+    if image is None:
+        return (None, None) if return_embedding else None
+    if batcher is not None:
+        return batcher.submit(image, return_embedding=return_embedding).result()
     model.eval()
     model.to(device)
-    with torch.inference_mode():
-        image = cv2.imread(str(image_path), cv2.IMREAD_COLOR_RGB)
-        if image is None:
-            return None
-        image = image.transpose(2, 0, 1).astype(np.float32)
-        image /= 255.0
-        image_tensor = torch.from_numpy(image).unsqueeze(0).to(device)
-        logits = model(image_tensor)
-        predicted_class_idx = logits.softmax(dim=1).argmax(dim=1).item()
-    return IDX_TO_CLASSNAME[predicted_class_idx]
\ No newline at end of file
+    if return_embedding:
+        categories, embeddings = predict_batch(model, [image], device, return_embeddings=True)
+        return categories[0], None if embeddings is None else embeddings[0]
+    return predict_batch(model, [image], device)[0]
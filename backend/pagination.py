@@ -0,0 +1,58 @@
+import json
+
+from flask import Response, stream_with_context
+
+MAX_PAGE_SIZE = 1000
+STREAM_CHUNK_ROWS = 500
+_EXHAUSTED = "end"
+
+
+def decode_cursor(cursor, n_lists):
+    """Cursor opaco ``"<id>:<id>"`` -> último id servido de cada lista (None si ya terminó)."""
+    if not cursor:
+        return [0] * n_lists
+    parts = cursor.split(":")
+    if len(parts) != n_lists:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    positions = [None if part == _EXHAUSTED else int(part) for part in parts]
+    if any(position is not None and position < 0 for position in positions):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return positions
+
+
+def encode_cursor(positions):
+    if all(position is None for position in positions):
+        return None
+    return ":".join(_EXHAUSTED if position is None else str(position) for position in positions)
+
+
+def parse_page_size(value):
+    limit = int(value)
+    if not 0 < limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    return limit
+
+
+def keyset_page(query, model, after_id, limit):
+    """Página de hasta ``limit`` filas con id > ``after_id``, y el id desde el que seguir (None si no hay más)."""
+    if after_id is None:
+        return [], None
+    rows = query.filter(model.id > after_id).order_by(model.id).limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, rows[-1].id
+    return rows, None
+
+
+def ndjson_response(sections):
+    """Respuesta NDJSON que recorre cada ``(tipo, query, serializer)`` con un cursor de servidor.
+
+    ``yield_per`` activa ``stream_results``, de modo que el driver no carga
+    la tabla completa en memoria y cada fila se envía según se lee.
+    """
+    def generate():
+        for tipo, query, serialize in sections:
+            for row in query.yield_per(STREAM_CHUNK_ROWS):
+                yield json.dumps({"tipo": tipo, **serialize(row)}) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
@@ -0,0 +1,130 @@
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+# Bloque de lectura para calcular el hash de ficheros grandes (best.pth)
+HASH_CHUNK_BYTES = 1 << 20
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_hash(path: str | Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_BYTES):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class PredictionCache:
+    """Predicciones por hash del contenido subido y versión del modelo.
+
+    Un LRU en memoria (``max_entries``) y, si se indica ``disk_path``, una
+    segunda capa en SQLite que sobrevive a reinicios. Cada entrada guarda
+    la raza, el embedding (si lo hay) y la ruta estática del fichero ya
+    almacenado, que se reutiliza para no duplicar la imagen.
+    """
+
+    def __init__(self, model_version: str, max_entries: int = 1024, disk_path: str | Path | None = None):
+        self.model_version = model_version
+        self.max_entries = max_entries
+        self.disk_path = Path(disk_path) if disk_path is not None else None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+
+        if self.disk_path is not None:
+            self.disk_path.parent.mkdir(parents=True, exist_ok=True)
+            with self._connect() as conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS predictions ("
+                    "key TEXT PRIMARY KEY, raza TEXT NOT NULL, embedding BLOB, path_imagen TEXT NOT NULL)"
+                )
+
+    @contextmanager
+    def _connect(self):
+        # ``with conn`` solo confirma o deshace la transacción; la conexión se cierra aquí
+        conn = sqlite3.connect(self.disk_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _key(self, digest):
+        return f"{self.model_version}:{digest}"
+
+    def _remember(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def peek(self, digest: str) -> dict | None:
+        """Como ``get`` pero sin actualizar los contadores."""
+        key = self._key(digest)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+        if self.disk_path is None:
+            return None
+
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT raza, embedding, path_imagen FROM predictions WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        raza, embedding, path_imagen = row
+        entry = {
+            "raza": raza,
+            "embedding": np.frombuffer(embedding, dtype=np.float32) if embedding is not None else None,
+            "path_imagen": path_imagen
+        }
+        with self._lock:
+            self.disk_hits += 1
+            self._remember(key, entry)
+        return entry
+
+    def get(self, digest: str) -> dict | None:
+        entry = self.peek(digest)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return entry
+
+    def put(self, digest: str, raza: str, path_imagen: str, embedding=None):
+        if embedding is not None:
+            embedding = np.asarray(embedding, dtype=np.float32)
+        key = self._key(digest)
+        with self._lock:
+            self._remember(key, {"raza": raza, "embedding": embedding, "path_imagen": path_imagen})
+        if self.disk_path is not None:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO predictions (key, raza, embedding, path_imagen) VALUES (?, ?, ?, ?)",
+                    (key, raza, embedding.tobytes() if embedding is not None else None, path_imagen)
+                )
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "entries": len(self._entries)
+            }
@@ -0,0 +1,86 @@
+import threading
+import time
+
+from backend.batching import MicroBatcher
+from backend.model import predict_batch
+from backend.utils.logger import setup_logger
+
+logger = setup_logger()
+
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+
+class InferenceProvider:
+    """Carga el motor de inferencia en segundo plano y lo calienta.
+
+    torch y el motor se importan dentro del hilo de carga, de modo que
+    crear la app no paga su coste. Tras cargar se ejecutan inferencias
+    sobre lotes ficticios (tamaño 1 y ``batch_max_size``) para que la
+    primera petición real no pague la inicialización perezosa de kernels,
+    memoria o ``torch.compile``.
+    """
+
+    def __init__(self, engine="eager", device=None, batch_max_size=1, batch_max_wait_ms=5, warmup=True, loader=None):
+        self.engine = engine
+        self.batch_max_size = batch_max_size
+        self.batch_max_wait_ms = batch_max_wait_ms
+        self.warmup = warmup
+        self.model = None
+        self.device = device
+        self.batcher = None
+        self.status = LOADING
+        self.error = None
+        self.timings: dict[str, float] = {}
+        self._loader = loader
+        self._ready = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._load, daemon=True, name="model-loader")
+        self._thread.start()
+        return self
+
+    def _load(self):
+        try:
+            start = time.perf_counter()
+            import torch
+            from backend.inference.engines import load_engine
+            self.timings["import_s"] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            device = torch.device(self.device or ("cuda" if torch.cuda.is_available() else "cpu"))
+            model = (self._loader or load_engine)(self.engine, device=device)
+            self.timings["load_s"] = time.perf_counter() - start
+
+            if self.warmup:
+                start = time.perf_counter()
+                for size in sorted({1, self.batch_max_size}):
+                    predict_batch(model, [torch.rand(3, 224, 224) for _ in range(size)], device,
+                                  return_embeddings=True)
+                self.timings["warmup_s"] = time.perf_counter() - start
+
+            if self.batch_max_size > 1:
+                self.batcher = MicroBatcher(model, device, max_batch_size=self.batch_max_size,
+                                            max_wait_ms=self.batch_max_wait_ms)
+            self.model, self.device = model, device
+            self.status = READY
+            logger.info(
+                f"MODEL_READY | engine={self.engine} | device={device} | "
+                + " | ".join(f"{stage}={duration:.2f}s" for stage, duration in self.timings.items())
+            )
+        except Exception as e:
+            self.error = str(e)
+            self.status = FAILED
+            logger.error(f"MODEL_LOAD_FAILED | engine={self.engine} | error={str(e)}", exc_info=True)
+        finally:
+            self._ready.set()
+
+    def wait(self, timeout=None) -> bool:
+        """Espera a que termine la carga; ``True`` si el modelo está listo."""
+        self._ready.wait(timeout)
+        return self.status == READY
+
+    def describe(self) -> dict:
+        return {"status": self.status, "engine": self.engine, "timings": self.timings}
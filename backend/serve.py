@@ -0,0 +1,103 @@
+import argparse
+import json
+import os
+import signal
+import socket
+from pathlib import Path
+
+from werkzeug.serving import make_server
+
+from backend.utils.logger import setup_logger
+
+logger = setup_logger()
+
+
+def load_shared_model(engine):
+    """Carga los pesos una vez en el proceso padre y los deja en memoria compartida."""
+    from backend.inference.engines import load_engine
+
+    model = load_engine(engine, device="cpu")
+    # Los workers heredan los tensores por fork; en memoria compartida ninguna escritura los duplica
+    model.share_memory()
+    return model
+
+
+def run_worker(sock, host, port, shared_model, threads, workers):
+    import torch
+
+    # Cada worker limita sus hilos para no competir por los mismos núcleos
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass
+
+    from backend.app import create_app
+    app = create_app('production', shared_model=shared_model, workers=workers)
+    server = make_server(host, port, app, threaded=True, fd=sock.fileno())
+    logger.info(f"SERVE_WORKER_READY | pid={os.getpid()} | threads={threads}")
+    server.serve_forever()
+
+
+def spawn(sock, host, port, shared_model, threads, workers):
+    pid = os.fork()
+    if pid == 0:
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        try:
+            run_worker(sock, host, port, shared_model, threads, workers)
+        finally:
+            os._exit(0)
+    return pid
+
+
+def serve(host, port, workers, threads, engine, job_db_path=None):
+    shared_model = load_shared_model(engine)
+    if job_db_path is not None:
+        from backend.jobs import requeue_interrupted
+        requeue_interrupted(job_db_path)
+
+    # El socket se abre antes del fork: todos los workers aceptan conexiones del mismo puerto
+    sock = socket.create_server((host, port), backlog=128)
+    sock.set_inheritable(True)
+
+    children = {spawn(sock, host, port, shared_model, threads, workers) for _ in range(workers)}
+    logger.info(f"SERVE_START | host={host} | port={port} | workers={workers} | threads={threads} | engine={engine}")
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            os.kill(pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        children.discard(pid)
+        if not stopping:
+            logger.warning(f"SERVE_WORKER_DIED | pid={pid} | status={status}")
+            children.add(spawn(sock, host, port, shared_model, threads, workers))
+    sock.close()
+
+
+if __name__ == "__main__":
+    config = json.loads(Path("config.json").read_text()) if Path("config.json").exists() else {}
+    cpus = os.cpu_count() or 1
+
+    parser = argparse.ArgumentParser(description='Servidor pre-fork con pesos del modelo compartidos')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=config.get('serve_workers', min(cpus, 4)))
+    parser.add_argument('--threads', type=int, default=None, help='Hilos de torch por worker (núcleos / workers)')
+    args = parser.parse_args()
+
+    serve(args.host, args.port, args.workers, args.threads or max(1, cpus // args.workers),
+          config.get('inference_engine', "eager"),
+          job_db_path=config.get('job_db_path', "jobs/jobs.db") if config.get('async_uploads') else None)
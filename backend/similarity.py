@@ -0,0 +1,47 @@
+import numpy as np
+
+from backend.spatial import report_distances
+
+# Candidatos visuales que se recuperan del vector store además de los de la misma raza
+VISUAL_TOP_K = 50
+# Distancia (km) a la que la puntuación de un candidato cae a 1/e de su similitud
+DISTANCE_SCALE_KM = 50.0
+
+
+def rank_visual_matches(model, store, embedding, matches, latitude, longitude, radius_km=None, limit=None,
+                        top_k=VISUAL_TOP_K, distance_scale_km=DISTANCE_SCALE_KM, query=None):
+    """Ordena candidatos por similitud visual combinada con la distancia.
+
+    ``matches`` son pares ``(reporte, distancia_km)`` ya seleccionados (misma
+    raza, radio...). Se les añaden los ``top_k`` reportes más parecidos del
+    ``store`` (restringidos a ``query`` y a ``radius_km`` si se indican) y
+    cada candidato se puntúa con ``similitud * exp(-distancia /
+    distance_scale_km)``. Devuelve tuplas ``(reporte, distancia_km, similitud | None, puntuacion)``.
+    """
+    candidates = {r.id: (r, distance) for r, distance in matches}
+
+    keys, _ = store.search(embedding, top_k)
+    missing = [int(key) for key in keys if int(key) not in candidates]
+    if missing:
+        visual_query = query if query is not None else model.query
+        extra = visual_query.filter(model.id.in_(missing)).all()
+        for r, distance in zip(extra, report_distances(extra, latitude, longitude).tolist()):
+            if radius_km is None or distance <= radius_km:
+                candidates[r.id] = (r, distance)
+
+    if not candidates:
+        return []
+    ids = list(candidates)
+    similarities = store.similarities(embedding, ids)
+    distances = np.array([candidates[i][1] for i in ids], dtype=np.float64)
+    # Los reportes sin embedding (anteriores al vector store) quedan al final
+    scores = np.nan_to_num(similarities, nan=0.0) * np.exp(-distances / distance_scale_km)
+
+    order = np.argsort(-scores, kind="stable")
+    if limit is not None:
+        order = order[:limit]
+    return [
+        (candidates[ids[i]][0], candidates[ids[i]][1],
+         None if np.isnan(similarities[i]) else float(similarities[i]), float(scores[i]))
+        for i in order
+    ]
@@ -0,0 +1,196 @@
+import numpy as np
+from sqlalchemy import Boolean, Column, Computed, Index, and_, func, or_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.schema import CreateColumn
+from sqlalchemy.sql.expression import ColumnElement
+from sqlalchemy.types import UserDefinedType
+
+from backend.utils.geo import (GEOHASH_PRECISION, geohash_encode, geohash_neighbors, geohash_precision_for_radius,
+                               haversine_batch, nearest_k)
+
+# Precisiones de la búsqueda de k vecinos: celdas de ~150 m y, si no bastan, de ~20 km.
+# Si tampoco la celda gruesa tiene ``limit`` reportes la tabla es pequeña y se recorre entera.
+KNN_PRECISIONS = (7, 4)
+
+
+def geohash_default(context):
+    params = context.get_current_parameters()
+    return geohash_encode(params["latitud"], params["longitud"])
+
+
+class Point(UserDefinedType):
+    cache_ok = True
+
+    def get_col_spec(self, **kw):
+        return "POINT"
+
+
+def location_column():
+    """Columna ``ubicacion`` POINT(longitud, latitud) generada por MySQL (migración 0004).
+
+    El ORM no la lee ni la escribe (``exclude_properties``); solo existe para
+    el DDL y para los filtros espaciales. En otros dialectos no se crea.
+    """
+    return Column("ubicacion", Point(), Computed("POINT(longitud, latitud)", persisted=True), nullable=False,
+                  info={"dialects": ("mysql",), "srid": 0})
+
+
+def location_index(table_name):
+    return Index(f"ix_{table_name}_ubicacion", "ubicacion", mysql_prefix="SPATIAL").ddl_if(dialect="mysql")
+
+
+@compiles(CreateColumn)
+def _create_column(element, compiler, **kw):
+    column = element.element
+    dialects = column.info.get("dialects")
+    if dialects is not None and compiler.dialect.name not in dialects:
+        # Devolver None omite la columna del CREATE TABLE
+        return None
+    text = compiler.visit_create_column(element, **kw)
+    if "srid" in column.info:
+        # MySQL solo usa el índice SPATIAL si la columna declara su SRID
+        text += f" SRID {column.info['srid']}"
+    return text
+
+
+class dialect_case(ColumnElement):
+    """Expresión booleana que se compila como ``mysql`` en MySQL y como ``default`` en el resto."""
+    type = Boolean()
+    inherit_cache = False
+
+    def __init__(self, default, mysql):
+        self.default = default
+        self.mysql = mysql
+
+
+@compiles(dialect_case)
+def _dialect_case_default(element, compiler, **kw):
+    return compiler.process(element.default, **kw)
+
+
+@compiles(dialect_case, "mysql")
+def _dialect_case_mysql(element, compiler, **kw):
+    return compiler.process(element.mysql, **kw)
+
+
+def _cells_filter(model, cells):
+    # Rango [prefijo, prefijo + '~') en lugar de LIKE para que se use el índice también en SQLite.
+    # Las filas sin geohash (anteriores a la migración 0007 y aún sin rellenar) entran siempre
+    # como candidatas: la distancia exacta decide después.
+    return or_(model.geohash.is_(None), *[and_(model.geohash >= cell, model.geohash < cell + "~") for cell in cells])
+
+
+def report_distances(reports, latitude, longitude):
+    """Distancias en km de cada reporte al punto dado, calculadas en bloque con NumPy."""
+    lats = np.fromiter((r.latitud for r in reports), dtype=np.float64, count=len(reports))
+    lons = np.fromiter((r.longitud for r in reports), dtype=np.float64, count=len(reports))
+    return haversine_batch(latitude, longitude, lats, lons)
+
+
+def _within_radius(query, model, latitude, longitude, radius_km):
+    precision = geohash_precision_for_radius(radius_km, latitude)
+    if precision > 0:
+        cells = geohash_neighbors(geohash_encode(latitude, longitude, precision))
+        query = query.filter(_cells_filter(model, cells))
+    reports = query.all()
+    distances = report_distances(reports, latitude, longitude)
+    keep = np.flatnonzero(distances <= radius_km)
+    return [reports[i] for i in keep], distances[keep]
+
+
+def _k_nearest_radius(query, model, latitude, longitude, limit):
+    """Radio que contiene con seguridad a los ``limit`` vecinos más cercanos (None si hay menos)."""
+    center = geohash_encode(latitude, longitude, GEOHASH_PRECISION)
+    for precision in KNN_PRECISIONS:
+        cells = geohash_neighbors(center[:precision])
+        # Solo hacen falta las coordenadas para acotar el radio
+        candidates = query.filter(_cells_filter(model, cells)).with_entities(model.latitud, model.longitud).all()
+        if len(candidates) >= limit:
+            distances = report_distances(candidates, latitude, longitude)
+            return float(np.partition(distances, limit - 1)[limit - 1])
+    return None
+
+
+def nearby_reports(query, model, latitude, longitude, radius_km=None, limit=None):
+    """Reportes de ``query`` con su distancia en km al punto dado.
+
+    Sin ``radius_km`` ni ``limit`` se devuelven todos, sin ordenar. Con
+    alguno de ellos se filtra por las celdas geohash que cubren el radio
+    (índice sobre ``geohash``) y se devuelven ordenados por distancia.
+    """
+    if radius_km is None and limit is None:
+        reports = query.all()
+        return list(zip(reports, report_distances(reports, latitude, longitude).tolist()))
+
+    if radius_km is None:
+        radius_km = _k_nearest_radius(query, model, latitude, longitude, limit)
+    if radius_km is None:
+        reports = query.all()
+        distances = report_distances(reports, latitude, longitude)
+    else:
+        reports, distances = _within_radius(query, model, latitude, longitude, radius_km)
+
+    order = nearest_k(distances, limit if limit is not None else len(reports))
+    return [(reports[i], float(distances[i])) for i in order]
+
+
+def parse_proximity_args(form):
+    """Lee ``radius_km`` y ``limit`` opcionales. Lanza ValueError si no son válidos."""
+    radius_km = form.get("radius_km")
+    limit = form.get("limit")
+    radius_km = float(radius_km) if radius_km else None
+    limit = int(limit) if limit else None
+    if (radius_km is not None and not radius_km > 0) or (limit is not None and limit <= 0):
+        raise ValueError("radius_km and limit must be positive")
+    return radius_km, limit
+
+
+# Por debajo de este zoom /shelter/maps devuelve agregados por celda en lugar de reportes
+CLUSTER_MAX_ZOOM = 11
+CLUSTER_CELLS_PER_TILE = 4
+
+
+def parse_bbox(value):
+    """``"oeste,sur,este,norte"`` (formato ``toBBoxString`` de Leaflet) -> tupla de floats."""
+    west, south, east, north = (float(part) for part in value.split(","))
+    if not (south <= north and west <= east):
+        raise ValueError(f"Invalid bbox: {value}")
+    return west, max(south, -90.0), east, min(north, 90.0)
+
+
+def _bbox_rectangle(model, west, south, east, north):
+    polygon = f"POLYGON(({west} {south}, {east} {south}, {east} {north}, {west} {north}, {west} {south}))"
+    return func.MBRCovers(func.ST_GeomFromText(polygon, 0), model.__table__.c.ubicacion)
+
+
+def bbox_filter(model, bbox):
+    """Filtro de los reportes dentro del viewport.
+
+    En MySQL usa el índice SPATIAL de ``ubicacion``; en el resto de
+    dialectos, rangos sobre ``latitud`` y ``longitud``.
+    """
+    west, south, east, north = bbox
+    lat_filter = model.latitud.between(south, north)
+    if east - west >= 360.0:
+        return lat_filter
+    # Leaflet puede devolver longitudes fuera de [-180, 180) al desplazar el mapa
+    west = (west + 180.0) % 360.0 - 180.0
+    east = (east + 180.0) % 360.0 - 180.0
+    if west <= east:
+        return dialect_case(and_(lat_filter, model.longitud.between(west, east)),
+                            mysql=_bbox_rectangle(model, west, south, east, north))
+    # El viewport cruza el antimeridiano: dos rectángulos
+    return dialect_case(and_(lat_filter, or_(model.longitud >= west, model.longitud <= east)),
+                        mysql=or_(_bbox_rectangle(model, west, south, 180.0, north),
+                                  _bbox_rectangle(model, -180.0, south, east, north)))
+
+
+def cluster_reports(query, model, zoom):
+    """Agrega en el servidor los reportes de ``query`` en una rejilla cuyo tamaño depende del zoom."""
+    cell = 360.0 / (2 ** max(zoom, 0)) / CLUSTER_CELLS_PER_TILE
+    lat_cell = func.floor(model.latitud / cell).label("celda_lat")
+    lon_cell = func.floor(model.longitud / cell).label("celda_lon")
+    rows = (query.with_entities(lat_cell, lon_cell, func.count(model.id), func.avg(model.latitud), func.avg(model.longitud))
+            .group_by(lat_cell, lon_cell)
+            .all())
+    return [{"latitud": float(lat), "longitud": float(lon), "count": count} for _, _, count, lat, lon in rows]
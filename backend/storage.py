@@ -0,0 +1,220 @@
+import os
+import tempfile
+from io import BytesIO
+from pathlib import Path
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from backend.prediction_cache import content_hash
+from backend.utils.logger import setup_logger
+
+logger = setup_logger()
+
+# Variantes WebP que se generan al subir cada imagen: nombre -> lado mayor en píxeles
+IMAGE_VARIANTS = {"miniatura": 192, "previa": 768}
+WEBP_QUALITY = 80
+# Esfuerzo del codificador (0-6): con 2 tarda la mitad que con 4 y el fichero apenas crece (~4 %)
+WEBP_METHOD = 2
+# Píxeles máximos de una imagen subida (40 MP: de sobra para cualquier cámara de móvil)
+MAX_IMAGE_PIXELS = 40_000_000
+ORIGINALS = "originales"
+# Extensión según el formato real de la imagen, no el nombre del fichero subido
+IMAGE_SUFFIXES = {"JPEG": ".jpg", "PNG": ".png", "WEBP": ".webp", "GIF": ".gif", "BMP": ".bmp"}
+# Las claves dependen solo del contenido: las variantes nunca cambian y se pueden cachear sin límite
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class ImageTooLarge(ValueError):
+    def __init__(self, pixels: int | None, max_pixels: int | None):
+        super().__init__(f"{pixels} píxeles (máximo {max_pixels})")
+        self.pixels = pixels
+        self.max_pixels = max_pixels
+
+
+class UnsupportedImage(ValueError):
+    def __init__(self, image_format: str | None):
+        super().__init__(f"Formato no admitido: {image_format or 'no es una imagen'}")
+        self.image_format = image_format
+
+
+def image_key(digest: str, variant: str, suffix: str) -> str:
+    """``<variante>/ab/cd/<sha256><ext>``: dos niveles de directorio para no acumular miles de ficheros en uno."""
+    return f"{variant}/{digest[:2]}/{digest[2:4]}/{digest}{suffix}"
+
+
+class LocalStorage:
+    """Objetos como ficheros bajo ``root``, servidos como estáticos con el prefijo ``url_prefix``."""
+
+    def __init__(self, root: str | Path, url_prefix: str):
+        self.root = Path(root)
+        self.url_prefix = url_prefix.rstrip("/")
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def exists(self, key: str) -> bool:
+        return (self.root / key).exists()
+
+    def put(self, key: str, data: bytes, content_type: str):
+        path = self.root / key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Escritura atómica: dos subidas simultáneas de la misma imagen escriben la misma clave
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def get(self, key: str) -> bytes:
+        return (self.root / key).read_bytes()
+
+    def url(self, key: str) -> str:
+        return f"{self.url_prefix}/{key}"
+
+    def key_for(self, url: str) -> str | None:
+        """Clave del objeto servido en ``url`` (un ``path_imagen``), o None si no es de este almacenamiento."""
+        prefix = f"{self.url_prefix}/"
+        return url.removeprefix(prefix) if url.startswith(prefix) else None
+
+    def local_path(self, key: str) -> Path:
+        return self.root / key
+
+
+class S3Storage:
+    """Objetos en un bucket S3 o compatible (MinIO, R2...) a través de un cliente con la API de boto3.
+
+    Solo se usan ``put_object``, ``get_object`` y ``list_objects_v2``, así
+    que cualquier sustituto local con esos métodos sirve. La inferencia
+    necesita un fichero: ``local_path`` lo descarga a ``cache_dir`` la
+    primera vez y ``put`` ya deja ahí la copia de lo que sube.
+    """
+
+    def __init__(self, client, bucket: str, public_url: str, cache_dir: str | Path):
+        self.client = client
+        self.bucket = bucket
+        self.public_url = public_url.rstrip("/")
+        self.cache = LocalStorage(cache_dir, "")
+
+    def exists(self, key: str) -> bool:
+        response = self.client.list_objects_v2(Bucket=self.bucket, Prefix=key, MaxKeys=1)
+        return any(obj["Key"] == key for obj in response.get("Contents", []))
+
+    def put(self, key: str, data: bytes, content_type: str):
+        self.client.put_object(Bucket=self.bucket, Key=key, Body=data, ContentType=content_type,
+                               CacheControl=IMMUTABLE_CACHE_CONTROL)
+        self.cache.put(key, data, content_type)
+
+    def get(self, key: str) -> bytes:
+        return self.client.get_object(Bucket=self.bucket, Key=key)["Body"].read()
+
+    def url(self, key: str) -> str:
+        return f"{self.public_url}/{key}"
+
+    def key_for(self, url: str) -> str | None:
+        prefix = f"{self.public_url}/"
+        return url.removeprefix(prefix) if url.startswith(prefix) else None
+
+    def local_path(self, key: str) -> Path:
+        if not self.cache.exists(key):
+            self.cache.put(key, self.get(key), "")
+        return self.cache.local_path(key)
+
+
+def make_storage(config: dict, static_root: Path):
+    backend = config.get('storage_backend', "local")
+    if backend == "local":
+        return LocalStorage(static_root / "static" / "media", "static/media")
+    if backend == "s3":
+        try:
+            import boto3
+        except ImportError as e:
+            raise RuntimeError("El almacenamiento 's3' requiere boto3 (pip install petracker[s3])") from e
+        client = boto3.client("s3", endpoint_url=config.get('s3_endpoint_url'))
+        return S3Storage(client, config['s3_bucket'], config['s3_public_url'],
+                         config.get('storage_cache_path', "media_cache"))
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+
+def make_variants(image: Image.Image, variants: dict, quality: int = WEBP_QUALITY) -> dict:
+    """WebP de cada ``nombre -> lado mayor`` de ``variants``, decodificando la imagen una sola vez."""
+    # Los JPEG se decodifican ya reducidos (DCT a 1/2, 1/4 u 1/8) si la variante mayor lo permite
+    scale = max(variants.values()) / max(image.size)
+    image.draft("RGB", (round(image.width * scale), round(image.height * scale)))
+    # Respeta la orientación EXIF de las fotos de móvil
+    base = ImageOps.exif_transpose(image)
+    base = base.convert("RGBA" if base.mode in ("RGBA", "LA", "P") else "RGB")
+
+    encoded = {}
+    # De mayor a menor: cada variante se reduce desde la anterior; thumbnail() nunca amplía
+    for name, size in sorted(variants.items(), key=lambda item: -item[1]):
+        base = base.copy()
+        base.thumbnail((size, size), Image.Resampling.LANCZOS)
+        buffer = BytesIO()
+        base.save(buffer, format="WEBP", quality=quality, method=WEBP_METHOD)
+        encoded[name] = buffer.getvalue()
+    return encoded
+
+
+class ImageStore:
+    """Imágenes subidas con direcciones de contenido y variantes WebP generadas al subirlas.
+
+    La clave de cada fichero es el SHA-256 de los bytes originales, así que
+    dos subidas nunca colisionan y una imagen repetida (de cualquier cuenta)
+    se guarda una sola vez. El original se escribe el último: si existe, la
+    subida anterior ya terminó y no hay nada que generar.
+    """
+
+    def __init__(self, backend, variants: dict = IMAGE_VARIANTS, quality: int = WEBP_QUALITY,
+                 max_pixels: int | None = MAX_IMAGE_PIXELS):
+        self.backend = backend
+        self.variants = variants
+        self.quality = quality
+        self.max_pixels = max_pixels
+
+    def save(self, data: bytes, filename: str, digest: str | None = None) -> dict:
+        """Guarda ``data`` y devuelve ``path_imagen``, ``path_<variante>``, ``key`` y ``file_path`` (local).
+
+        Lanza ``ImageTooLarge`` antes de escribir ni decodificar nada si la
+        cabecera declara más de ``max_pixels`` píxeles, y ``UnsupportedImage``
+        si no es una imagen de ``IMAGE_SUFFIXES``: se sirven desde el propio
+        origen, así que nunca se guarda un HTML o un SVG subido como imagen.
+        """
+        digest = digest or content_hash(data)
+        try:
+            # Solo lee la cabecera; la imagen se decodifica si hay que generar variantes
+            image = Image.open(BytesIO(data))
+        except Image.DecompressionBombError:
+            # Pillow ya la rechaza por encima de 2 * Image.MAX_IMAGE_PIXELS
+            raise ImageTooLarge(None, self.max_pixels)
+        except (UnidentifiedImageError, OSError):
+            raise UnsupportedImage(None)
+        if image.format not in IMAGE_SUFFIXES:
+            raise UnsupportedImage(image.format)
+        suffix = IMAGE_SUFFIXES[image.format]
+        if self.max_pixels is not None:
+            pixels = image.width * image.height
+            if pixels > self.max_pixels:
+                raise ImageTooLarge(pixels, self.max_pixels)
+
+        key = image_key(digest, ORIGINALS, suffix)
+        variant_keys = {name: image_key(digest, name, ".webp") for name in self.variants}
+        if self.backend.exists(key):
+            # Ya subida (por esta u otra cuenta): solo se comprueba qué variantes se generaron
+            variant_keys = {name: k if self.backend.exists(k) else None for name, k in variant_keys.items()}
+        else:
+            variants = {}
+            try:
+                variants = make_variants(image, self.variants, self.quality)
+            except (OSError, ValueError) as e:
+                logger.warning(f"STORAGE_VARIANTS_FAIL | key={key} | error={e}")
+            for name in self.variants:
+                if name in variants:
+                    self.backend.put(variant_keys[name], variants[name], "image/webp")
+                else:
+                    variant_keys[name] = None
+            self.backend.put(key, data, Image.MIME.get(image.format, "application/octet-stream"))
+            logger.debug(f"STORAGE_SAVED | key={key} | variants={len(variants)}")
+
+        return {
+            "key": key,
+            "file_path": str(self.backend.local_path(key)),
+            "path_imagen": self.backend.url(key),
+            **{f"path_{name}": self.backend.url(k) if k is not None else None for name, k in variant_keys.items()}
+        }
@@ -0,0 +1,33 @@
+from io import BytesIO
+
+from flask import Request
+
+# Tamaño máximo de una petición de subida (MAX_CONTENT_LENGTH)
+MAX_UPLOAD_MB = 16
+
+
+class UploadRequest(Request):
+    """Request que deja los ficheros del multipart en memoria en lugar de en un temporal.
+
+    Werkzeug vuelca a disco (``SpooledTemporaryFile``) los ficheros de más
+    de 500 KB y luego hay que releerlos. Con ``MAX_CONTENT_LENGTH`` la
+    petición está acotada, así que el cuerpo se lee una sola vez del socket
+    a un ``BytesIO``.
+    """
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return BytesIO()
+
+
+def upload_bytes(file) -> bytes:
+    """Contenido de un ``FileStorage``; de un ``BytesIO`` se toma sin releer el stream.
+
+    Se devuelve ``bytes`` y no ``getbuffer()``: una vista exportada impide
+    cerrar el ``BytesIO`` al terminar la petición. Los ``bytes`` son
+    inmutables, así que el hash, la escritura y ``cv2.imdecode`` (vía
+    ``np.frombuffer``) los comparten sin más copias.
+    """
+    stream = file.stream
+    if isinstance(stream, BytesIO):
+        return stream.getvalue()
+    return stream.read()
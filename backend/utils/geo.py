@@ -0,0 +1,127 @@
+from math import radians, cos, sin, sqrt, atan2
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+
+GEOHASH_PRECISION = 9
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_BASE32_IDX = {c: i for i, c in enumerate(_BASE32)}
+# Tamaño aproximado de celda (alto_km, ancho_km en el ecuador) por precisión
+_CELL_SIZE_KM = {
+    1: (5000.0, 5000.0),
+    2: (625.0, 1250.0),
+    3: (156.0, 156.0),
+    4: (19.5, 39.1),
+    5: (4.89, 4.89),
+    6: (0.61, 1.22),
+    7: (0.153, 0.153),
+    8: (0.0191, 0.0382),
+    9: (0.00477, 0.00477),
+}
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(radians, [float(lat1), float(lon1), float(lat2), float(lon2)])
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+
+    a = sin(dlat/2)**2 + cos(lat1)*cos(lat2)*sin(dlon/2)**2
+    c = 2*atan2(sqrt(a), sqrt(1-a))
+    return EARTH_RADIUS_KM * c
+
+
+def haversine_batch(lat, lon, lats, lons):
+    """Distancias en km desde (lat, lon) a cada punto de ``lats``/``lons`` en una sola pasada."""
+    lat1 = np.radians(float(lat))
+    lon1 = np.radians(float(lon))
+    lat2 = np.radians(np.asarray(lats, dtype=np.float64))
+    lon2 = np.radians(np.asarray(lons, dtype=np.float64))
+
+    a = np.sin((lat2 - lat1) / 2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2)**2
+    return 2 * EARTH_RADIUS_KM * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def nearest_k(distances, k):
+    """Índices de las ``k`` distancias menores, ordenados de menor a mayor."""
+    distances = np.asarray(distances)
+    if k >= distances.size:
+        return np.argsort(distances, kind="stable")
+    idx = np.argpartition(distances, k - 1)[:k]
+    return idx[np.argsort(distances[idx], kind="stable")]
+
+
+def geohash_encode(latitude, longitude, precision=GEOHASH_PRECISION):
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    latitude, longitude = float(latitude), float(longitude)
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        rng, value = (lon_range, longitude) if even else (lat_range, latitude)
+        mid = (rng[0] + rng[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            rng[0] = mid
+        else:
+            bits <<= 1
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return "".join(chars)
+
+
+def geohash_decode(geohash):
+    """Devuelve (lat, lon, error_lat, error_lon) del centro de la celda."""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        value = _BASE32_IDX[char]
+        for shift in range(4, -1, -1):
+            rng = lon_range if even else lat_range
+            mid = (rng[0] + rng[1]) / 2
+            if (value >> shift) & 1:
+                rng[0] = mid
+            else:
+                rng[1] = mid
+            even = not even
+    return ((lat_range[0] + lat_range[1]) / 2, (lon_range[0] + lon_range[1]) / 2,
+            (lat_range[1] - lat_range[0]) / 2, (lon_range[1] - lon_range[0]) / 2)
+
+
+def geohash_neighbors(geohash):
+    """Celda central y sus 8 vecinas (sin duplicados en los polos)."""
+    lat, lon, err_lat, err_lon = geohash_decode(geohash)
+    cells = []
+    for dlat in (-1, 0, 1):
+        for dlon in (-1, 0, 1):
+            n_lat = lat + 2 * err_lat * dlat
+            if not -90.0 < n_lat < 90.0:
+                continue
+            n_lon = (lon + 2 * err_lon * dlon + 180.0) % 360.0 - 180.0
+            cell = geohash_encode(n_lat, n_lon, len(geohash))
+            if cell not in cells:
+                cells.append(cell)
+    return cells
+
+
+def geohash_precision_for_radius(radius_km, latitude):
+    """Mayor precisión cuya celda mide al menos ``radius_km`` en ambas direcciones.
+
+    Con esa precisión, la celda del punto y sus 8 vecinas cubren todo el
+    círculo de radio ``radius_km``. Devuelve 0 si ninguna precisión basta.
+    """
+    # Las celdas se estrechan hacia los polos: se usa la latitud del borde más alejado del ecuador
+    lat_scale = cos(radians(min(abs(float(latitude)) + radius_km / 111.0, 90.0)))
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        height, width = _CELL_SIZE_KM[precision]
+        if min(height, width * lat_scale) >= radius_km:
+            return precision
+    return 0
@@ -0,0 +1,66 @@
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import torch
+from torch.utils.data import DataLoader
+from torchvision.transforms import v2
+
+from backend.inference.augmentation import BatchAugment, collate_uint8
+from backend.inference.shards import ShardedPetDataset, compile_shards
+from benchmarks.bench_dataset import make_dataset
+
+
+def per_sample_transform():
+    """Las transformaciones de train_model.py antes de este cambio, aplicadas muestra a muestra en float32."""
+    return v2.Compose([
+        v2.RandomHorizontalFlip(),
+        v2.RandomVerticalFlip(),
+        v2.ColorJitter(brightness=0.1, contrast=0.1, saturation=0.05, hue=0.02)
+    ])
+
+
+def run(loader, batch_transform, epochs: int) -> tuple[float, float]:
+    """Muestras/s y MB por lote que salen de los workers."""
+    samples = 0
+    batch_mb = 0.0
+    start = time.perf_counter()
+    for _ in range(epochs):
+        for images, _labels in loader:
+            batch_mb = images.numel() * images.element_size() / 1e6
+            if batch_transform is not None:
+                images = batch_transform(images)
+            samples += images.shape[0]
+    return samples / (time.perf_counter() - start), batch_mb
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Aumento de datos por muestra (float32) frente a por lotes (uint8)')
+    parser.add_argument('--images', type=int, default=512)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--workers', type=int, nargs='+', default=[0, 2])
+    parser.add_argument('--epochs', type=int, default=2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data = Path(tmp) / 'data'
+        df = make_dataset(data, args.images, 375, 500)
+        compile_shards(df, data, Path(tmp) / 'shards')
+        print(f'[BENCH] images={args.images} batch_size={args.batch_size} threads={torch.get_num_threads()}')
+
+        for workers in args.workers:
+            cases = [
+                ('por muestra (float32)', DataLoader(ShardedPetDataset(Path(tmp) / 'shards', 'train',
+                                                                       transform=per_sample_transform()),
+                                                     batch_size=args.batch_size, shuffle=True, num_workers=workers,
+                                                     persistent_workers=workers > 0), None),
+                ('por lotes (uint8)    ', DataLoader(ShardedPetDataset(Path(tmp) / 'shards', 'train', uint8=True),
+                                                     batch_size=args.batch_size, shuffle=True, num_workers=workers,
+                                                     collate_fn=collate_uint8, persistent_workers=workers > 0),
+                 BatchAugment()),
+            ]
+            for name, loader, batch_transform in cases:
+                throughput, batch_mb = run(loader, batch_transform, args.epochs)
+                print(f'[BENCH] {name} workers={workers} : {throughput:8.1f} muestras/s | '
+                      f'lote desde el worker={batch_mb:5.1f} MB')
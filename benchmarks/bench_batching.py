@@ -0,0 +1,60 @@
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import torch
+
+from backend.batching import MicroBatcher
+from backend.inference.efficientnet_v2_s import EfficientNetV2
+from backend.model import predict_batch
+
+MODEL_PATH = Path(__file__).parent.parent / 'backend' / 'inference' / 'models' / 'best.pth'
+
+
+def run_clients(request_fn, images, clients):
+    latencies = []
+
+    def client(image):
+        start = time.perf_counter()
+        request_fn(image)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        list(pool.map(client, images))
+    elapsed = time.perf_counter() - start
+    latencies = np.array(latencies) * 1000
+    return len(images) / elapsed, np.percentile(latencies, 50), np.percentile(latencies, 99)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Throughput y latencia de predict() con y sin micro-batching')
+    parser.add_argument('--requests', type=int, default=128)
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--max-batch-size', type=int, default=8)
+    parser.add_argument('--max-wait-ms', type=float, default=5)
+    parser.add_argument('--image-size', type=int, default=224)
+    args = parser.parse_args()
+
+    device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+    model = EfficientNetV2(num_classes=18)
+    if MODEL_PATH.is_file():
+        model.load_state_dict(torch.load(MODEL_PATH, map_location=device))
+    model.to(device)
+    model.eval()
+
+    images = [torch.rand(3, args.image_size, args.image_size) for _ in range(args.requests)]
+    predict_batch(model, images[:1], device)
+
+    print(f'[BENCH] device={device} requests={args.requests} clients={args.clients} '
+          f'max_batch_size={args.max_batch_size} max_wait_ms={args.max_wait_ms}')
+
+    throughput, p50, p99 = run_clients(lambda image: predict_batch(model, [image], device), images, args.clients)
+    print(f'[BENCH] sin batching : {throughput:8.2f} img/s | p50={p50:8.1f} ms | p99={p99:8.1f} ms')
+
+    batcher = MicroBatcher(model, device, max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms)
+    throughput, p50, p99 = run_clients(lambda image: batcher.submit(image).result(), images, args.clients)
+    batcher.close()
+    print(f'[BENCH] con batching : {throughput:8.2f} img/s | p50={p50:8.1f} ms | p99={p99:8.1f} ms')
@@ -0,0 +1,69 @@
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pandas as pd
+from torch.utils.data import DataLoader
+
+from backend.inference.dataset import PetDataset
+from backend.inference.shards import ShardedPetDataset, compile_shards
+
+CLASSES = ["beagle", "bengal", "boxer", "husky", "persian", "poodle"]
+
+
+def make_dataset(root: Path, count: int, height: int, width: int) -> pd.DataFrame:
+    """PNG sintéticos del tamaño típico de dog.ceo / TheCatAPI, como los que guarda populate_data."""
+    rng = np.random.default_rng(0)
+    rows = []
+    for i in range(count):
+        class_name = CLASSES[i % len(CLASSES)]
+        (root / class_name).mkdir(parents=True, exist_ok=True)
+        small = rng.integers(0, 256, size=(height // 16, width // 16, 3), dtype=np.uint8)
+        image = cv2.resize(small, (width, height), interpolation=cv2.INTER_CUBIC)
+        cv2.imwrite(str(root / class_name / f"{i}.png"), image)
+        rows.append((str(i), f"{class_name}/{i}.png", 'train', height, width, class_name))
+    return pd.DataFrame(rows, columns=['id', 'path', 'partition', 'height', 'width', 'class'])
+
+
+def samples_per_second(dataset, batch_size: int, workers: int, epochs: int) -> float:
+    loader = DataLoader(dataset, batch_size=batch_size, shuffle=True, num_workers=workers,
+                        persistent_workers=workers > 0)
+    start = time.perf_counter()
+    for _ in range(epochs):
+        for _images, _labels in loader:
+            pass
+    return epochs * len(dataset) / (time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Muestras/s de PetDataset (PNG) frente a ShardedPetDataset (memmap)')
+    parser.add_argument('--images', type=int, default=512)
+    parser.add_argument('--height', type=int, default=375)
+    parser.add_argument('--width', type=int, default=500)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--workers', type=int, nargs='+', default=[0, 2])
+    parser.add_argument('--epochs', type=int, default=2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data = Path(tmp) / 'data'
+        df = make_dataset(data, args.images, args.height, args.width)
+        start = time.perf_counter()
+        compile_shards(df, data, Path(tmp) / 'shards')
+        compile_s = time.perf_counter() - start
+        png_mb = sum(f.stat().st_size for f in data.rglob('*.png')) / 1e6
+        shard_mb = sum(f.stat().st_size for f in (Path(tmp) / 'shards').glob('*.npy')) / 1e6
+        print(f'[BENCH] images={args.images} size={args.width}x{args.height} png={png_mb:.0f} MB '
+              f'shards={shard_mb:.0f} MB compile={compile_s:.1f}s')
+
+        datasets = [
+            ('PetDataset (PNG)      ', PetDataset(df, data, 'train')),
+            ('ShardedPetDataset     ', ShardedPetDataset(Path(tmp) / 'shards', 'train')),
+        ]
+        for workers in args.workers:
+            for name, dataset in datasets:
+                throughput = samples_per_second(dataset, args.batch_size, workers, args.epochs)
+                print(f'[BENCH] {name} workers={workers} : {throughput:9.1f} muestras/s')
@@ -0,0 +1,79 @@
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import torch
+from torch.utils.data import DataLoader
+
+from backend.inference.dataset import PetDataset
+from backend.inference.engines import ENGINE_FILES, MODELS_PATH, load_engine
+
+DATA_PATH = Path(__file__).parent.parent / 'backend' / 'inference' / 'data'
+
+
+def evaluate(engine, dataloader):
+    correct, total = 0, 0
+    with torch.inference_mode():
+        for images, labels in dataloader:
+            correct += (engine(images).argmax(dim=1) == labels).sum().item()
+            total += len(labels)
+    return correct / total
+
+
+def latency_ms(engine, batch_size, repeats):
+    images = torch.rand(batch_size, 3, 224, 224)
+    timings = []
+    with torch.inference_mode():
+        engine(images)
+        for _ in range(repeats):
+            start = time.perf_counter()
+            engine(images)
+            timings.append((time.perf_counter() - start) * 1000)
+    return np.percentile(timings, 50), np.percentile(timings, 99)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Precisión (partición test de data.csv) frente a latencia por motor')
+    parser.add_argument('--engines', nargs='+', choices=list(ENGINE_FILES), default=list(ENGINE_FILES))
+    parser.add_argument('--models-path', type=Path, default=MODELS_PATH)
+    parser.add_argument('--batch-size', type=int, default=8)
+    parser.add_argument('--repeats', type=int, default=20)
+    parser.add_argument('--threads', type=int, default=None)
+    parser.add_argument('--max-accuracy-drop', type=float, default=0.01,
+                        help='Caída máxima de precisión respecto a eager para elegir motor')
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    csv_path = DATA_PATH / 'data.csv'
+    dataloader = None
+    if csv_path.exists():
+        test_data = PetDataset(pd.read_csv(csv_path), DATA_PATH, 'test')
+        dataloader = DataLoader(test_data, batch_size=args.batch_size)
+    else:
+        print('[BENCH] Sin data.csv: solo se mide la latencia')
+
+    print(f'[BENCH] threads={torch.get_num_threads()} batch_size={args.batch_size}')
+    print(f'{"motor":>12} | {"accuracy":>8} | {"p50 1 img ms":>12} | {f"p50 {args.batch_size} img ms":>13} | {"img/s":>7}')
+    results = {}
+    for name in args.engines:
+        try:
+            engine = load_engine(name, args.models_path)
+        except (FileNotFoundError, RuntimeError) as e:
+            print(f'[BENCH] {name}: omitido ({e})')
+            continue
+        accuracy = evaluate(engine, dataloader) if dataloader is not None else float('nan')
+        single, _ = latency_ms(engine, 1, args.repeats)
+        batched, _ = latency_ms(engine, args.batch_size, args.repeats)
+        results[name] = (accuracy, single)
+        print(f'{name:>12} | {accuracy:8.4f} | {single:12.2f} | {batched:13.2f} | '
+              f'{args.batch_size * 1000 / batched:7.1f}')
+
+    if 'eager' in results and dataloader is not None:
+        budget = results['eager'][0] - args.max_accuracy_drop
+        eligible = [name for name, (accuracy, _) in results.items() if accuracy >= budget]
+        best = min(eligible, key=lambda name: results[name][1])
+        print(f'[BENCH] Motor más rápido con precisión >= {budget:.4f}: {best} '
+              f'("inference_engine": "{best}" en config.json)')
@@ -0,0 +1,36 @@
+import argparse
+import time
+
+import numpy as np
+
+from backend.utils.geo import haversine, haversine_batch, nearest_k
+
+
+def timed(fn, repeats):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Haversine escalar vs vectorizado con NumPy')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--k', type=int, default=20)
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    lat, lon = 40.4168, -3.7038
+    print(f'{"n":>9} | {"escalar ms":>11} | {"numpy ms":>9} | {"numpy+top-k ms":>14} | {"speedup":>7}')
+    for n in args.sizes:
+        lats = rng.uniform(36.0, 43.8, n)
+        lons = rng.uniform(-9.3, 3.3, n)
+        lats_list, lons_list = lats.tolist(), lons.tolist()
+
+        scalar = timed(lambda: [haversine(lat, lon, a, b) for a, b in zip(lats_list, lons_list)], args.repeats)
+        vectorized = timed(lambda: haversine_batch(lat, lon, lats, lons), args.repeats)
+        top_k = timed(lambda: nearest_k(haversine_batch(lat, lon, lats, lons), args.k), args.repeats)
+        print(f'{n:>9} | {scalar:11.2f} | {vectorized:9.2f} | {top_k:14.2f} | {scalar / vectorized:6.1f}x')
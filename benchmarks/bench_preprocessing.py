@@ -0,0 +1,65 @@
+import argparse
+import multiprocessing as mp
+import resource
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+UPLOAD_SIZES = [(480, 640), (1080, 1920), (2268, 4032), (3000, 4000)]
+
+
+def make_jpeg(path: Path, height: int, width: int):
+    rng = np.random.default_rng(0)
+    small = rng.integers(0, 256, size=(max(1, height // 32), max(1, width // 32), 3), dtype=np.uint8)
+    image = cv2.resize(small, (width, height), interpolation=cv2.INTER_CUBIC)
+    cv2.imwrite(str(path), image, [cv2.IMWRITE_JPEG_QUALITY, 90])
+
+
+def legacy_preprocess(path: Path):
+    import torch
+    image = cv2.imread(str(path), cv2.IMREAD_COLOR_RGB)
+    image = image.transpose(2, 0, 1).astype(np.float32)
+    image /= 255.0
+    return torch.from_numpy(image).unsqueeze(0)
+
+
+def new_preprocess(path: Path):
+    from backend.inference.preprocessing import preprocess
+    return preprocess(path).unsqueeze(0)
+
+
+def measure(method: str, path: str, repeats: int, queue):
+    import torch  # noqa: F401  (se importa antes de medir la memoria base)
+    fn = legacy_preprocess if method == 'legacy' else new_preprocess
+    base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(Path(path))
+        latencies.append(time.perf_counter() - start)
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put((float(np.median(latencies)) * 1000, (peak_rss - base_rss) / 1024))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Latencia y RSS pico del preprocesado por tamaño de imagen')
+    parser.add_argument('--repeats', type=int, default=10)
+    args = parser.parse_args()
+
+    ctx = mp.get_context('spawn')
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f'{"size":>11} | {"method":>7} | {"median ms":>9} | {"peak RSS +MB":>12}')
+        for height, width in UPLOAD_SIZES:
+            path = Path(tmp) / f'{width}x{height}.jpg'
+            make_jpeg(path, height, width)
+            for method in ('legacy', 'new'):
+                queue = ctx.Queue()
+                # Un proceso por caso para que ru_maxrss no arrastre picos anteriores
+                proc = ctx.Process(target=measure, args=(method, str(path), args.repeats, queue))
+                proc.start()
+                latency, rss = queue.get()
+                proc.join()
+                print(f'{width:>5}x{height:<5} | {method:>7} | {latency:9.1f} | {rss:12.1f}')
@@ -0,0 +1,90 @@
+import argparse
+import itertools
+import subprocess
+import sys
+import threading
+import time
+
+import cv2
+import numpy as np
+import requests
+
+
+def make_jpeg(size=640):
+    image = np.random.default_rng(0).integers(0, 256, (size, size, 3), dtype=np.uint8)
+    return cv2.imencode('.jpg', image)[1].tobytes()
+
+
+def wait_ready(url, timeout):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(f'{url}/ready', timeout=1).status_code == 200:
+                return True
+        except requests.ConnectionError:
+            pass
+        time.sleep(0.5)
+    return False
+
+
+def load_test(url, user, password, image, clients, duration):
+    latencies = []
+    errors = []
+    stop_at = time.time() + duration
+    counter = itertools.count()
+
+    def client():
+        session = requests.Session()
+        session.post(f'{url}/login', data={'nombre': user, 'password': password})
+        while time.time() < stop_at:
+            # Bytes tras el fin del JPEG: misma imagen, distinto hash, así la caché de predicciones no interviene
+            upload = image + next(counter).to_bytes(8, 'little')
+            start = time.perf_counter()
+            response = session.post(f'{url}/predict', files={'imagen': ('bench.jpg', upload, 'image/jpeg')},
+                                    data={'latitud': '40.4168', 'longitud': '-3.7038', 'limit': '10'})
+            if response.status_code == 200:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors.append(response.status_code)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    latencies = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    return len(latencies) / elapsed, np.percentile(latencies, 50), np.percentile(latencies, 99), len(errors)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Peticiones/s de /predict según el número de workers de serve.py')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=20)
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--user', default='carlos')
+    parser.add_argument('--password', default='1234')
+    parser.add_argument('--ready-timeout', type=float, default=300)
+    args = parser.parse_args()
+
+    url = f'http://127.0.0.1:{args.port}'
+    image = make_jpeg()
+    print(f'[BENCH] clients={args.clients} duration={args.duration}s (usuario {args.user}, requiere la BD de config.json)')
+    print(f'{"workers":>7} | {"req/s":>7} | {"p50 ms":>8} | {"p99 ms":>8} | {"errores":>7}')
+    for workers in args.workers:
+        server = subprocess.Popen([sys.executable, '-m', 'backend.serve', '--host', '127.0.0.1',
+                                   '--port', str(args.port), '--workers', str(workers)])
+        try:
+            if not wait_ready(url, args.ready_timeout):
+                print(f'[BENCH] workers={workers}: el servidor no estuvo listo a tiempo')
+                continue
+            # /ready solo confirma un worker; se da margen al resto para calentar
+            time.sleep(2 * workers)
+            throughput, p50, p99, errors = load_test(url, args.user, args.password, image, args.clients,
+                                                     args.duration)
+            print(f'{workers:>7} | {throughput:7.2f} | {p50:8.1f} | {p99:8.1f} | {errors:>7}')
+        finally:
+            server.terminate()
+            server.wait()
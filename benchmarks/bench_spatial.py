@@ -0,0 +1,84 @@
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from flask import Flask
+from sqlalchemy import insert
+
+from backend.app import db, ShelterReport
+from backend.spatial import nearby_reports
+from backend.utils.geo import geohash_encode, haversine
+
+RAZAS = ["beagle", "boxer", "labrador", "poodle", "husky", "siamese", "persian", "bengal"]
+# Península ibérica aproximada
+LAT_RANGE = (36.0, 43.8)
+LON_RANGE = (-9.3, 3.3)
+
+
+def populate(n_reports, seed=0):
+    rng = random.Random(seed)
+    batch = []
+    for idx in range(n_reports):
+        lat, lon = rng.uniform(*LAT_RANGE), rng.uniform(*LON_RANGE)
+        batch.append({
+            "path_imagen": f"static/shelters_uploads/bench/{idx}.png",
+            "raza": rng.choice(RAZAS),
+            "latitud": lat,
+            "longitud": lon,
+            "protectora": "bench",
+            "geohash": geohash_encode(lat, lon),
+        })
+        if len(batch) == 50_000:
+            db.session.execute(insert(ShelterReport), batch)
+            batch = []
+    if batch:
+        db.session.execute(insert(ShelterReport), batch)
+    db.session.commit()
+
+
+def timed(fn, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        result = fn()
+    return (time.perf_counter() - start) / repeats * 1000, len(result)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Consulta de proximidad: escaneo completo vs índice geohash')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--radius-km', type=float, default=10)
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    lat, lon = 40.4168, -3.7038
+    for n_reports in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            app = Flask(__name__)
+            app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{Path(tmp) / 'bench.db'}"
+            db.init_app(app)
+            with app.app_context():
+                db.create_all()
+                start = time.perf_counter()
+                populate(n_reports)
+                print(f'[BENCH] {n_reports} reportes insertados en {time.perf_counter() - start:.1f}s')
+
+                query = ShelterReport.query.filter_by(raza="labrador")
+
+                def full_scan():
+                    return [(r, d) for r in query.all()
+                            if (d := haversine(lat, lon, r.latitud, r.longitud)) <= args.radius_km]
+
+                cases = [
+                    ("escaneo completo + haversine", full_scan),
+                    (f"geohash radio {args.radius_km:g} km",
+                     lambda: nearby_reports(query, ShelterReport, lat, lon, radius_km=args.radius_km)),
+                    (f"geohash k={args.limit} vecinos",
+                     lambda: nearby_reports(query, ShelterReport, lat, lon, limit=args.limit)),
+                ]
+                for name, fn in cases:
+                    latency, count = timed(fn, args.repeats)
+                    print(f'[BENCH] n={n_reports:>9} | {name:<30} | {latency:10.2f} ms | resultados={count}')
+                db.session.remove()
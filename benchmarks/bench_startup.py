@@ -0,0 +1,47 @@
+import argparse
+import subprocess
+import sys
+import time
+
+
+def import_times(module):
+    """(módulo, propio us, acumulado us) de ``python -X importtime -c 'import module'``."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            capture_output=True, text=True, check=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def top_level_packages(rows):
+    # Coste acumulado de cada paquete de primer nivel (torch, cv2, sqlalchemy...)
+    totals = {}
+    for name, _, cumulative in rows:
+        if '.' not in name:
+            totals[name] = totals.get(name, 0) + cumulative
+    return sorted(totals.items(), key=lambda item: -item[1])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Informe de tiempo de importación del arranque (-X importtime)')
+    parser.add_argument('--module', default='backend.app')
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    rows = import_times(args.module)
+    total = next(cumulative for name, _, cumulative in reversed(rows) if name == args.module)
+    print(f'[BENCH] import {args.module}: {total / 1000:.1f} ms')
+    heavy = [name for name in ('torch', 'torchvision', 'cv2') if any(row[0] == name for row in rows)]
+    print(f'[BENCH] Stack de ML importado al arrancar: {", ".join(heavy) if heavy else "ninguno"}')
+
+    print(f'{"paquete":>28} | {"acumulado ms":>12}')
+    for name, cumulative in top_level_packages(rows)[:args.top]:
+        print(f'{name:>28} | {cumulative / 1000:12.1f}')
+
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', f'from {args.module} import create_app; create_app("testing")'], check=True)
+    print(f'[BENCH] proceso nuevo + create_app("testing"): {(time.perf_counter() - start) * 1000:.1f} ms')
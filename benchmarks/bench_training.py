@@ -0,0 +1,68 @@
+import argparse
+import tempfile
+import time
+
+import torch
+from torch import nn
+from torch.utils.data import DataLoader, TensorDataset
+
+from backend.inference.augmentation import BatchAugment, EvalTransform
+from backend.inference.efficientnet_v2_s import EfficientNetV2
+from backend.inference.metrics import acc_fn
+from backend.inference.trainer import Trainer
+
+# Nombre -> opciones de Trainer (el tamaño de lote de los casos con acumulación se divide entre N)
+CASES = {
+    'fp32': {},
+    'bf16': {'amp_dtype': torch.bfloat16},
+    'channels_last': {'channels_last': True},
+    'bf16+channels_last': {'amp_dtype': torch.bfloat16, 'channels_last': True},
+    'grad_accumulation=4': {'grad_accumulation': 4},
+    'compile': {'compile_model': True},
+}
+
+
+def epoch_time(options: dict, images, labels, batch_size: int, epochs: int) -> tuple[float, float]:
+    """Segundos de la primera época (incluye compilar) y media de las siguientes."""
+    torch.manual_seed(0)
+    accumulation = options.get('grad_accumulation', 1)
+    loader = DataLoader(TensorDataset(images, labels), batch_size=batch_size // accumulation, shuffle=True)
+    model = EfficientNetV2(num_classes=18)
+    with tempfile.TemporaryDirectory() as tmp:
+        trainer = Trainer(epochs=epochs, model=model, model_name='bench', train_dataloader=loader,
+                          val_dataloader=loader, optimizer=torch.optim.Adam(model.parameters(), lr=0.001),
+                          output_path=tmp, loss_fn=nn.CrossEntropyLoss(), acc_fn=acc_fn, device='cpu',
+                          train_transform=BatchAugment(), eval_transform=EvalTransform(), **options)
+        times = []
+        for _ in range(epochs):
+            start = time.perf_counter()
+            trainer.train_one_epoch(loader)
+            times.append(time.perf_counter() - start)
+    return times[0], sum(times[1:]) / max(1, len(times) - 1)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Tiempo por época de Trainer en CPU con cada modo de entrenamiento')
+    parser.add_argument('--samples', type=int, default=64)
+    parser.add_argument('--batch-size', type=int, default=16)
+    parser.add_argument('--image-size', type=int, default=128)
+    parser.add_argument('--epochs', type=int, default=2, help='La primera época se informa aparte (calentamiento)')
+    parser.add_argument('--cases', nargs='+', choices=CASES, default=list(CASES))
+    args = parser.parse_args()
+
+    generator = torch.Generator().manual_seed(0)
+    images = torch.randint(0, 256, (args.samples, 3, args.image_size, args.image_size), dtype=torch.uint8,
+                           generator=generator)
+    labels = torch.randint(0, 18, (args.samples,), generator=generator)
+    print(f'[BENCH] samples={args.samples} batch_size={args.batch_size} image={args.image_size}px '
+          f'threads={torch.get_num_threads()}')
+
+    for name in args.cases:
+        try:
+            first, steady = epoch_time(CASES[name], images, labels, args.batch_size, args.epochs)
+        except Exception as e:
+            # torch.compile necesita un compilador de C++ en CPU
+            print(f'[BENCH] {name:<20}: omitido ({type(e).__name__}: {e})')
+            continue
+        print(f'[BENCH] {name:<20}: primera época {first:7.2f}s | siguientes {steady:7.2f}s | '
+              f'{args.samples / steady:6.1f} muestras/s')
@@ -0,0 +1,100 @@
+import argparse
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import Path
+
+import cv2
+import numpy as np
+from werkzeug import Request
+from werkzeug.test import EnvironBuilder
+
+from backend.inference.preprocessing import preprocess
+from backend.prediction_cache import content_hash
+from backend.storage import ImageStore, LocalStorage
+from backend.uploads import UploadRequest, upload_bytes
+
+
+def make_jpeg(height: int, width: int, seed: int) -> bytes:
+    rng = np.random.default_rng(seed)
+    small = rng.integers(0, 256, size=(max(1, height // 32), max(1, width // 32), 3), dtype=np.uint8)
+    image = cv2.resize(small, (width, height), interpolation=cv2.INTER_CUBIC)
+    return cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, 90])[1].tobytes()
+
+
+def multipart_environ(data: bytes):
+    return EnvironBuilder(method='POST', data={'imagen': (BytesIO(data), 'dog.jpg'), 'latitud': '40.4', 'longitud': '-3.7'}
+                          ).get_environ()
+
+
+def legacy_upload(environ, folder: Path, idx: int):
+    """Antes: werkzeug vuelca el fichero a un temporal, se copia a uploads/ y predict() lo relee de disco."""
+    file = Request(environ).files['imagen']
+    data = file.read()
+    content_hash(data)
+    path = folder / f'dog_{idx}.jpg'
+    path.write_bytes(data)
+    return preprocess(path)
+
+
+def streamed_upload(environ, store: LocalStorage, idx: int):
+    """Ahora: el cuerpo se lee una vez a memoria, se hashea, se escribe y se decodifica desde los mismos bytes."""
+    data = upload_bytes(UploadRequest(environ).files['imagen'])
+    digest = content_hash(data)
+    store.put(f'originales/{digest}.jpg', data, 'image/jpeg')
+    return preprocess(data)
+
+
+def variants_upload(environ, store: ImageStore, idx: int):
+    """Ahora, con las variantes WebP de ImageStore (el flujo completo de /predict sin inferencia)."""
+    data = upload_bytes(UploadRequest(environ).files['imagen'])
+    store.save(data, 'dog.jpg', content_hash(data))
+    return preprocess(data)
+
+
+def run_clients(upload_fn, bodies, clients):
+    latencies = []
+
+    def client(idx):
+        # Cada petición necesita su propio environ: wsgi.input solo se puede leer una vez
+        environ = multipart_environ(bodies[idx])
+        start = time.perf_counter()
+        upload_fn(environ, idx)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        list(pool.map(client, range(len(bodies))))
+    elapsed = time.perf_counter() - start
+    latencies = np.array(latencies) * 1000
+    return len(bodies) / elapsed, np.percentile(latencies, 50), np.percentile(latencies, 99)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Throughput y latencia de la ingesta de subidas concurrentes')
+    parser.add_argument('--uploads', type=int, default=64)
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--height', type=int, default=3024)
+    parser.add_argument('--width', type=int, default=4032)
+    args = parser.parse_args()
+
+    # Contenidos distintos: con el mismo hash el almacén no volvería a escribir
+    bodies = [make_jpeg(args.height, args.width, seed) for seed in range(args.uploads)]
+    mean_mb = np.mean([len(body) for body in bodies]) / 1e6
+    print(f'[BENCH] uploads={args.uploads} clients={args.clients} size={args.width}x{args.height} '
+          f'mean_file={mean_mb:.2f} MB')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_folder = Path(tmp) / 'legacy'
+        legacy_folder.mkdir()
+        local = LocalStorage(Path(tmp) / 'streamed', 'static/media')
+        store = ImageStore(LocalStorage(Path(tmp) / 'variants', 'static/media'))
+        cases = [
+            ('temporal + relectura', lambda environ, idx: legacy_upload(environ, legacy_folder, idx)),
+            ('en memoria         ', lambda environ, idx: streamed_upload(environ, local, idx)),
+            ('en memoria + WebP  ', lambda environ, idx: variants_upload(environ, store, idx)),
+        ]
+        for name, upload_fn in cases:
+            throughput, p50, p99 = run_clients(upload_fn, bodies, args.clients)
+            print(f'[BENCH] {name} : {throughput:8.2f} subidas/s | p50={p50:8.1f} ms | p99={p99:8.1f} ms')
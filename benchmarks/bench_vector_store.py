@@ -0,0 +1,97 @@
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import torch
+
+from backend.inference.efficientnet_v2_s import EfficientNetV2
+from backend.inference.preprocessing import preprocess
+from backend.inference.vector_store import VectorStore
+from backend.model import EMBEDDING_DIM
+
+STATIC = Path(__file__).parent.parent / 'frontend' / 'static'
+MODEL_PATH = Path(__file__).parent.parent / 'backend' / 'inference' / 'models' / 'best.pth'
+
+
+def corpus_embeddings(batch_size):
+    """Embeddings de las imágenes subidas (uploads, shelters_uploads y media/originales) con best.pth."""
+    folders = ('uploads', 'shelters_uploads', 'media/originales')
+    paths = sorted(p for folder in folders for p in (STATIC / folder).rglob('*') if p.is_file())
+    images = [image for image in map(preprocess, paths) if image is not None]
+    if not images or not MODEL_PATH.exists():
+        return None
+    model = EfficientNetV2(num_classes=18)
+    model.load_state_dict(torch.load(MODEL_PATH, map_location='cpu'))
+    model.eval()
+    embeddings = []
+    with torch.inference_mode():
+        for start in range(0, len(images), batch_size):
+            embeddings.append(model.forward_features(torch.stack(images[start:start + batch_size])).numpy())
+    return np.concatenate(embeddings)
+
+
+def synthetic_embeddings(n, rng, clusters=18):
+    # Vectores agrupados alrededor de un centro por clase, como los embeddings reales
+    centers = rng.standard_normal((clusters, EMBEDDING_DIM)).astype(np.float32)
+    labels = rng.integers(0, clusters, n)
+    return centers[labels] + 0.8 * rng.standard_normal((n, EMBEDDING_DIM)).astype(np.float32)
+
+
+def build_store(path, vectors, dtype):
+    store = VectorStore(path, EMBEDDING_DIM, dtype=dtype)
+    with open(store._vectors_file, 'ab') as fv, open(store._keys_file, 'ab') as fk, \
+            open(store._scales_file, 'ab') as fs:
+        # Carga masiva: mismo formato que add(), sin reabrir los ficheros por vector
+        for key, vector in enumerate(vectors):
+            encoded, scale = store._encode(vector)
+            fv.write(encoded.tobytes())
+            if scale is not None:
+                fs.write(scale.tobytes())
+            fk.write(np.int64(key).tobytes())
+    return store
+
+
+def recall_at_k(store, vectors, queries, k):
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    hits = 0
+    for query in queries:
+        exact = set(np.argsort(-(normalized @ (query / np.linalg.norm(query))))[:k].tolist())
+        hits += len(exact & set(store.search(query, k)[0].tolist()))
+    return hits / (k * len(queries))
+
+
+def search_ms(store, queries, k):
+    start = time.perf_counter()
+    for query in queries:
+        store.search(query, k)
+    return (time.perf_counter() - start) * 1000 / len(queries)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Recall y latencia del vector store float16/int8 frente a fp32 exacto')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--queries', type=int, default=50)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--batch-size', type=int, default=16)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    corpus = corpus_embeddings(args.batch_size)
+    datasets = [('uploads', corpus)] if corpus is not None and len(corpus) > args.k else []
+    if not datasets:
+        print('[BENCH] Sin imágenes subidas o sin best.pth: solo se usan embeddings sintéticos')
+    datasets += [(f'sintético {n}', synthetic_embeddings(n, rng)) for n in args.sizes]
+
+    print(f'{"conjunto":>18} | {"dtype":>7} | {"MB":>7} | {f"recall@{args.k}":>9} | {"búsqueda ms":>11}')
+    for name, vectors in datasets:
+        picks = rng.choice(len(vectors), min(args.queries, len(vectors)), replace=False)
+        queries = vectors[picks] + 0.5 * rng.standard_normal((len(picks), EMBEDDING_DIM)).astype(np.float32)
+        for dtype in ('float16', 'int8'):
+            with tempfile.TemporaryDirectory() as tmp:
+                store = build_store(Path(tmp), vectors, dtype)
+                size_mb = sum(f.stat().st_size for f in Path(tmp).iterdir()) / 1e6
+                recall = recall_at_k(store, vectors, queries, args.k)
+                latency = search_ms(store, queries, args.k)
+                print(f'{name:>18} | {dtype:>7} | {size_mb:7.1f} | {recall:9.3f} | {latency:11.2f}')
@@ -0,0 +1,30 @@
+// Funciones compartidas por main.js (usuarios) y shelter.js (protectoras)
+
+// En modo cola el servidor responde 202 con un job_id que se consulta hasta que termina
+async function readResult(response) {
+    if (response.status !== 202) return response.json();
+
+    const { status_url } = await response.json();
+    while (true) {
+        await new Promise(resolve => setTimeout(resolve, 500));
+        const res = await fetch(status_url);
+        if (!res.ok) throw new Error("Error servidor");
+        const job = await res.json();
+        if (job.status === "done") return job.result;
+        if (job.status === "failed") throw new Error(job.error);
+    }
+}
+
+// Miniatura WebP para los popups (srcset elige la previa en pantallas de alta densidad).
+// Los reportes antiguos solo tienen el original; con almacenamiento S3 las rutas ya son URLs absolutas
+function imageUrl(path) {
+    return /^https?:\/\//.test(path) ? path : `/${path}`;
+}
+
+function reportImage(report, width) {
+    if (!report.path_miniatura) return `<img src="${imageUrl(report.path_imagen)}" width="${width}">`;
+    const srcset = report.path_previa
+        ? ` srcset="${imageUrl(report.path_miniatura)} 192w, ${imageUrl(report.path_previa)} 768w" sizes="${width}px"`
+        : "";
+    return `<img src="${imageUrl(report.path_miniatura)}"${srcset} width="${width}" loading="lazy">`;
+}
@@ -134,7 +134,7 @@ document.addEventListener("DOMContentLoaded", function () {
                     Protectora: ${pet.protectora}<br>
                     Distancia: ${pet.distancia_km.toFixed(2)} km<br>
                     Fecha: ${formatDate(pet.timestamp)}<br>
-                    <img src="/${pet.path_imagen}" width="180">
+                    ${reportImage(pet, 180)}
                 `);
         });
 
@@ -148,7 +148,7 @@ document.addEventListener("DOMContentLoaded", function () {
                 Raza: ${data.reporte_usuario.raza}<br>
                 Usuario: ${data.reporte_usuario.username}<br>
                 Fecha: ${formatDate(data.reporte_usuario.fecha)}<br>
-                <img src="/${data.reporte_usuario.path_imagen}" width="180">
+                ${reportImage(data.reporte_usuario, 180)}
             `);
     }
 
@@ -191,7 +191,7 @@ document.addEventListener("DOMContentLoaded", function () {
 
                 if (!response.ok) throw new Error("Error servidor");
 
-                const data = await response.json();
+                const data = await readResult(response);
                 backendData = data;
 
                 // Al recibir datos, usamos el filtro activo (por defecto "Todo")
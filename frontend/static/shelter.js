@@ -35,6 +35,8 @@ document.addEventListener("DOMContentLoaded", function () {
 
     let backendData = null;
     let currentMap = null;
+    let markersLayer = null;
+    let viewportRequest = 0;
     let reportDone = false;
     let currentSpecies = "all";
 
@@ -85,20 +87,56 @@ document.addEventListener("DOMContentLoaded", function () {
         message.style.color = "black";
     }
 
-    function drawMap(data, maxDistance = Infinity) {
-
-        if (currentMap) currentMap.remove();
+    // Crea el mapa una sola vez; los marcadores se repintan en markersLayer
+    function ensureMap(lat, lon, zoom) {
+        if (currentMap) return;
 
-        currentMap = L.map("map").setView(
-            [data.reporte_actual.latitud, data.reporte_actual.longitud],
-            8
-        );
+        currentMap = L.map("map").setView([lat, lon], zoom);
 
         L.tileLayer("https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png", {
             maxZoom: 19,
             attribution: "© OpenStreetMap"
         }).addTo(currentMap);
 
+        markersLayer = L.layerGroup().addTo(currentMap);
+
+        // Tras un reporte se mantiene su resultado; si no, se recarga lo visible
+        currentMap.on("moveend", () => {
+            if (!reportDone) loadViewport().catch(err => console.error("Error cargando el mapa:", err));
+        });
+    }
+
+    function clusterIcon(count, color) {
+        const size = count < 10 ? 30 : count < 100 ? 38 : 46;
+        return L.divIcon({
+            html: `<div class="cluster ${color}">${count}</div>`,
+            className: "",
+            iconSize: [size, size]
+        });
+    }
+
+    function drawMap(data, maxDistance = Infinity) {
+
+        if (!currentMap) {
+            if (!data.reporte_actual) return;
+            ensureMap(data.reporte_actual.latitud, data.reporte_actual.longitud, 8);
+        }
+        markersLayer.clearLayers();
+
+        // ==== AGRUPACIONES (zoom bajo) ====
+        if (data.clusters) {
+            data.clusters.perdidos.forEach(c => {
+                L.marker([c.latitud, c.longitud], { icon: clusterIcon(c.count, "orange") })
+                    .addTo(markersLayer)
+                    .bindPopup(`<b>🐾 ${c.count} mascotas perdidas</b><br>Acerca el mapa para ver el detalle`);
+            });
+            data.clusters.protegidos.forEach(c => {
+                L.marker([c.latitud, c.longitud], { icon: clusterIcon(c.count, "green") })
+                    .addTo(markersLayer)
+                    .bindPopup(`<b>🏥 ${c.count} mascotas protegidas</b><br>Acerca el mapa para ver el detalle`);
+            });
+        }
+
         // ==== ICONOS ====
         const icons = {
             clinic: new L.Icon({ iconUrl: "https://maps.google.com/mapfiles/ms/icons/blue-dot.png", iconSize: [32, 32] }),
@@ -125,8 +163,8 @@ document.addEventListener("DOMContentLoaded", function () {
                 const displayLon = applyJitter(p.longitud);
 
                 L.marker([displayLat, displayLon], { icon: icons["lost" + especie] })
-                    .addTo(currentMap)
-                    .bindPopup(`<b>🐾 Mascota perdida</b><br>Raza: ${p.raza}<br>Usuario: ${p.usuario}<br>${p.distancia_km ? "Distancia: " + p.distancia_km.toFixed(2) + " km<br>" : ""}<br><img src="/${p.path_imagen}" width="150">`);
+                    .addTo(markersLayer)
+                    .bindPopup(`<b>🐾 Mascota perdida</b><br>Raza: ${p.raza}<br>Usuario: ${p.usuario}<br>${p.distancia_km ? "Distancia: " + p.distancia_km.toFixed(2) + " km<br>" : ""}<br>${reportImage(p, 150)}`);
             });
 
         // ==== MASCOTAS PROTEGIDAS / CLÍNICAS ASOCIADAS ====
@@ -140,8 +178,8 @@ document.addEventListener("DOMContentLoaded", function () {
             .forEach(p => {
                 const especie = razas.Perro.includes(p.raza) ? "Dog" : "Cat";
                 L.marker([p.latitud, p.longitud], { icon: icons["shelter" + especie] })
-                    .addTo(currentMap)
-                    .bindPopup(`<b>🏥 Mascota protegida</b><br>Raza: ${p.raza}<br>Protectora: ${p.protectora}<br>${p.distancia_km ? "Distancia: " + p.distancia_km.toFixed(2) + " km<br>" : ""}<br><img src="/${p.path_imagen}" width="150">`);
+                    .addTo(markersLayer)
+                    .bindPopup(`<b>🏥 Mascota protegida</b><br>Raza: ${p.raza}<br>Protectora: ${p.protectora}<br>${p.distancia_km ? "Distancia: " + p.distancia_km.toFixed(2) + " km<br>" : ""}<br>${reportImage(p, 150)}`);
             });
 
             // ==== TU CLÍNICA ====
@@ -149,8 +187,8 @@ document.addEventListener("DOMContentLoaded", function () {
             const especieClinica = razas.Perro.includes(data.reporte_actual.raza) ? "Dog" : "Cat";
 
             L.marker([data.reporte_actual.latitud, data.reporte_actual.longitud], { icon: icons["clinic" + especieClinica] })
-                .addTo(currentMap)
-                .bindPopup(`<b>🏥 Tu protectora</b><br>Raza: ${data.reporte_actual.raza}<br><img src="/${data.reporte_actual.path_imagen}" width="180">`);
+                .addTo(markersLayer)
+                .bindPopup(`<b>🏥 Tu protectora</b><br>Raza: ${data.reporte_actual.raza}<br>${reportImage(data.reporte_actual, 180)}`);
         }
     }
 
@@ -189,12 +227,13 @@ document.addEventListener("DOMContentLoaded", function () {
                 const response = await fetch("/report", { method: "POST", body: formData });
                 if (!response.ok) throw new Error("Error servidor");
 
-                const data = await response.json();
+                const data = await readResult(response);
                 backendData = data;
 
                 reportDone = true;
                 legendClinic.style.display = "block";
 
+                if (currentMap) currentMap.setView([data.reporte_actual.latitud, data.reporte_actual.longitud], 8);
                 drawMap(data);
                 
                 // Activar filtros de distancia
@@ -258,30 +297,85 @@ document.addEventListener("DOMContentLoaded", function () {
 
             if (!backendData) return;
 
-            const activeDistance = document.querySelector(".distance-filter button.active").dataset.km;
-            drawMap(backendData, activeDistance === "all" ? Infinity : parseInt(activeDistance));
+            drawMap(backendData, activeDistance());
         });
     });
 
-    // ===== FETCH DATOS INICIALES =====
-    fetch("/shelter/maps")
-        .then(res => res.json())
-        .then(data => {
-            backendData = {
-                reporte_actual: null,
-                perdidos: data.perdidos,
-                protegidos: data.protegidos
-            };
-
-            // usar primer punto para centrar mapa
-            if (data.protegidos.length > 0) {
-                backendData.reporte_actual = data.protegidos[0];
-            } else if (data.perdidos.length > 0) {
-                backendData.reporte_actual = data.perdidos[0];
+    // ===== FETCH DATOS DE LA VISTA ACTUAL (bbox + zoom, paginado) =====
+    const PAGE_SIZE = 500;
+
+    function activeDistance() {
+        const km = document.querySelector(".distance-filter button.active").dataset.km;
+        return km === "all" ? Infinity : parseInt(km);
+    }
+
+    async function loadViewport() {
+        const requestId = ++viewportRequest;
+        const data = { reporte_actual: null, perdidos: [], protegidos: [], clusters: null };
+        let cursor = null;
+
+        do {
+            const params = new URLSearchParams({
+                bbox: currentMap.getBounds().toBBoxString(),
+                zoom: currentMap.getZoom(),
+                limit: PAGE_SIZE
+            });
+            if (cursor) params.set("cursor", cursor);
+
+            const res = await fetch(`/shelter/maps?${params}`);
+            if (!res.ok) throw new Error("Error servidor");
+            const page = await res.json();
+
+            // Descarta respuestas de una vista que ya no es la actual
+            if (requestId !== viewportRequest) return;
+
+            if (page.clusters) {
+                data.clusters = page.clusters;
+                break;
             }
+            data.protegidos.push(...page.protegidos);
+            data.perdidos.push(...page.perdidos);
+            cursor = page.next_cursor;
+        } while (cursor);
 
-            drawMap(backendData);
-        });
+        backendData = data;
+        drawMap(backendData, activeDistance());
+    }
+
+    async function initMap() {
+        // Un único reporte basta para centrar el mapa; el resto se pide por vista
+        const res = await fetch("/shelter/maps?limit=1");
+        if (!res.ok) throw new Error("Error servidor");
+        const page = await res.json();
+        const first = page.protegidos[0] || page.perdidos[0];
+
+        if (first) {
+            ensureMap(first.latitud, first.longitud, 8);
+        } else {
+            ensureMap(40.4168, -3.7038, 6);
+        }
+        await loadViewport();
+    }
+
+    initMap().catch(err => console.error("Error cargando el mapa:", err));
+
+    // ===== ACTUALIZACIONES EN VIVO (SSE) =====
+    // EventSource reconecta solo y envía Last-Event-ID, así que no se pierden reportes
+    const events = new EventSource("/events");
+
+    function addLiveReport(kind, report) {
+        // Con el resultado de un análisis o con clusters el mapa se recarga aparte
+        if (!backendData || reportDone || backendData.clusters) return;
+        if (!currentMap.getBounds().contains([report.latitud, report.longitud])) return;
+        backendData[kind].push(report);
+        drawMap(backendData, activeDistance());
+    }
+
+    events.addEventListener("perdido", e => addLiveReport("perdidos", JSON.parse(e.data)));
+    events.addEventListener("protegido", e => addLiveReport("protegidos", JSON.parse(e.data)));
+    events.addEventListener("reset", () => {
+        if (currentMap && !reportDone) loadViewport().catch(err => console.error("Error cargando el mapa:", err));
+    });
 
         // Añade un pequeño desvío aleatorio (aprox. 5-10 metros)
     function applyJitter(coord) {
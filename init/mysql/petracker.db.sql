@@ -17,11 +17,20 @@ CREATE TABLE IF NOT EXISTS mascotas_perdidas (
   id INT NOT NULL AUTO_INCREMENT,
   username VARCHAR(50) NOT NULL,
   raza VARCHAR(50),
-  latitud DECIMAL(9,6),
-  longitud DECIMAL(9,6),
+  latitud DOUBLE NOT NULL,
+  longitud DOUBLE NOT NULL,
   path_imagen VARCHAR(255) NOT NULL,
+  path_miniatura VARCHAR(255),
+  path_previa VARCHAR(255),
   fecha TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  geohash VARCHAR(12),
+  ubicacion POINT GENERATED ALWAYS AS (POINT(longitud, latitud)) STORED NOT NULL SRID 0,
   PRIMARY KEY (id),
+  INDEX ix_mascotas_perdidas_geohash (geohash),
+  INDEX ix_mascotas_perdidas_lat_lon (latitud, longitud),
+  INDEX ix_mascotas_perdidas_raza_fecha (raza, fecha),
+  INDEX ix_mascotas_perdidas_username (username),
+  SPATIAL INDEX ix_mascotas_perdidas_ubicacion (ubicacion),
   FOREIGN KEY (username) REFERENCES usuarios(nombre) ON DELETE CASCADE
 );
 
@@ -29,32 +38,76 @@ CREATE TABLE IF NOT EXISTS mascotas_acogidas (
   id INT NOT NULL AUTO_INCREMENT,
   protectora VARCHAR(50) NOT NULL,
   raza VARCHAR(50),
-  latitud DECIMAL(9,6),
-  longitud DECIMAL(9,6),
+  latitud DOUBLE NOT NULL,
+  longitud DOUBLE NOT NULL,
   path_imagen VARCHAR(255) NOT NULL,
+  path_miniatura VARCHAR(255),
+  path_previa VARCHAR(255),
   fecha TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  geohash VARCHAR(12),
+  ubicacion POINT GENERATED ALWAYS AS (POINT(longitud, latitud)) STORED NOT NULL SRID 0,
   PRIMARY KEY (id),
+  INDEX ix_mascotas_acogidas_geohash (geohash),
+  INDEX ix_mascotas_acogidas_raza_geohash (raza, geohash),
+  INDEX ix_mascotas_acogidas_protectora_lat_lon (protectora, latitud, longitud),
+  INDEX ix_mascotas_acogidas_raza_fecha (raza, fecha),
+  INDEX ix_mascotas_acogidas_protectora_fecha (protectora, fecha),
+  SPATIAL INDEX ix_mascotas_acogidas_ubicacion (ubicacion),
   FOREIGN KEY (protectora) REFERENCES protectoras(nombre) ON DELETE CASCADE
 );
 
+CREATE TABLE IF NOT EXISTS matches (
+  id INT NOT NULL AUTO_INCREMENT,
+  perdido_id INT NOT NULL,
+  acogido_id INT NOT NULL,
+  distancia_km DOUBLE NOT NULL,
+  similitud DOUBLE,
+  puntuacion DOUBLE NOT NULL,
+  fecha DATETIME,
+  PRIMARY KEY (id),
+  UNIQUE KEY uq_matches_perdido_acogido (perdido_id, acogido_id),
+  INDEX ix_matches_perdido_id (perdido_id),
+  INDEX ix_matches_acogido_id (acogido_id),
+  FOREIGN KEY (perdido_id) REFERENCES mascotas_perdidas(id) ON DELETE CASCADE,
+  FOREIGN KEY (acogido_id) REFERENCES mascotas_acogidas(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS versiones_tablas (
+  tabla VARCHAR(64) PRIMARY KEY,
+  version BIGINT NOT NULL,
+  modificada DATETIME NOT NULL
+);
+
 INSERT INTO usuarios (nombre, contrasena_hash) VALUES
 ('carlos','1234'),('juan','abcd'),('maria','5678');
 
 INSERT INTO protectoras (nombre, contrasena_hash) VALUES
 ('huellas','4321'),('patas_felices','9876');
 
-INSERT INTO mascotas_perdidas VALUES
-(1,'juan','labrador',40.416775,-3.703790,'static/uploads/juan/labrador1.png','2026-02-04 08:32:36'),
-(2,'juan','siamese',40.418000,-3.700000,'static/uploads/juan/siamese1.png','2026-02-04 08:32:36'),
-(3,'maria','beagle',41.387397,2.168568,'static/uploads/maria/beagle1.png','2026-02-04 08:32:36'),
-(4,'carlos','poodle',37.389092,-5.984459,'static/uploads/carlos/poodle1.png','2026-02-04 08:32:36');
+INSERT INTO mascotas_perdidas (id, username, raza, latitud, longitud, path_imagen, fecha, geohash) VALUES
+(1,'juan','labrador',40.416775,-3.703790,'static/uploads/juan/labrador1.png','2026-02-04 08:32:36','ezjmgtwuz'),
+(2,'juan','siamese',40.418000,-3.700000,'static/uploads/juan/siamese1.png','2026-02-04 08:32:36','ezjmgvcez'),
+(3,'maria','beagle',41.387397,2.168568,'static/uploads/maria/beagle1.png','2026-02-04 08:32:36','sp3e3q755'),
+(4,'carlos','poodle',37.389092,-5.984459,'static/uploads/carlos/poodle1.png','2026-02-04 08:32:36','eyesxy6pp');
+
+INSERT INTO mascotas_acogidas (id, protectora, raza, latitud, longitud, path_imagen, fecha, geohash) VALUES
+(1,'patas_felices','siamese',40.400000,-3.700000,'static/shelters_uploads/patas_felices/mascota1.png','2026-02-04 08:32:36','ezjmgf9ep'),
+(2,'patas_felices','beagle',40.401000,-3.702000,'static/shelters_uploads/patas_felices/mascota2.png','2026-02-04 08:32:36','ezjmgfb2c'),
+(3,'huellas','beagle',41.380000,2.170000,'static/shelters_uploads/huellas/mascota1.png','2026-02-04 08:32:36','sp3e3kupu'),
+(4,'huellas','bengal',41.382000,2.175000,'static/shelters_uploads/huellas/mascota2.png','2026-02-04 08:32:36','sp3e3mrg9'),
+(5,'patas_felices','retriever',38.000000,-4.000000,'static/shelters_uploads/patas_felices/mascota3.png','2026-02-04 08:32:36','eyv0hvxq1');
+
+INSERT INTO versiones_tablas (tabla, version, modificada) VALUES
+('mascotas_perdidas', 0, UTC_TIMESTAMP()),('mascotas_acogidas', 0, UTC_TIMESTAMP());
 
-INSERT INTO mascotas_acogidas VALUES
-(1,'patas_felices','siamese',40.400000,-3.700000,'static/shelters_uploads/patas_felices/mascota1.png','2026-02-04 08:32:36'),
-(2,'patas_felices','beagle',40.401000,-3.702000,'static/shelters_uploads/patas_felices/mascota2.png','2026-02-04 08:32:36'),
-(3,'huellas','beagle',41.380000,2.170000,'static/shelters_uploads/huellas/mascota1.png','2026-02-04 08:32:36'),
-(4,'huellas','bengal',41.382000,2.175000,'static/shelters_uploads/huellas/mascota2.png','2026-02-04 08:32:36'),
-(5,'patas_felices','retriever',38.000000,-4.000000,'static/shelters_uploads/patas_felices/mascota3.png','2026-02-04 08:32:36');
+-- Esquema ya en la última migración (backend/migrations/versions)
+CREATE TABLE IF NOT EXISTS schema_version (
+  revision VARCHAR(32) PRIMARY KEY,
+  aplicada DATETIME NOT NULL
+);
+
+INSERT INTO schema_version (revision, aplicada) VALUES
+('0001', NOW()),('0002', NOW()),('0003', NOW()),('0004', NOW()),('0005', NOW()),('0006', NOW()),('0007', NOW()),('0008', NOW());
 
 USE perros_test;
 
@@ -72,11 +125,20 @@ CREATE TABLE IF NOT EXISTS mascotas_perdidas (
   id INT NOT NULL AUTO_INCREMENT,
   username VARCHAR(50) NOT NULL,
   raza VARCHAR(50),
-  latitud DECIMAL(9,6),
-  longitud DECIMAL(9,6),
+  latitud DOUBLE NOT NULL,
+  longitud DOUBLE NOT NULL,
   path_imagen VARCHAR(255) NOT NULL,
+  path_miniatura VARCHAR(255),
+  path_previa VARCHAR(255),
   fecha TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  geohash VARCHAR(12),
+  ubicacion POINT GENERATED ALWAYS AS (POINT(longitud, latitud)) STORED NOT NULL SRID 0,
   PRIMARY KEY (id),
+  INDEX ix_mascotas_perdidas_geohash (geohash),
+  INDEX ix_mascotas_perdidas_lat_lon (latitud, longitud),
+  INDEX ix_mascotas_perdidas_raza_fecha (raza, fecha),
+  INDEX ix_mascotas_perdidas_username (username),
+  SPATIAL INDEX ix_mascotas_perdidas_ubicacion (ubicacion),
   FOREIGN KEY (username) REFERENCES usuarios(nombre) ON DELETE CASCADE
 );
 
@@ -84,10 +146,42 @@ CREATE TABLE IF NOT EXISTS mascotas_acogidas (
   id INT NOT NULL AUTO_INCREMENT,
   protectora VARCHAR(50) NOT NULL,
   raza VARCHAR(50),
-  latitud DECIMAL(9,6),
-  longitud DECIMAL(9,6),
+  latitud DOUBLE NOT NULL,
+  longitud DOUBLE NOT NULL,
   path_imagen VARCHAR(255) NOT NULL,
+  path_miniatura VARCHAR(255),
+  path_previa VARCHAR(255),
   fecha TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  geohash VARCHAR(12),
+  ubicacion POINT GENERATED ALWAYS AS (POINT(longitud, latitud)) STORED NOT NULL SRID 0,
   PRIMARY KEY (id),
+  INDEX ix_mascotas_acogidas_geohash (geohash),
+  INDEX ix_mascotas_acogidas_raza_geohash (raza, geohash),
+  INDEX ix_mascotas_acogidas_protectora_lat_lon (protectora, latitud, longitud),
+  INDEX ix_mascotas_acogidas_raza_fecha (raza, fecha),
+  INDEX ix_mascotas_acogidas_protectora_fecha (protectora, fecha),
+  SPATIAL INDEX ix_mascotas_acogidas_ubicacion (ubicacion),
   FOREIGN KEY (protectora) REFERENCES protectoras(nombre) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS matches (
+  id INT NOT NULL AUTO_INCREMENT,
+  perdido_id INT NOT NULL,
+  acogido_id INT NOT NULL,
+  distancia_km DOUBLE NOT NULL,
+  similitud DOUBLE,
+  puntuacion DOUBLE NOT NULL,
+  fecha DATETIME,
+  PRIMARY KEY (id),
+  UNIQUE KEY uq_matches_perdido_acogido (perdido_id, acogido_id),
+  INDEX ix_matches_perdido_id (perdido_id),
+  INDEX ix_matches_acogido_id (acogido_id),
+  FOREIGN KEY (perdido_id) REFERENCES mascotas_perdidas(id) ON DELETE CASCADE,
+  FOREIGN KEY (acogido_id) REFERENCES mascotas_acogidas(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS versiones_tablas (
+  tabla VARCHAR(64) PRIMARY KEY,
+  version BIGINT NOT NULL,
+  modificada DATETIME NOT NULL
 );
\ No newline at end of file
@@ -0,0 +1,68 @@
+import unittest
+
+import numpy as np
+import torch
+
+from backend.inference.augmentation import BatchAugment, EvalTransform, collate_uint8
+from backend.inference.preprocessing import to_tensor
+
+
+class TestBatchAugmentation(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.samples = [(rng.integers(0, 256, size=(32, 48, 3), dtype=np.uint8), i % 3) for i in range(6)]
+        self.images, self.labels = collate_uint8(self.samples)
+
+    def test_collate_uint8_channels_last(self):
+        self.assertEqual(self.images.dtype, torch.uint8)
+        self.assertEqual(tuple(self.images.shape), (6, 3, 32, 48))
+        self.assertTrue(self.images.is_contiguous(memory_format=torch.channels_last))
+        self.assertEqual(self.labels.tolist(), [0, 1, 2, 0, 1, 2])
+        print("✅ Test collate uint8 channels_last PASADO")
+
+    def test_eval_matches_per_sample_tensor(self):
+        eval_images = EvalTransform()(self.images)
+        expected = torch.stack([to_tensor(image) for image, _ in self.samples])
+        self.assertTrue(torch.allclose(eval_images, expected))
+        # Determinista: dos pasadas dan lo mismo
+        self.assertTrue(torch.equal(EvalTransform()(self.images), eval_images))
+        self.assertEqual(tuple(EvalTransform(size=(16, 24))(self.images).shape), (6, 3, 16, 24))
+        print("✅ Test transformación de evaluación determinista PASADO")
+
+    def test_flips_per_sample(self):
+        flips = BatchAugment(hflip=1, vflip=0, brightness=0, contrast=0, saturation=0, hue=0)(self.images)
+        self.assertTrue(torch.equal(flips, EvalTransform()(self.images).flip(-1)))
+
+        generator = torch.Generator().manual_seed(0)
+        mixed = BatchAugment(hflip=0.5, vflip=0, brightness=0, contrast=0, saturation=0, hue=0,
+                             generator=generator)(self.images)
+        original = EvalTransform()(self.images)
+        flipped = [torch.equal(mixed[i], original[i].flip(-1)) for i in range(6)]
+        kept = [torch.equal(mixed[i], original[i]) for i in range(6)]
+        self.assertTrue(all(f or k for f, k in zip(flipped, kept)))
+        self.assertTrue(any(flipped) and any(kept))
+        print("✅ Test volteos por muestra PASADO")
+
+    def test_jitter_range_and_reproducibility(self):
+        def augment(seed):
+            return BatchAugment(hflip=0, vflip=0, generator=torch.Generator().manual_seed(seed))(self.images)
+
+        first = augment(1)
+        self.assertTrue(torch.equal(first, augment(1)))
+        self.assertFalse(torch.equal(first, augment(2)))
+        self.assertGreaterEqual(first.min().item(), 0.0)
+        self.assertLessEqual(first.max().item(), 1.0)
+        # Jitter suave: cerca de la imagen original
+        self.assertLess((first - EvalTransform()(self.images)).abs().mean().item(), 0.15)
+        print("✅ Test ColorJitter por lotes PASADO")
+
+    def test_hue_rotation_keeps_gray(self):
+        gray = torch.full((2, 3, 8, 8), 128, dtype=torch.uint8)
+        out = BatchAugment(hflip=0, vflip=0, brightness=0, contrast=0, saturation=0, hue=0.5)(gray)
+        self.assertTrue(torch.allclose(out, EvalTransform()(gray), atol=1e-5))
+        print("✅ Test rotación de tono sin alterar grises PASADO")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import threading
+import unittest
+
+import torch
+from torch import nn
+
+from backend.batching import MicroBatcher
+from backend.model import IDX_TO_CLASSNAME
+
+
+class EchoModel(nn.Module):
+    """Devuelve como clase el valor del primer píxel de cada imagen."""
+
+    def __init__(self):
+        super().__init__()
+        self.batch_sizes = []
+
+    def forward(self, x):
+        self.batch_sizes.append(x.shape[0])
+        classes = x[:, 0, 0, 0].long()
+        return nn.functional.one_hot(classes, num_classes=len(IDX_TO_CLASSNAME)).float()
+
+
+def make_image(class_idx, size=8):
+    image = torch.zeros(3, size, size)
+    image[0, 0, 0] = class_idx
+    return image
+
+
+class TestMicroBatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.model = EchoModel()
+        self.batcher = MicroBatcher(self.model, "cpu", max_batch_size=4, max_wait_ms=200)
+
+    def tearDown(self):
+        self.batcher.close()
+
+    def test_each_caller_gets_its_class(self):
+        futures = [self.batcher.submit(make_image(idx)) for idx in range(8)]
+        results = [future.result(timeout=5) for future in futures]
+
+        self.assertEqual(results, [IDX_TO_CLASSNAME[idx] for idx in range(8)])
+        self.assertTrue(all(size <= 4 for size in self.model.batch_sizes))
+        self.assertLess(len(self.model.batch_sizes), 8)
+
+        print("✅ Micro-batching devuelve la clase de cada petición PASADO")
+
+    def test_concurrent_callers(self):
+        results = {}
+
+        def caller(idx):
+            results[idx] = self.batcher.submit(make_image(idx)).result(timeout=5)
+
+        threads = [threading.Thread(target=caller, args=(idx,)) for idx in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, {idx: IDX_TO_CLASSNAME[idx] for idx in range(4)})
+
+        print("✅ Micro-batching con peticiones concurrentes PASADO")
+
+    def test_mixed_shapes_are_not_stacked(self):
+        futures = [self.batcher.submit(make_image(1, size=8)), self.batcher.submit(make_image(2, size=16))]
+
+        self.assertEqual([future.result(timeout=5) for future in futures],
+                         [IDX_TO_CLASSNAME[1], IDX_TO_CLASSNAME[2]])
+
+        print("✅ Micro-batching separa imágenes de distinto tamaño PASADO")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,198 @@
+import json
+import tempfile
+import threading
+import unittest
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from backend.inference.data.downloader import Downloader, Manifest, make_session, save_png
+from backend.inference.data.populate_data import download_cat_images, download_dog_images, list_dog_images
+
+
+def jpeg_bytes(seed):
+    image = np.random.default_rng(seed).integers(0, 256, size=(48, 64, 3), dtype=np.uint8)
+    return cv2.imencode(".jpg", image)[1].tobytes()
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Sustituto local de las APIs de imágenes: ``/img/<n>.jpg``, ``/flaky/<n>.jpg`` (503 la primera vez)..."""
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.hits[self.path] += 1
+            hits = server.hits[self.path]
+            server.connections.add(self.client_address)
+
+        if self.path.startswith("/img/"):
+            self.send(200, jpeg_bytes(int(Path(self.path).stem)), "image/jpeg")
+        elif self.path.startswith("/flaky/"):
+            if hits == 1:
+                self.send(503, b"busy", "text/plain")
+            else:
+                self.send(200, jpeg_bytes(100), "image/jpeg")
+        elif self.path == "/broken.jpg":
+            self.send(200, b"not an image", "image/jpeg")
+        elif self.path.startswith("/api/breed/"):
+            base = f"http://127.0.0.1:{server.server_port}"
+            first = 20 if "/french/" in self.path else 0
+            body = {"status": "success", "message": [f"{base}/img/{first + i}.jpg" for i in range(3)]}
+            self.send(200, json.dumps(body).encode(), "application/json")
+        elif self.path.startswith("/api/images/search"):
+            # beng: la segunda imagen de la primera página no es una imagen; siam: todas bien
+            page = int(self.path.split("page=")[1].split("&")[0])
+            base = f"http://127.0.0.1:{server.server_port}"
+            first = 10 if "breed_ids=beng" in self.path else 30
+            urls = [f"{base}/img/{first + page * 2 + i}.jpg" for i in range(2)] if page < 3 else []
+            if first == 10 and page == 0:
+                urls[1] = f"{base}/broken.jpg"
+            self.send(200, json.dumps([{"url": url} for url in urls]).encode(), "application/json")
+        else:
+            self.send(404, b"", "text/plain")
+
+    def send(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestDownloader(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+        cls.server.lock = threading.Lock()
+        cls.base = f"http://127.0.0.1:{cls.server.server_port}"
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.server.hits = Counter()
+        self.server.connections = set()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.session = make_session(pool_size=4, backoff=0)
+
+    def tearDown(self):
+        self.session.close()
+        self.tmp.cleanup()
+
+    def items(self, count):
+        return [(f"{self.base}/img/{i}.jpg", f"beagle/{i}.png") for i in range(count)]
+
+    def test_parallel_download_with_manifest(self):
+        stats = Downloader(self.root, session=self.session, workers=4, processes=2).run(self.items(12))
+
+        self.assertEqual(stats, {"saved": 12, "skipped": 0, "failed": 0})
+        self.assertEqual(len(list((self.root / "beagle").glob("*.png"))), 12)
+        self.assertEqual(cv2.imread(str(self.root / "beagle" / "0.png")).shape, (48, 64, 3))
+        manifest = Manifest(self.root / "manifest.jsonl", self.root)
+        self.assertEqual(len(manifest.entries), 12)
+        # Keep-alive: como mucho una conexión por hilo
+        self.assertLessEqual(len(self.server.connections), 4)
+        print("✅ Test descarga en paralelo con manifiesto PASADO")
+
+    def test_resume_skips_completed(self):
+        Downloader(self.root, session=self.session, workers=2, processes=0).run(self.items(4))
+        # Simula una ejecución cortada: una línea truncada y un fichero perdido
+        with open(self.root / "manifest.jsonl", "a") as f:
+            f.write('{"url": "trunc')
+        (self.root / "beagle" / "3.png").unlink()
+        self.server.hits.clear()
+
+        stats = Downloader(self.root, session=self.session, workers=2, processes=0).run(self.items(6))
+        self.assertEqual(stats, {"saved": 3, "skipped": 3, "failed": 0})
+        self.assertEqual(sorted(self.server.hits), [f"/img/{i}.jpg" for i in (3, 4, 5)])
+        print("✅ Test reanudación desde el manifiesto PASADO")
+
+    def test_verify_detects_corruption(self):
+        Downloader(self.root, session=self.session, workers=2, processes=0).run(self.items(2))
+        path = self.root / "beagle" / "0.png"
+        data = bytearray(path.read_bytes())
+        data[-20] ^= 0xFF
+        path.write_bytes(bytes(data))
+
+        self.assertEqual(Downloader(self.root, session=self.session, processes=0).run(self.items(2))["skipped"], 2)
+        stats = Downloader(self.root, session=self.session, processes=0, verify=True).run(self.items(2))
+        self.assertEqual(stats, {"saved": 1, "skipped": 1, "failed": 0})
+        print("✅ Test verificación de checksums PASADO")
+
+    def test_retries_and_failures(self):
+        stats = Downloader(self.root, session=self.session, workers=2, processes=0).run([
+            (f"{self.base}/flaky/1.jpg", "boxer/flaky.png"),
+            (f"{self.base}/broken.jpg", "boxer/broken.png"),
+            (f"{self.base}/missing.jpg", "boxer/missing.png"),
+        ])
+
+        self.assertEqual(stats, {"saved": 1, "skipped": 0, "failed": 2})
+        self.assertEqual(self.server.hits["/flaky/1.jpg"], 2)
+        self.assertTrue((self.root / "boxer" / "flaky.png").exists())
+        self.assertFalse((self.root / "boxer" / "broken.png").exists())
+        print("✅ Test reintentos y descargas fallidas PASADO")
+
+    def test_dog_listing_and_legacy_files(self):
+        listings = list_dog_images(self.session, f"{self.base}/api",
+                                   breeds=[("bulldog", "english"), ("bulldog", "french")])
+        self.assertEqual([folder for folder, _ in listings], ["bulldog", "bulldog"])
+
+        # Dataset de la versión anterior: cada listado numerado desde 1, la última subraza pisa a las demás
+        for n in range(3):
+            save_png(jpeg_bytes(20 + n), str(self.root / "bulldog" / f"{n + 1}.png"))
+        self.server.hits.clear()
+        stats = download_dog_images(Downloader(self.root, session=self.session, workers=2, processes=0), listings)
+
+        self.assertEqual(stats, {"saved": 3, "skipped": 3, "failed": 0})
+        self.assertEqual(sorted(self.server.hits), [f"/img/{i}.jpg" for i in range(3)])
+        files = sorted(path.stem for path in (self.root / "bulldog").glob("*.png"))
+        self.assertEqual(len(files), 6)
+        self.assertFalse(any(stem.isdigit() for stem in files))
+
+        # Un <n>.png que ya se había vuelto a descargar con el nombre nuevo se borra (mismo contenido)
+        save_png(jpeg_bytes(20), str(self.root / "bulldog" / "1.png"))
+        stats = download_dog_images(Downloader(self.root, session=self.session, processes=0), listings)
+        self.assertEqual(stats["skipped"], 6)
+        self.assertFalse((self.root / "bulldog" / "1.png").exists())
+        print("✅ Test adopción de las imágenes de perro ya descargadas PASADO")
+
+    def test_cat_limit_counts_saved_images(self):
+        downloader = Downloader(self.root, session=self.session, workers=2, processes=0)
+        stats = download_cat_images(downloader, self.session, f"{self.base}/api", breeds={"bengal": "beng"},
+                                    per_breed=3, per_request=2, delay=0)
+
+        # /broken.jpg falla: se lista una imagen más para completar la raza, y ni una más
+        self.assertEqual(stats, {"saved": 3, "skipped": 0, "failed": 1})
+        self.assertEqual(len(list((self.root / "bengal").glob("*.png"))), 3)
+        self.assertEqual(self.server.hits["/img/13.jpg"], 1)
+        self.assertEqual(self.server.hits["/img/14.jpg"], 0)
+        print("✅ Test límite por raza de gato contando imágenes guardadas PASADO")
+
+    def test_cat_legacy_files(self):
+        for n in range(2):
+            save_png(jpeg_bytes(30 + n), str(self.root / "siamese" / f"{n + 1}.png"))
+        downloader = Downloader(self.root, session=self.session, workers=2, processes=0)
+        stats = download_cat_images(downloader, self.session, f"{self.base}/api", breeds={"siamese": "siam"},
+                                    per_breed=3, per_request=2, delay=0)
+
+        self.assertEqual(stats, {"saved": 1, "skipped": 2, "failed": 0})
+        self.assertEqual([path for path in self.server.hits if path.startswith("/img/")], ["/img/32.jpg"])
+        self.assertEqual(len(list((self.root / "siamese").glob("*.png"))), 3)
+        print("✅ Test adopción de las imágenes de gato ya descargadas PASADO")
+
+
+if __name__ == "__main__":
+    unittest.main()
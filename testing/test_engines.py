@@ -0,0 +1,65 @@
+import importlib.util
+import tempfile
+import unittest
+from pathlib import Path
+
+import torch
+
+from backend.inference.efficientnet_v2_s import EfficientNetV2
+from backend.inference.engines import ENGINE_FILES, load_engine
+from backend.inference.export_model import EXPORTERS
+from backend.model import predict_batch
+
+
+class TestEngines(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.models_path = Path(cls.tmp.name)
+        torch.manual_seed(0)
+        model = EfficientNetV2(num_classes=18)
+        torch.save(model.state_dict(), cls.models_path / ENGINE_FILES["eager"])
+        cls.eager = load_engine("eager", cls.models_path)
+        cls.images = [torch.rand(3, 224, 224) for _ in range(2)]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def check_engine(self, name):
+        with torch.inference_mode():
+            EXPORTERS[name](self.eager, torch.rand(1, 3, 224, 224), self.models_path / ENGINE_FILES[name])
+        engine = load_engine(name, self.models_path)
+
+        expected, expected_embeddings = predict_batch(self.eager, self.images, "cpu", return_embeddings=True)
+        categories, embeddings = predict_batch(engine, self.images, "cpu", return_embeddings=True)
+        self.assertEqual(categories, expected)
+        self.assertTrue(torch.allclose(torch.from_numpy(embeddings), torch.from_numpy(expected_embeddings),
+                                       atol=1e-4))
+
+    def test_torchscript(self):
+        self.check_engine("torchscript")
+
+        print("✅ Motor TorchScript equivalente a eager PASADO")
+
+    def test_int8(self):
+        self.check_engine("int8")
+
+        print("✅ Motor int8 dinámico equivalente a eager PASADO")
+
+    @unittest.skipUnless(importlib.util.find_spec("onnxruntime"), "onnxruntime no instalado")
+    def test_onnx(self):
+        self.check_engine("onnx")
+
+        print("✅ Motor ONNX Runtime equivalente a eager PASADO")
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            load_engine("tensorrt", self.models_path)
+
+        print("✅ Motor desconocido rechazado PASADO")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+import tempfile
+import unittest
+from io import BytesIO
+from pathlib import Path
+from unittest.mock import patch
+
+from PIL import Image
+
+from backend.app import create_app, db
+from backend.events import LocalEventBroker, SQLiteEventBroker, make_event_broker
+
+
+def png_bytes():
+    buffer = BytesIO()
+    Image.new("RGB", (64, 48), (10, 20, 30)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def read_events(response, count):
+    """Primeros ``count`` mensajes SSE (sin comentarios ni ``retry``) de un stream que no termina."""
+    messages = []
+    chunks = response.iter_encoded()
+    while len(messages) < count:
+        fields = dict(line.split(": ", 1) for line in next(chunks).decode().strip().splitlines()
+                      if not line.startswith(":") and not line.startswith("retry"))
+        if fields:
+            messages.append(fields)
+    response.close()
+    return messages
+
+
+class TestEventBrokers(unittest.TestCase):
+
+    def test_local_broker_resume(self):
+        broker = LocalEventBroker(history=3)
+        for i in range(3):
+            broker.publish("perdido", {"n": i})
+        self.assertEqual([e[0] for e in broker.events_after(1)], [2, 3])
+        self.assertEqual(broker.events_after(3, timeout=0.05), [])
+
+        broker.publish("perdido", {"n": 3})
+        # El evento 1 ya salió del histórico: el cliente debe recargar
+        self.assertIsNone(broker.events_after(0))
+        self.assertIsNone(broker.events_after(99))
+        print("✅ Test reanudación del broker local PASADO")
+
+    def test_sqlite_broker_between_processes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            publisher = SQLiteEventBroker(Path(tmp) / "events.db", poll_s=0.05)
+            subscriber = SQLiteEventBroker(Path(tmp) / "events.db", poll_s=0.05)
+            event_id = publisher.publish("protegido", {"raza": "beagle"})
+
+            events = subscriber.events_after(0, timeout=2)
+            publisher.close()
+            subscriber.close()
+            self.assertEqual(events, [(event_id, "protegido", {"raza": "beagle"})])
+        print("✅ Test broker SQLite compartido PASADO")
+
+    def test_local_broker_with_several_workers(self):
+        self.assertIsInstance(make_event_broker("local"), LocalEventBroker)
+        with tempfile.TemporaryDirectory() as tmp:
+            # Con varios workers de serve.py un broker en memoria no llegaría a los demás procesos
+            broker = make_event_broker("local", Path(tmp) / "events.db", workers=2)
+            broker.close()
+            self.assertIsInstance(broker, SQLiteEventBroker)
+        print("✅ Test broker local con varios workers pasa a SQLite PASADO")
+
+
+class TestEventStream(unittest.TestCase):
+
+    def setUp(self):
+        self.broker = LocalEventBroker()
+        self.app = create_app('testing', test_config={"EVENT_BROKER": self.broker, "EVENTS_KEEPALIVE_S": 0.05})
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        with self.client.session_transaction() as sess:
+            sess["logged_in"] = True
+            sess["account_type"] = "shelter"
+            sess["nombre"] = "testshelter"
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_stream_resumes_from_last_event_id(self):
+        self.broker.publish("perdido", {"raza": "beagle", "id": 1})
+        self.broker.publish("protegido", {"raza": "poodle", "protectora": "othershelter", "id": 1})
+        self.broker.publish("protegido", {"raza": "labrador", "protectora": "testshelter", "id": 2})
+
+        response = self.client.get("/events", headers={"Last-Event-ID": "0"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "text/event-stream")
+        # Los protegidos de otras protectoras no se envían
+        events = read_events(response, 2)
+        self.assertEqual([(e["id"], e["event"]) for e in events], [("1", "perdido"), ("3", "protegido")])
+
+        response = self.client.get("/events", headers={"Last-Event-ID": "1"})
+        self.assertEqual(read_events(response, 1)[0]["id"], "3")
+        print("✅ Test /events reanuda desde Last-Event-ID PASADO")
+
+    def test_stream_reset_for_unknown_id(self):
+        response = self.client.get("/events", query_string={"last_event_id": 50})
+        self.assertEqual(read_events(response, 1)[0]["event"], "reset")
+        print("✅ Test /events pide recargar si no puede reanudar PASADO")
+
+    @patch("backend.app.predict")
+    def test_report_publishes_event(self, mock_predict):
+        mock_predict.return_value = "labrador"
+        self.client.post("/report", data={
+            "imagen": (BytesIO(png_bytes()), "dog.png"),
+            "latitud": "40.4",
+            "longitud": "-3.7"
+        }, content_type="multipart/form-data")
+
+        events = self.broker.events_after(0)
+        self.assertEqual(len(events), 1)
+        _, event, data = events[0]
+        self.assertEqual(event, "protegido")
+        self.assertEqual(data["raza"], "labrador")
+        self.assertEqual(data["protectora"], "testshelter")
+        print("✅ Test /report publica el nuevo reporte PASADO")
+
+    def test_events_requires_shelter(self):
+        with self.client.session_transaction() as sess:
+            sess["account_type"] = "user"
+        self.assertEqual(self.client.get("/events").status_code, 403)
+        with self.client.session_transaction() as sess:
+            sess.clear()
+        self.assertEqual(self.client.get("/events").status_code, 401)
+        print("✅ Test /events requiere sesión de protectora PASADO")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+import tempfile
+import time
+import unittest
+from io import BytesIO
+from pathlib import Path
+from unittest.mock import patch
+
+from PIL import Image
+
+from backend.app import create_app, db, LostReport, ShelterReport
+from backend.jobs import DONE, RUNNING, JobQueue, requeue_interrupted
+
+
+def png_bytes():
+    buffer = BytesIO()
+    Image.new("RGB", (64, 48), (10, 20, 30)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class TestAsyncUploads(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.app = create_app('testing', test_config={
+            "ASYNC_UPLOADS": True,
+            "JOB_DB_PATH": Path(self.tmp.name) / "jobs.db",
+            "JOB_WORKERS": 1
+        })
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+    def tearDown(self):
+        self.app.config["JOB_QUEUE"].shutdown()
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+        self.tmp.cleanup()
+
+    def login(self, account_type, nombre):
+        with self.client.session_transaction() as sess:
+            sess["logged_in"] = True
+            sess["account_type"] = account_type
+            sess["nombre"] = nombre
+
+    def wait_for(self, job_id, timeout=5):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            job = self.client.get(f"/jobs/{job_id}").get_json()
+            if job["status"] in ("done", "failed"):
+                return job
+            time.sleep(0.05)
+        self.fail(f"El trabajo {job_id} no terminó a tiempo")
+
+    @patch("backend.app.predict")
+    def test_predict_returns_job(self, mock_predict):
+        mock_predict.return_value = "labrador"
+        self.login("user", "testuser")
+
+        response = self.client.post("/predict", data={
+            "imagen": (BytesIO(png_bytes()), "dog.png"),
+            "latitud": "40.4168",
+            "longitud": "-3.7038"
+        }, content_type="multipart/form-data")
+
+        self.assertEqual(response.status_code, 202)
+        job = self.wait_for(response.get_json()["job_id"])
+
+        self.assertEqual(job["status"], "done")
+        self.assertEqual(job["result"]["reporte_usuario"]["raza"], "labrador")
+        self.assertIn("inference", job["stages"])
+        db.session.expire_all()
+        self.assertEqual(LostReport.query.count(), 1)
+
+        metrics = self.client.get("/jobs/metrics").get_json()
+        self.assertEqual(metrics["queue_depth"], 0)
+        self.assertEqual(metrics["done"], 1)
+        self.assertIn("inference", metrics["stages"])
+
+        print("✅ /predict en modo cola devuelve job_id PASADO")
+
+    @patch("backend.app.predict")
+    def test_report_job_owner_only(self, mock_predict):
+        mock_predict.return_value = "beagle"
+        self.login("shelter", "testshelter")
+
+        response = self.client.post("/report", data={
+            "imagen": (BytesIO(png_bytes()), "dog.png"),
+            "latitud": "40.4",
+            "longitud": "-3.7"
+        }, content_type="multipart/form-data")
+        job_id = response.get_json()["job_id"]
+        job = self.wait_for(job_id)
+
+        self.assertEqual(job["result"]["reporte_actual"]["protectora"], "testshelter")
+        db.session.expire_all()
+        self.assertEqual(ShelterReport.query.count(), 1)
+
+        self.login("shelter", "othershelter")
+        self.assertEqual(self.client.get(f"/jobs/{job_id}").status_code, 404)
+
+        print("✅ /jobs solo visible para su propietario PASADO")
+
+
+class TestSharedJobQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmp.name) / "jobs.db"
+        self.calls = []
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def handler(self, payload, timer):
+        self.calls.append(payload["n"])
+        return payload
+
+    def test_each_job_runs_once_across_queues(self):
+        queues = [JobQueue(self.db_path, {"echo": self.handler}, workers=1, recover=False) for _ in range(2)]
+        job_id = queues[0].submit("echo", {"n": 1})
+        # Otro proceso que intente ejecutar el mismo trabajo no debe repetirlo
+        queues[1]._run(job_id)
+        for queue in queues:
+            queue.shutdown()
+
+        self.assertEqual(self.calls, [1])
+        self.assertEqual(queues[1].get(job_id)["status"], DONE)
+
+        print("✅ Reclamo atómico de trabajos entre procesos PASADO")
+
+    def test_requeue_interrupted(self):
+        queue = JobQueue(self.db_path, {"echo": self.handler}, workers=1)
+        queue.shutdown()
+        queue._execute(
+            "INSERT INTO jobs (id, kind, status, payload, created) VALUES (?, ?, ?, ?, ?)",
+            ("stale", "echo", RUNNING, '{"n": 2}', time.time())
+        )
+
+        self.assertEqual(requeue_interrupted(self.db_path), 1)
+        queue = JobQueue(self.db_path, {"echo": self.handler}, workers=1, recover=False)
+        queue.shutdown()
+        self.assertEqual(self.calls, [2])
+
+        print("✅ Recuperación de trabajos interrumpidos PASADO")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,234 @@
+import json
+import time
+import unittest
+from datetime import datetime, timezone
+from io import BytesIO
+from unittest.mock import patch
+
+from PIL import Image
+
+from backend.app import create_app, db, ShelterReport, LostReport
+
+
+def png_bytes():
+    buffer = BytesIO()
+    Image.new("RGB", (64, 48), (10, 20, 30)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class TestShelterMaps(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        for idx in range(7):
+            db.session.add(ShelterReport(
+                path_imagen=f"test{idx}.png",
+                raza="labrador",
+                latitud=40 + idx / 100,
+                longitud=-3,
+                protectora="testshelter"
+            ))
+        db.session.add(ShelterReport(
+            path_imagen="other.png",
+            raza="beagle",
+            latitud=41,
+            longitud=2,
+            protectora="othershelter"
+        ))
+        for idx in range(3):
+            db.session.add(LostReport(
+                path_imagen=f"lost{idx}.png",
+                raza="beagle",
+                latitud=41 + idx / 100,
+                longitud=-4,
+                username="user1"
+            ))
+        db.session.commit()
+
+        with self.client.session_transaction() as sess:
+            sess["logged_in"] = True
+            sess["account_type"] = "shelter"
+            sess["nombre"] = "testshelter"
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_cursor_pagination(self):
+        protegidos, perdidos = [], []
+        cursor = None
+        pages = 0
+        while True:
+            params = {"limit": 2}
+            if cursor:
+                params["cursor"] = cursor
+            response = self.client.get("/shelter/maps", query_string=params)
+            self.assertEqual(response.status_code, 200)
+            page = response.get_json()
+            self.assertLessEqual(len(page["protegidos"]), 2)
+            self.assertLessEqual(len(page["perdidos"]), 2)
+            protegidos += page["protegidos"]
+            perdidos += page["perdidos"]
+            pages += 1
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+        self.assertEqual(pages, 4)
+        self.assertEqual([p["path_imagen"] for p in protegidos], [f"test{idx}.png" for idx in range(7)])
+        self.assertEqual(len(perdidos), 3)
+
+        print("✅ /shelter/maps paginado por cursor PASADO")
+
+    def test_invalid_cursor(self):
+        response = self.client.get("/shelter/maps", query_string={"limit": 2, "cursor": "abc"})
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.get("/shelter/maps", query_string={"limit": 0})
+        self.assertEqual(response.status_code, 400)
+
+        print("✅ /shelter/maps rechaza cursor inválido PASADO")
+
+    def test_ndjson_stream(self):
+        response = self.client.get("/shelter/maps", query_string={"format": "ndjson"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "application/x-ndjson")
+        rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        self.assertEqual(sum(r["tipo"] == "protegido" for r in rows), 7)
+        self.assertEqual(sum(r["tipo"] == "perdido" for r in rows), 3)
+
+        print("✅ /shelter/maps en streaming NDJSON PASADO")
+
+    def test_bbox_filter(self):
+        # Solo entran los reportes de la protectora con latitud <= 40.025 (3 de 7)
+        response = self.client.get("/shelter/maps", query_string={"bbox": "-3.5,39.9,-2.5,40.025"})
+
+        self.assertEqual(response.status_code, 200)
+        json_data = response.get_json()
+        self.assertEqual(len(json_data["protegidos"]), 3)
+        self.assertEqual(len(json_data["perdidos"]), 0)
+
+        print("✅ /shelter/maps filtra por bbox PASADO")
+
+    def test_clusters_at_low_zoom(self):
+        response = self.client.get("/shelter/maps", query_string={"bbox": "-10,35,5,45", "zoom": 5})
+
+        self.assertEqual(response.status_code, 200)
+        clusters = response.get_json()["clusters"]
+        self.assertEqual(sum(c["count"] for c in clusters["protegidos"]), 7)
+        self.assertEqual(sum(c["count"] for c in clusters["perdidos"]), 3)
+        self.assertEqual(len(clusters["protegidos"]), 1)
+
+        print("✅ /shelter/maps agrupa en celdas a zoom bajo PASADO")
+
+    def test_invalid_bbox(self):
+        response = self.client.get("/shelter/maps", query_string={"bbox": "1,2,3"})
+        self.assertEqual(response.status_code, 400)
+
+        print("✅ /shelter/maps rechaza bbox inválido PASADO")
+
+    def test_conditional_get(self):
+        response = self.client.get("/shelter/maps")
+        etag = response.headers["ETag"]
+        self.assertIsNotNone(response.last_modified)
+        self.assertIn("no-cache", response.headers["Cache-Control"])
+
+        response = self.client.get("/shelter/maps", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.get_data(), b"")
+        # Solo la consulta de la huella
+        self.assertEqual(response.headers["X-Query-Count"], "1")
+
+        # Sin If-None-Match la respuesta sale de la caché, también con una sola consulta
+        response = self.client.get("/shelter/maps")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["X-Query-Count"], "1")
+        self.assertEqual(len(response.get_json()["protegidos"]), 7)
+
+        print("✅ /shelter/maps responde 304 con el mismo ETag PASADO")
+
+    def test_etag_changes_with_new_reports(self):
+        etag = self.client.get("/shelter/maps").headers["ETag"]
+
+        # Un reporte añadido por otro proceso cambia el ETag aunque la caché de este no se haya vaciado
+        db.session.add(LostReport(path_imagen="new.png", raza="boxer", latitud=41, longitud=-4, username="user2"))
+        db.session.commit()
+        response = self.client.get("/shelter/maps", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+        self.assertEqual(len(response.get_json()["perdidos"]), 4)
+
+        print("✅ /shelter/maps cambia de ETag con reportes nuevos PASADO")
+
+    def test_etag_changes_with_updates_in_place(self):
+        etag = self.client.get("/shelter/maps").headers["ETag"]
+
+        # Mismo número de filas, mismo max(id) y misma fecha: solo cambia la versión de la tabla
+        report = ShelterReport.query.filter_by(protectora="testshelter").first()
+        report.raza = "boxer"
+        db.session.commit()
+        response = self.client.get("/shelter/maps", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("boxer", [r["raza"] for r in response.get_json()["protegidos"]])
+        etag = response.headers["ETag"]
+
+        # También con update masivo del ORM
+        LostReport.query.filter_by(username="user1").update({"raza": "poodle"})
+        db.session.commit()
+        response = self.client.get("/shelter/maps", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual({r["raza"] for r in response.get_json()["perdidos"]}, {"poodle"})
+
+        print("✅ /shelter/maps cambia de ETag con ediciones en el sitio PASADO")
+
+    def test_last_modified_after_delete(self):
+        response = self.client.get("/shelter/maps")
+        last_modified = response.last_modified
+        # fecha es hora local: Last-Modified debe ser esa hora pasada a UTC
+        newest = max(r.fecha for r in ShelterReport.query.all() + LostReport.query.all())
+        self.assertGreaterEqual(last_modified, newest.astimezone(timezone.utc).replace(microsecond=0))
+        self.assertLessEqual(last_modified, datetime.now(timezone.utc))
+
+        # Borrar el reporte más reciente no hace retroceder Last-Modified
+        time.sleep(1.1)
+        db.session.delete(LostReport.query.order_by(LostReport.id.desc()).first())
+        db.session.commit()
+        headers = {"If-Modified-Since": response.headers["Last-Modified"]}
+        response = self.client.get("/shelter/maps", headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.get_json()["perdidos"]), 2)
+        self.assertGreater(response.last_modified, last_modified)
+
+        # Con If-None-Match manda el ETag aunque If-Modified-Since diga que no hay cambios
+        headers = {"If-Modified-Since": response.headers["Last-Modified"], "If-None-Match": '"otro"'}
+        self.assertEqual(self.client.get("/shelter/maps", headers=headers).status_code, 200)
+
+        print("✅ /shelter/maps Last-Modified en UTC y tras borrados PASADO")
+
+    @patch("backend.app.predict")
+    def test_report_clears_response_cache(self, mock_predict):
+        mock_predict.return_value = "labrador"
+        self.client.get("/shelter/maps")
+        cache = self.app.config["RESPONSE_CACHE"]
+        self.assertEqual(cache.stats()["entries"], 1)
+
+        self.client.post("/report", data={
+            "imagen": (BytesIO(png_bytes()), "dog.png"),
+            "latitud": "40.4",
+            "longitud": "-3.7"
+        }, content_type="multipart/form-data")
+        self.assertEqual(cache.stats()["entries"], 0)
+        self.assertEqual(len(self.client.get("/shelter/maps").get_json()["protegidos"]), 8)
+
+        print("✅ /report vacía la caché de respuestas PASADO")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from io import BytesIO
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+from PIL import Image
+
+from backend.app import create_app, db, LostReport, Match
+from backend.inference.vector_store import VectorStore
+
+DIM = 32
+
+
+def png_bytes():
+    buffer = BytesIO()
+    Image.new("RGB", (64, 48), (10, 20, 30)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class TestIncrementalMatches(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.stores = {
+            "perdidos": VectorStore(Path(self.tmp.name) / "perdidos", DIM),
+            "acogidas": VectorStore(Path(self.tmp.name) / "acogidas", DIM)
+        }
+        self.app = create_app('testing', test_config={"VECTOR_STORES": self.stores})
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        self.embedding = np.zeros(DIM, dtype=np.float32)
+        self.embedding[0] = 1.0
+        other = np.zeros(DIM, dtype=np.float32)
+        other[1] = 1.0
+
+        self.near = self.add_lost_report("labrador", 40.41, -3.70, "user1", other)
+        # Otra raza pero visualmente idéntica: entra por el vector store
+        self.lookalike = self.add_lost_report("beagle", 40.42, -3.71, "user2", self.embedding)
+        self.add_lost_report("beagle", 40.43, -3.72, "user2", other)
+        self.add_lost_report("labrador", 28.10, -15.40, "user1", other)
+        self.add_lost_report("labrador", 40.40, -3.70, "user1", other, fecha=datetime.now() - timedelta(days=365))
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+        self.tmp.cleanup()
+
+    def add_lost_report(self, raza, latitud, longitud, username, embedding, fecha=None):
+        report = LostReport(path_imagen=f"{raza}.png", raza=raza, latitud=latitud, longitud=longitud,
+                            username=username, fecha=fecha)
+        db.session.add(report)
+        db.session.commit()
+        self.stores["perdidos"].add(report.id, embedding)
+        return report.id
+
+    def login(self, account_type, nombre):
+        with self.client.session_transaction() as sess:
+            sess["logged_in"] = True
+            sess["account_type"] = account_type
+            sess["nombre"] = nombre
+
+    @patch("backend.app.predict")
+    def post_report(self, mock_predict):
+        mock_predict.return_value = ("labrador", self.embedding)
+        self.login("shelter", "testshelter")
+        return self.client.post("/report", data={
+            "imagen": (BytesIO(png_bytes()), "dog.png"),
+            "latitud": "40.4",
+            "longitud": "-3.7"
+        }, content_type="multipart/form-data")
+
+    def test_report_persists_matches(self):
+        response = self.post_report()
+        self.assertEqual(response.status_code, 200)
+
+        # Solo la misma raza cercana y abierta, más el vecino visual; ni el lejano ni el antiguo
+        perdidos = response.get_json()["perdidos"]
+        self.assertEqual([p["raza"] for p in perdidos], ["beagle", "labrador"])
+        self.assertGreater(perdidos[0]["similitud"], 0.99)
+        self.assertEqual({m.perdido_id for m in Match.query.all()}, {self.near, self.lookalike})
+        print("✅ /report guarda solo las coincidencias nuevas PASADO")
+
+    def test_matches_endpoint(self):
+        self.post_report()
+
+        self.login("user", "user1")
+        response = self.client.get("/matches")
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual(len(data["matches"]), 1)
+        self.assertEqual(data["matches"][0]["perdido"]["usuario"], "user1")
+        self.assertEqual(data["matches"][0]["acogido"]["protectora"], "testshelter")
+        self.assertFalse(data["has_more"])
+
+        # Desde el último id recibido no hay nada nuevo
+        response = self.client.get("/matches", query_string={"after": data["last_id"]})
+        self.assertEqual(response.get_json()["matches"], [])
+
+        self.login("shelter", "testshelter")
+        response = self.client.get("/matches", query_string={"limit": 1})
+        self.assertEqual(len(response.get_json()["matches"]), 1)
+        self.assertTrue(response.get_json()["has_more"])
+        print("✅ /matches devuelve las coincidencias de cada cuenta PASADO")
+
+    def test_matches_requires_session(self):
+        response = self.client.get("/matches")
+        self.assertEqual(response.status_code, 401)
+        print("✅ /matches requiere sesión PASADO")
+
+    def test_matches_invalid_pagination(self):
+        self.login("user", "user1")
+        response = self.client.get("/matches", query_string={"after": "abc"})
+        self.assertEqual(response.status_code, 400)
+        print("✅ /matches valida la paginación PASADO")
+
+
+if __name__ == "__main__":
+    unittest.main()
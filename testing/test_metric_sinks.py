@@ -0,0 +1,136 @@
+import csv
+import json
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+import torch
+from torch import nn
+from torch.utils.data import DataLoader, TensorDataset
+
+from backend.inference.augmentation import EvalTransform
+from backend.inference.metric_sinks import AsyncMetricsWriter, CSVSink, JSONLSink, MetricSink, load_metrics, \
+    plot_metrics_async
+from backend.inference.metrics import acc_fn
+from backend.inference.trainer import Trainer
+
+
+class SlowSink(MetricSink):
+    """Sink que tarda en escribir, como un disco lento o un servicio remoto."""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.records = []
+        self.written = threading.Event()
+
+    def write(self, record):
+        time.sleep(self.delay)
+        self.records.append(record)
+        self.written.set()
+
+
+class BrokenSink(MetricSink):
+    def write(self, record):
+        raise OSError("disk full")
+
+
+def records(count, start=0):
+    return [{"epoch": e, "train_loss": 1 / (e + 1), "train_acc": e / 10, "val_loss": 1 / (e + 2), "val_acc": e / 20,
+             "lr": 0.001} for e in range(start, start + count)]
+
+
+class TestMetricSinks(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_log_never_waits_for_sinks(self):
+        slow = SlowSink(delay=0.2)
+        writer = AsyncMetricsWriter([slow])
+        start = time.perf_counter()
+        for record in records(3):
+            writer.log(record)
+        self.assertLess(time.perf_counter() - start, 0.05)
+
+        writer.close()
+        self.assertEqual([r["epoch"] for r in slow.records], [0, 1, 2])
+        print("✅ Test log sin esperar a la E/S de los sinks PASADO")
+
+    def test_jsonl_and_csv_resume(self):
+        writer = AsyncMetricsWriter([JSONLSink(self.root / "metrics.jsonl"), CSVSink(self.root / "metrics.csv")])
+        for record in records(3):
+            writer.log(record)
+        writer.close()
+
+        # Una ejecución reanudada desde la época 2 repite esa época y añade al final de los mismos ficheros
+        writer = AsyncMetricsWriter([JSONLSink(self.root / "metrics.jsonl"), CSVSink(self.root / "metrics.csv")])
+        for record in records(2, start=2):
+            writer.log({**record, "lr": 0.0005})
+        writer.close()
+
+        loaded = load_metrics(self.root / "metrics.jsonl")
+        self.assertEqual([r["epoch"] for r in loaded], [0, 1, 2, 3])
+        self.assertEqual(loaded[2]["lr"], 0.0005)
+        with open(self.root / "metrics.csv", newline="") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0].keys(), records(1)[0].keys())
+        print("✅ Test logs JSONL y CSV reanudables PASADO")
+
+    def test_broken_sink_is_disabled(self):
+        jsonl = JSONLSink(self.root / "metrics.jsonl")
+        writer = AsyncMetricsWriter([BrokenSink(), jsonl])
+        for record in records(2):
+            writer.log(record)
+        writer.close()
+        self.assertEqual(len(load_metrics(self.root / "metrics.jsonl")), 2)
+        print("✅ Test sink con errores desactivado sin parar el resto PASADO")
+
+    def test_sink_without_write_fails_on_creation(self):
+        class FlushOnlySink(MetricSink):
+            def flush(self):
+                pass
+
+        with self.assertRaises(TypeError):
+            FlushOnlySink()
+        print("✅ Test sink sin write falla al crearlo PASADO")
+
+    def test_plots_in_separate_process(self):
+        (self.root / "metrics.jsonl").write_text("\n".join(json.dumps(r) for r in records(5)) + "\n")
+        process = plot_metrics_async(self.root / "metrics.jsonl")
+        process.join(timeout=120)
+        self.assertEqual(process.exitcode, 0)
+        self.assertTrue((self.root / "loss_curve.png").stat().st_size > 0)
+        self.assertTrue((self.root / "acc_curve.png").stat().st_size > 0)
+        print("✅ Test curvas dibujadas en otro proceso PASADO")
+
+    def test_trainer_logs_every_epoch(self):
+        torch.manual_seed(0)
+        model = nn.Sequential(nn.Flatten(), nn.Linear(3 * 4 * 4, 3))
+        loader = DataLoader(TensorDataset(torch.randint(0, 256, (8, 3, 4, 4), dtype=torch.uint8),
+                                          torch.randint(0, 3, (8,))), batch_size=4)
+        slow = SlowSink(delay=0.01)
+        trainer = Trainer(epochs=3, model=model, model_name="test", train_dataloader=loader, val_dataloader=loader,
+                          optimizer=torch.optim.SGD(model.parameters(), lr=0.1), output_path=self.root,
+                          loss_fn=nn.CrossEntropyLoss(), acc_fn=acc_fn, device="cpu",
+                          train_transform=EvalTransform(), eval_transform=EvalTransform(),
+                          metric_sinks=[slow, JSONLSink(self.root / "test" / "metrics.jsonl")])
+        trainer.train()
+        trainer.plot_process.join(timeout=120)
+
+        self.assertEqual([r["epoch"] for r in slow.records], [0, 1, 2])
+        self.assertEqual(load_metrics(trainer.output_path / "metrics.jsonl")[-1]["val_loss"],
+                         trainer.history["val_loss"][-1])
+        self.assertEqual(trainer.plot_process.exitcode, 0)
+        self.assertTrue((trainer.output_path / "loss_curve.png").exists())
+        print("✅ Test Trainer con métricas asíncronas y curvas al final PASADO")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
+
+from backend.app import create_app, db, bbox_filter, LostReport, ShelterReport
+from backend.instrumentation import explain_indexes
+from backend.migrations.runner import current_revision, downgrade, has_column, has_index, load_migrations, upgrade
+from backend.utils.geo import geohash_encode
+
+
+class TestMigrations(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.engine = sa.create_engine(f"sqlite:///{Path(self.tmp.name) / 'migrations.db'}")
+
+    def tearDown(self):
+        self.engine.dispose()
+        self.tmp.cleanup()
+
+    def test_upgrade_to_head(self):
+        migrations = load_migrations()
+        upgrade(self.engine, migrations=migrations)
+        self.assertEqual(current_revision(self.engine), migrations[-1].revision)
+        with self.engine.connect() as conn:
+            self.assertTrue(has_index(conn, "mascotas_acogidas", "ix_mascotas_acogidas_raza_fecha"))
+            self.assertTrue(has_index(conn, "mascotas_acogidas", "ix_mascotas_acogidas_protectora_fecha"))
+            self.assertTrue(has_index(conn, "mascotas_perdidas", "ix_mascotas_perdidas_raza_fecha"))
+
+        # Volver a ejecutarla no aplica nada de nuevo
+        upgrade(self.engine, migrations=migrations)
+        self.assertEqual(current_revision(self.engine), migrations[-1].revision)
+        print("✅ Test migración hasta la última revisión PASADO")
+
+    def test_upgrade_existing_database(self):
+        # Base de datos creada con el script de inicialización antiguo, con datos
+        upgrade(self.engine, target="0001")
+        with self.engine.begin() as conn:
+            self.assertFalse(has_column(conn, "mascotas_acogidas", "geohash"))
+            conn.execute(sa.text("INSERT INTO protectoras VALUES ('huellas', '4321')"))
+            conn.execute(sa.text(
+                "INSERT INTO mascotas_acogidas (protectora, raza, latitud, longitud, path_imagen) "
+                "VALUES ('huellas', 'beagle', 41.38, 2.17, 'static/shelters_uploads/huellas/mascota1.png')"
+            ))
+        self.assertEqual(current_revision(self.engine), "0001")
+
+        upgrade(self.engine)
+        with self.engine.connect() as conn:
+            self.assertEqual(conn.execute(sa.text("SELECT COUNT(*) FROM mascotas_acogidas")).scalar(), 1)
+            self.assertTrue(has_index(conn, "mascotas_acogidas", "ix_mascotas_acogidas_raza_fecha"))
+            self.assertTrue(has_index(conn, "mascotas_acogidas", "ix_mascotas_acogidas_raza_geohash"))
+            self.assertTrue(has_index(conn, "mascotas_perdidas", "ix_mascotas_perdidas_lat_lon"))
+        # El ORM lee todas las columnas del modelo y la fila antigua tiene ya su geohash
+        with Session(self.engine) as session:
+            report = session.scalars(sa.select(ShelterReport)).one()
+            self.assertEqual(report.geohash, geohash_encode(41.38, 2.17))
+        print("✅ Test migración de una base de datos existente PASADO")
+
+    def test_geohash_backfill_in_batches(self):
+        upgrade(self.engine)
+        rows = [{"protectora": "huellas", "raza": "beagle", "latitud": 41.0 + i / 1000, "longitud": 2.0,
+                 "path_imagen": f"static/shelters_uploads/huellas/{i}.png"} for i in range(5)]
+        with self.engine.begin() as conn:
+            conn.execute(sa.text("INSERT INTO protectoras VALUES ('huellas', '4321')"))
+            conn.execute(sa.text("INSERT INTO mascotas_acogidas (protectora, raza, latitud, longitud, path_imagen) "
+                                 "VALUES (:protectora, :raza, :latitud, :longitud, :path_imagen)"), rows)
+
+        geohash_migration = next(module for module in load_migrations() if module.revision == "0007")
+        with mock.patch.object(geohash_migration, "BATCH_SIZE", 2), self.engine.begin() as conn:
+            self.assertEqual(geohash_migration.backfill(conn, "mascotas_acogidas"), 5)
+            self.assertEqual(geohash_migration.backfill(conn, "mascotas_acogidas"), 0)
+            stored = conn.execute(sa.text("SELECT latitud, longitud, geohash FROM mascotas_acogidas")).all()
+        self.assertEqual([geohash for _, _, geohash in stored], [geohash_encode(lat, lon) for lat, lon, _ in stored])
+        print("✅ Test cálculo por lotes del geohash de filas antiguas PASADO")
+
+    def test_downgrade(self):
+        upgrade(self.engine)
+        downgrade(self.engine, "0001")
+        self.assertEqual(current_revision(self.engine), "0001")
+        with self.engine.connect() as conn:
+            self.assertFalse(has_index(conn, "mascotas_acogidas", "ix_mascotas_acogidas_raza_fecha"))
+            self.assertFalse(has_index(conn, "mascotas_acogidas", "ix_mascotas_acogidas_raza_geohash"))
+            self.assertFalse(has_column(conn, "mascotas_acogidas", "geohash"))
+        print("✅ Test reversión de migraciones PASADO")
+
+
+class TestQueryPlans(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.conn = db.session.connection()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def assertUsesIndex(self, query, index):
+        self.assertIn(index, explain_indexes(self.conn, query.statement))
+
+    def test_raza_fecha_index(self):
+        self.assertUsesIndex(ShelterReport.query.filter_by(raza="beagle").order_by(ShelterReport.fecha.desc()),
+                             "ix_mascotas_acogidas_raza_fecha")
+        self.assertUsesIndex(LostReport.query.filter_by(raza="beagle").order_by(LostReport.fecha.desc()),
+                             "ix_mascotas_perdidas_raza_fecha")
+        print("✅ Test EXPLAIN índice (raza, fecha) PASADO")
+
+    def test_protectora_fecha_index(self):
+        self.assertUsesIndex(ShelterReport.query.filter_by(protectora="huellas").order_by(ShelterReport.fecha.desc()),
+                             "ix_mascotas_acogidas_protectora_fecha")
+        print("✅ Test EXPLAIN índice (protectora, fecha) PASADO")
+
+    def test_bbox_index(self):
+        bbox = (-4.0, 40.0, -3.0, 41.0)
+        query = LostReport.query.filter(bbox_filter(LostReport, bbox))
+        if self.conn.dialect.name == "mysql":
+            self.assertUsesIndex(query, "ix_mascotas_perdidas_ubicacion")
+        else:
+            self.assertUsesIndex(query, "ix_mascotas_perdidas_lat_lon")
+        print("✅ Test EXPLAIN índice del viewport PASADO")
+
+
+if __name__ == "__main__":
+    unittest.main()
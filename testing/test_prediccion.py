@@ -3,9 +3,17 @@ from io import BytesIO
 from pathlib import Path
 from unittest.mock import patch
 
+from PIL import Image
+
 from backend.app import create_app, db, LostReport
 
 
+def png_bytes():
+    buffer = BytesIO()
+    Image.new("RGB", (64, 48), (10, 20, 30)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
 class TestPrediccion(unittest.TestCase):
 
     def setUp(self):
@@ -14,7 +22,7 @@ class TestPrediccion(unittest.TestCase):
         self.app_context = self.app.app_context()
         self.app_context.push()   
         db.create_all()
-        self.upload_folder = self.app.config["UPLOAD_FOLDER"]
+        self.static_root = Path(self.app.static_folder).parent
 
         with self.client.session_transaction() as sess:
             sess["logged_in"] = True
@@ -32,7 +40,7 @@ class TestPrediccion(unittest.TestCase):
         mock_predict.return_value = "labrador"
 
         data = {
-            "imagen": (BytesIO(b"fake image data"), "dog.png"),
+            "imagen": (BytesIO(png_bytes()), "dog.png"),
             "latitud": "40.4168",
             "longitud": "-3.7038"
         }
@@ -61,11 +69,11 @@ class TestPrediccion(unittest.TestCase):
         self.assertEqual(db_report.raza, "labrador")
         self.assertEqual(db_report.username, "testuser")
 
-        image_path = self.upload_folder / "testuser"
-        self.assertTrue(image_path.exists())
-
-        saved_images = list(image_path.glob("*.png"))
-        self.assertTrue(len(saved_images) > 0)
+        # Guardada por contenido, con sus variantes WebP
+        self.assertTrue(db_report.path_imagen.startswith("static/media/originales/"))
+        self.assertTrue(db_report.path_imagen.endswith(".png"))
+        self.assertTrue((self.static_root / db_report.path_imagen).exists())
+        self.assertTrue(report["path_miniatura"].endswith(".webp"))
 
         mock_predict.assert_called_once()
 
@@ -108,6 +116,29 @@ class TestPrediccion(unittest.TestCase):
         print("✅ Predicción sin imagen PASADO")
 
 
+    @patch("backend.app.predict")
+    def test_predict_rejects_non_images(self, mock_predict):
+
+        data = {
+            "imagen": (BytesIO(b"<html><script>alert(1)</script></html>"), "dog.html"),
+            "latitud": "40.4168",
+            "longitud": "-3.7038"
+        }
+
+        response = self.client.post(
+            "/predict",
+            data=data,
+            content_type="multipart/form-data"
+        )
+
+        self.assertEqual(response.status_code, 415)
+        self.assertIsNone(LostReport.query.first())
+        self.assertFalse(list((self.static_root / "static" / "media" / "originales").rglob("*.html")))
+        mock_predict.assert_not_called()
+
+        print("✅ Predicción rechaza ficheros que no son imágenes PASADO")
+
+
     def test_predict_requires_coordinates(self):
 
         data = {
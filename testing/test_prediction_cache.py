@@ -0,0 +1,109 @@
+import tempfile
+import unittest
+from io import BytesIO
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+from PIL import Image
+
+from backend.app import create_app, db, LostReport
+from backend.prediction_cache import PredictionCache, content_hash
+
+
+def png_bytes():
+    buffer = BytesIO()
+    Image.new("RGB", (64, 48), (10, 20, 30)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class TestPredictionCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_lru_and_counters(self):
+        cache = PredictionCache("v1", max_entries=2)
+        cache.put("a", "beagle", "static/uploads/a.png")
+        cache.put("b", "labrador", "static/uploads/b.png")
+        cache.get("a")
+        cache.put("c", "pug", "static/uploads/c.png")
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a")["raza"], "beagle")
+        self.assertEqual(cache.stats(), {"hits": 2, "misses": 1, "disk_hits": 0, "entries": 2})
+
+        print("✅ Caché LRU de predicciones y contadores PASADO")
+
+    def test_disk_tier_and_model_version(self):
+        disk_path = Path(self.tmp.name) / "cache.db"
+        embedding = np.arange(4, dtype=np.float32)
+        PredictionCache("v1", disk_path=disk_path).put("a", "beagle", "static/uploads/a.png", embedding=embedding)
+
+        cache = PredictionCache("v1", disk_path=disk_path)
+        entry = cache.get("a")
+        self.assertEqual(entry["raza"], "beagle")
+        np.testing.assert_array_equal(entry["embedding"], embedding)
+        self.assertEqual(cache.stats()["disk_hits"], 1)
+        # Otro modelo no debe reutilizar predicciones antiguas
+        self.assertIsNone(PredictionCache("v2", disk_path=disk_path).get("a"))
+
+        print("✅ Capa en disco de la caché por versión de modelo PASADO")
+
+
+class TestPredictCacheEndpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = PredictionCache("test")
+        self.app = create_app('testing', test_config={"PREDICTION_CACHE": self.cache})
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        with self.client.session_transaction() as sess:
+            sess["logged_in"] = True
+            sess["account_type"] = "user"
+            sess["nombre"] = "testuser"
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def upload(self, name):
+        return self.client.post("/predict", data={
+            "imagen": (BytesIO(png_bytes()), name),
+            "latitud": "40.4168",
+            "longitud": "-3.7038"
+        }, content_type="multipart/form-data")
+
+    @patch("backend.app.predict")
+    def test_repeated_upload_skips_inference(self, mock_predict):
+        mock_predict.return_value = "labrador"
+
+        with patch.object(self.cache, "peek", wraps=self.cache.peek) as peek:
+            first = self.upload("dog.png")
+            second = self.upload("retry.png")
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(mock_predict.call_count, 1)
+        # Una sola consulta a la caché por subida
+        self.assertEqual(peek.call_count, 2)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+        self.assertEqual(second.get_json()["reporte_usuario"]["raza"], "labrador")
+
+        paths = [r.path_imagen for r in LostReport.query.all()]
+        self.assertEqual(len(paths), 2)
+        self.assertEqual(paths[0], paths[1])
+        self.assertEqual(self.cache.get(content_hash(png_bytes()))["path_imagen"], paths[0])
+
+        print("✅ /predict reutiliza predicción y fichero en subidas repetidas PASADO")
+
+
+if __name__ == "__main__":
+    unittest.main()
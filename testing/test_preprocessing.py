@@ -0,0 +1,61 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from backend.inference.preprocessing import IMAGE_SIZE, decode_image, preprocess, read_image_size
+
+
+class TestPreprocessing(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.image = np.zeros((1200, 1600, 3), dtype=np.uint8)
+        self.image[:, :, 2] = 255  # rojo en BGR
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def encode(self, ext):
+        ok, buffer = cv2.imencode(ext, self.image)
+        self.assertTrue(ok)
+        return buffer.tobytes()
+
+    def test_read_image_size_from_header(self):
+        self.assertEqual(read_image_size(self.encode(".jpg")), (1200, 1600))
+        self.assertEqual(read_image_size(self.encode(".png")), (1200, 1600))
+        self.assertIsNone(read_image_size(b"fake image data"))
+
+        print("✅ Lectura de dimensiones desde cabecera PASADO")
+
+    def test_preprocess_fixed_resolution(self):
+        path = Path(self.tmp.name) / "dog.jpg"
+        path.write_bytes(self.encode(".jpg"))
+
+        tensor = preprocess(path)
+
+        self.assertEqual(tuple(tensor.shape), (3, *IMAGE_SIZE))
+        self.assertGreaterEqual(tensor.min().item(), 0.0)
+        self.assertLessEqual(tensor.max().item(), 1.0)
+        # Canal R (RGB) saturado tras la conversión desde BGR
+        self.assertGreater(tensor[0].mean().item(), 0.9)
+        self.assertLess(tensor[2].mean().item(), 0.1)
+
+        print("✅ Preprocesado a resolución fija PASADO")
+
+    def test_center_crop(self):
+        image = decode_image(self.encode(".png"), size=(100, 100), center_crop=True)
+        self.assertEqual(image.shape, (100, 100, 3))
+
+        print("✅ Recorte central PASADO")
+
+    def test_invalid_image(self):
+        self.assertIsNone(preprocess(b"fake image data"))
+
+        print("✅ Imagen inválida devuelve None PASADO")
+
+
+if __name__ == "__main__":
+    unittest.main()
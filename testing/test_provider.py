@@ -0,0 +1,110 @@
+import threading
+import unittest
+from io import BytesIO
+
+import torch
+from PIL import Image
+from torch import nn
+
+from backend.app import create_app, db
+from backend.model import IDX_TO_CLASSNAME
+from backend.provider import FAILED, READY, InferenceProvider
+
+
+def png_bytes():
+    buffer = BytesIO()
+    Image.new("RGB", (64, 48), (10, 20, 30)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class ConstantModel(nn.Module):
+    """Predice siempre la clase 0 y registra los tamaños de lote recibidos."""
+
+    def __init__(self):
+        super().__init__()
+        self.batch_sizes = []
+
+    def forward(self, x):
+        self.batch_sizes.append(x.shape[0])
+        return torch.zeros(x.shape[0], len(IDX_TO_CLASSNAME))
+
+
+class TestInferenceProvider(unittest.TestCase):
+
+    def test_background_load_and_warmup(self):
+        model = ConstantModel()
+        provider = InferenceProvider(batch_max_size=4, loader=lambda engine, device: model).start()
+
+        self.assertTrue(provider.wait(10))
+        self.assertEqual(provider.status, READY)
+        self.assertEqual(model.batch_sizes, [1, 4])
+        self.assertIn("warmup_s", provider.timings)
+        self.assertEqual(provider.batcher.submit(torch.rand(3, 8, 8)).result(timeout=5), IDX_TO_CLASSNAME[0])
+        provider.batcher.close()
+
+        print("✅ Carga en segundo plano y calentamiento del modelo PASADO")
+
+    def test_failed_load(self):
+        def loader(engine, device):
+            raise FileNotFoundError("best.pth")
+
+        provider = InferenceProvider(loader=loader).start()
+
+        self.assertFalse(provider.wait(10))
+        self.assertEqual(provider.status, FAILED)
+
+        print("✅ Fallo de carga del modelo detectado PASADO")
+
+
+class TestReadiness(unittest.TestCase):
+
+    def setUp(self):
+        self.release = threading.Event()
+        self.model = ConstantModel()
+
+        def loader(engine, device):
+            self.release.wait(10)
+            return self.model
+
+        self.provider = InferenceProvider(loader=loader, warmup=False).start()
+        self.app = create_app('testing', test_config={"INFERENCE_PROVIDER": self.provider, "MODEL_WAIT_S": 0})
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        with self.client.session_transaction() as sess:
+            sess["logged_in"] = True
+            sess["account_type"] = "user"
+            sess["nombre"] = "testuser"
+
+    def tearDown(self):
+        self.release.set()
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def upload(self):
+        return self.client.post("/predict", data={
+            "imagen": (BytesIO(png_bytes()), "dog.png"),
+            "latitud": "40.4168",
+            "longitud": "-3.7038"
+        }, content_type="multipart/form-data")
+
+    def test_ready_endpoint(self):
+        response = self.client.get("/ready")
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.get_json()["status"], "loading")
+        self.assertEqual(self.upload().status_code, 503)
+
+        self.release.set()
+        self.assertTrue(self.provider.wait(10))
+        response = self.client.get("/ready")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["status"], "ready")
+
+        print("✅ /ready refleja la carga del modelo PASADO")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import pickle
+import tempfile
+import unittest
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pandas as pd
+import torch
+from torch.utils.data import DataLoader
+
+from backend.inference.augmentation import EvalTransform, collate_uint8
+from backend.inference.dataset import PetDataset
+from backend.inference.shards import ShardedPetDataset, compile_shards, ensure_shards, load_index
+
+
+class TestShards(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.data = Path(self.tmp.name) / "data"
+        self.shards = Path(self.tmp.name) / "shards"
+        rng = np.random.default_rng(0)
+        rows = []
+        for i in range(10):
+            class_name = ["beagle", "bengal", "boxer"][i % 3]
+            (self.data / class_name).mkdir(parents=True, exist_ok=True)
+            image = rng.integers(0, 256, size=(rng.integers(200, 400), rng.integers(200, 400), 3), dtype=np.uint8)
+            cv2.imwrite(str(self.data / class_name / f"{i}.png"), image)
+            partition = "val" if i in (2, 7) else "train"
+            rows.append((str(i), f"{class_name}/{i}.png", partition, image.shape[0], image.shape[1], class_name))
+        self.df = pd.DataFrame(rows, columns=['id', 'path', 'partition', 'height', 'width', 'class'])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_same_samples_as_pet_dataset(self):
+        compile_shards(self.df, self.data, self.shards, shard_size=3, workers=1)
+
+        for partition in ("train", "val"):
+            original = PetDataset(self.df, self.data, partition)
+            sharded = ShardedPetDataset(self.shards, partition)
+            self.assertEqual(len(sharded), len(original))
+            self.assertEqual(sharded.class_name_to_idx, original.class_name_to_idx)
+            for i in range(len(original)):
+                image, label = original[i]
+                shard_image, shard_label = sharded[i]
+                self.assertTrue(torch.equal(shard_image, image))
+                self.assertEqual(shard_label, label)
+        # 8 imágenes de train en shards de 3
+        self.assertEqual([s["count"] for s in load_index(self.shards)["partitions"]["train"]["shards"]], [3, 3, 2])
+        print("✅ Test shards idénticos a PetDataset PASADO")
+
+    def test_dataloader_workers(self):
+        compile_shards(self.df, self.data, self.shards, shard_size=4, workers=1)
+        dataset = ShardedPetDataset(self.shards, "train")
+        dataset[0]
+        # Los memmaps abiertos no viajan a los workers
+        self.assertIsNone(pickle.loads(pickle.dumps(dataset))._shards)
+
+        loader = DataLoader(dataset, batch_size=3, num_workers=1)
+        labels = torch.cat([batch_labels for _, batch_labels in loader])
+        self.assertEqual(labels.tolist(), dataset.labels.tolist())
+        print("✅ Test shards con workers del DataLoader PASADO")
+
+    def test_uint8_batches(self):
+        compile_shards(self.df, self.data, self.shards, workers=1)
+        float_data = ShardedPetDataset(self.shards, "val")
+        loader = DataLoader(ShardedPetDataset(self.shards, "val", uint8=True), batch_size=2, collate_fn=collate_uint8)
+
+        images, labels = next(iter(loader))
+        self.assertEqual(images.dtype, torch.uint8)
+        self.assertTrue(torch.allclose(EvalTransform()(images), torch.stack([float_data[i][0] for i in range(2)])))
+        self.assertEqual(labels.tolist(), [float_data[i][1] for i in range(2)])
+        print("✅ Test lotes uint8 desde los shards PASADO")
+
+    def test_recompile_when_csv_changes(self):
+        first = ensure_shards(self.df, self.data, self.shards, workers=1)
+        mtime = (self.shards / "index.json").stat().st_mtime_ns
+        self.assertEqual(ensure_shards(self.df, self.data, self.shards, workers=1), first)
+        self.assertEqual((self.shards / "index.json").stat().st_mtime_ns, mtime)
+
+        changed = self.df.copy()
+        changed.loc[0, 'partition'] = 'test'
+        index = ensure_shards(changed, self.data, self.shards, workers=1)
+        self.assertNotEqual(index["digest"], first["digest"])
+        self.assertEqual(len(ShardedPetDataset(self.shards, "test")), 1)
+        print("✅ Test recompilación al cambiar el CSV PASADO")
+
+
+if __name__ == "__main__":
+    unittest.main()
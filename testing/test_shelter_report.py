@@ -1,10 +1,19 @@
 import unittest
 from io import BytesIO
+from pathlib import Path
 from unittest.mock import patch
 
+from PIL import Image
+
 from backend.app import create_app, db, ShelterReport, LostReport
 
 
+def png_bytes():
+    buffer = BytesIO()
+    Image.new("RGB", (64, 48), (10, 20, 30)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
 class TestShelterEndpoints(unittest.TestCase):
 
     def setUp(self):
@@ -13,7 +22,7 @@ class TestShelterEndpoints(unittest.TestCase):
         self.app_context = self.app.app_context()
         self.app_context.push()   
         db.create_all()
-        self.shelter_folder = self.app.config["SHELTER_UPLOAD_FOLDER"]
+        self.static_root = Path(self.app.static_folder).parent
 
         with self.client.session_transaction() as sess:
             sess["logged_in"] = True
@@ -35,7 +44,7 @@ class TestShelterEndpoints(unittest.TestCase):
         mock_predict.return_value = "labrador"
 
         data = {
-            "imagen": (BytesIO(b"fake image"), "dog.png"),
+            "imagen": (BytesIO(png_bytes()), "dog.png"),
             "latitud": "40.4",
             "longitud": "-3.7"
         }
@@ -61,9 +70,8 @@ class TestShelterEndpoints(unittest.TestCase):
         self.assertEqual(db_report.protectora, "testshelter")
 
         # Imagen guardada
-        folder = self.shelter_folder / "testshelter"
-        self.assertTrue(folder.exists())
-        self.assertTrue(len(list(folder.glob("*.png"))) > 0)
+        self.assertEqual(json_data["reporte_actual"]["path_imagen"], db_report.path_imagen)
+        self.assertTrue((self.static_root / db_report.path_imagen).exists())
 
         # Modelo llamado
         mock_predict.assert_called_once()
@@ -0,0 +1,174 @@
+import random
+import unittest
+from io import BytesIO
+from unittest.mock import patch
+
+from PIL import Image
+from sqlalchemy import event
+
+from backend.app import create_app, db, ShelterReport
+from backend.spatial import nearby_reports
+from backend.utils.geo import geohash_encode, geohash_neighbors, haversine, haversine_batch, nearest_k
+
+MADRID = (40.4168, -3.7038)
+
+
+def png_bytes():
+    buffer = BytesIO()
+    Image.new("RGB", (64, 48), (10, 20, 30)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class TestSpatialIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        rng = random.Random(0)
+        self.points = [(MADRID[0] + rng.uniform(-1, 1), MADRID[1] + rng.uniform(-1, 1)) for _ in range(300)]
+        for idx, (lat, lon) in enumerate(self.points):
+            db.session.add(ShelterReport(
+                path_imagen=f"test{idx}.png",
+                raza="labrador" if idx % 2 else "beagle",
+                latitud=lat,
+                longitud=lon,
+                protectora="testshelter"
+            ))
+        db.session.commit()
+
+        with self.client.session_transaction() as sess:
+            sess["logged_in"] = True
+            sess["account_type"] = "user"
+            sess["nombre"] = "testuser"
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def brute_force(self, raza=None):
+        return sorted(
+            (haversine(*MADRID, lat, lon), idx)
+            for idx, (lat, lon) in enumerate(self.points)
+            if raza is None or (raza == "labrador") == bool(idx % 2)
+        )
+
+    def test_geohash(self):
+        self.assertEqual(geohash_encode(57.64911, 10.40744, 11), "u4pruydqqvj")
+        self.assertEqual(len(geohash_neighbors("ezjmg")), 9)
+
+        print("✅ Codificación geohash PASADO")
+
+    def test_haversine_batch(self):
+        lats = [lat for lat, _ in self.points]
+        lons = [lon for _, lon in self.points]
+        distances = haversine_batch(*MADRID, lats, lons)
+
+        for distance, (lat, lon) in zip(distances, self.points):
+            self.assertAlmostEqual(distance, haversine(*MADRID, lat, lon), places=9)
+        self.assertEqual(nearest_k(distances, 3).tolist(), [idx for _, idx in self.brute_force()[:3]])
+
+        print("✅ Haversine vectorizado y top-k PASADO")
+
+    def test_within_radius(self):
+        results = nearby_reports(ShelterReport.query, ShelterReport, *MADRID, radius_km=25)
+        expected = [d for d, _ in self.brute_force() if d <= 25]
+
+        self.assertEqual(len(results), len(expected))
+        for (_, distance), expected_distance in zip(results, expected):
+            self.assertAlmostEqual(distance, expected_distance, places=6)
+
+        print("✅ Búsqueda por radio con índice geohash PASADO")
+
+    def test_k_nearest_with_breed(self):
+        query = ShelterReport.query.filter_by(raza="labrador")
+        results = nearby_reports(query, ShelterReport, *MADRID, limit=5)
+        expected = [d for d, _ in self.brute_force(raza="labrador")[:5]]
+
+        self.assertEqual([r.raza for r, _ in results], ["labrador"] * 5)
+        for (_, distance), expected_distance in zip(results, expected):
+            self.assertAlmostEqual(distance, expected_distance, places=6)
+
+        print("✅ k vecinos más cercanos filtrando por raza PASADO")
+
+    def test_k_nearest_on_small_table(self):
+        statements = []
+
+        def count(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", count)
+        try:
+            results = nearby_reports(ShelterReport.query, ShelterReport, *MADRID, limit=1000)
+        finally:
+            event.remove(db.engine, "before_cursor_execute", count)
+
+        # Celda fina, celda gruesa y, como no hay 1000 reportes, la tabla entera
+        self.assertEqual(len(statements), 3)
+        self.assertEqual(len(results), len(self.points))
+        self.assertAlmostEqual(results[0][1], self.brute_force()[0][0], places=6)
+
+        print("✅ k vecinos en una tabla pequeña sin ensanchar nivel a nivel PASADO")
+
+    def test_rows_without_geohash(self):
+        # Fila insertada sin pasar por el ORM (p. ej. antes de la migración 0007): geohash a NULL
+        db.session.execute(ShelterReport.__table__.insert().values(
+            path_imagen="legacy.png", raza="labrador", latitud=MADRID[0] + 0.001, longitud=MADRID[1],
+            protectora="testshelter", geohash=None
+        ))
+        far_id = db.session.execute(ShelterReport.__table__.insert().values(
+            path_imagen="legacy_far.png", raza="labrador", latitud=MADRID[0] + 5, longitud=MADRID[1],
+            protectora="testshelter", geohash=None
+        )).inserted_primary_key[0]
+        db.session.commit()
+
+        within = nearby_reports(ShelterReport.query, ShelterReport, *MADRID, radius_km=1)
+        self.assertIn("legacy.png", [r.path_imagen for r, _ in within])
+        self.assertNotIn(far_id, [r.id for r, _ in within])
+
+        nearest, distance = nearby_reports(ShelterReport.query, ShelterReport, *MADRID, limit=1)[0]
+        self.assertEqual(nearest.path_imagen, "legacy.png")
+        self.assertAlmostEqual(distance, haversine(*MADRID, MADRID[0] + 0.001, MADRID[1]), places=6)
+
+        print("✅ Reportes sin geohash incluidos en las búsquedas por radio PASADO")
+
+    @patch("backend.app.predict")
+    def test_predict_radius_and_limit(self, mock_predict):
+        mock_predict.return_value = "labrador"
+
+        response = self.client.post("/predict", data={
+            "imagen": (BytesIO(png_bytes()), "dog.png"),
+            "latitud": str(MADRID[0]),
+            "longitud": str(MADRID[1]),
+            "radius_km": "50",
+            "limit": "3"
+        }, content_type="multipart/form-data")
+
+        self.assertEqual(response.status_code, 200)
+        matches = response.get_json()["protegidos_similares"]
+        self.assertEqual(len(matches), 3)
+        distances = [m["distancia_km"] for m in matches]
+        self.assertEqual(distances, sorted(distances))
+        self.assertTrue(all(d <= 50 for d in distances))
+
+        print("✅ /predict con radius_km y limit PASADO")
+
+    def test_predict_invalid_limit(self):
+        response = self.client.post("/predict", data={
+            "imagen": (BytesIO(png_bytes()), "dog.png"),
+            "latitud": "40",
+            "longitud": "-3",
+            "limit": "-1"
+        }, content_type="multipart/form-data")
+
+        self.assertEqual(response.status_code, 400)
+
+        print("✅ /predict rechaza limit inválido PASADO")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,163 @@
+import tempfile
+import unittest
+from io import BytesIO
+from pathlib import Path
+from unittest.mock import patch
+
+from PIL import Image
+
+from backend.app import create_app, db, LostReport
+from backend.inference.build_embeddings import STATIC_ROOT, image_path
+from backend.storage import ImageStore, LocalStorage, S3Storage, UnsupportedImage
+
+
+def png_bytes(size=(1200, 900), color=(200, 120, 40)):
+    buffer = BytesIO()
+    Image.new("RGB", size, color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class FakeS3Client:
+    """Sustituto en memoria con los métodos de boto3 que usa S3Storage."""
+
+    def __init__(self):
+        self.objects = {}
+
+    def put_object(self, Bucket, Key, Body, ContentType, CacheControl):
+        self.objects[(Bucket, Key)] = (Body, ContentType)
+
+    def get_object(self, Bucket, Key):
+        return {"Body": BytesIO(self.objects[(Bucket, Key)][0])}
+
+    def list_objects_v2(self, Bucket, Prefix, MaxKeys):
+        keys = sorted(key for bucket, key in self.objects if bucket == Bucket and key.startswith(Prefix))
+        return {"Contents": [{"Key": key} for key in keys[:MaxKeys]]}
+
+
+class TestImageStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.store = ImageStore(LocalStorage(self.root, "static/media"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_variants_and_layout(self):
+        data = png_bytes()
+        stored = self.store.save(data, "foto.JPG")
+
+        # La extensión sale del formato real, no del nombre subido
+        self.assertTrue(stored["path_imagen"].startswith("static/media/originales/"))
+        self.assertTrue(stored["path_imagen"].endswith(".png"))
+        self.assertEqual(Path(stored["file_path"]).read_bytes(), data)
+        for name, size in {"miniatura": 192, "previa": 768}.items():
+            path = self.root / stored[f"path_{name}"].removeprefix("static/media/")
+            with Image.open(path) as variant:
+                self.assertEqual(variant.format, "WEBP")
+                self.assertEqual(max(variant.size), size)
+        print("✅ Test variantes WebP y rutas por contenido PASADO")
+
+    def test_same_content_same_key(self):
+        first = self.store.save(png_bytes(), "a.png")
+        second = self.store.save(png_bytes(), "b.png")
+        other = self.store.save(png_bytes(color=(0, 0, 0)), "a.png")
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first["key"], other["key"])
+        print("✅ Test misma imagen, misma clave PASADO")
+
+    def test_small_image_not_upscaled(self):
+        stored = self.store.save(png_bytes(size=(100, 50)), "small.png")
+        with Image.open(self.root / stored["path_previa"].removeprefix("static/media/")) as variant:
+            self.assertEqual(variant.size, (100, 50))
+        print("✅ Test sin ampliar imágenes pequeñas PASADO")
+
+    def test_not_an_image(self):
+        with self.assertRaises(UnsupportedImage):
+            self.store.save(b"not an image", "../../etc/passwd.png")
+        svg = b'<svg xmlns="http://www.w3.org/2000/svg"><script>alert(1)</script></svg>'
+        with self.assertRaises(UnsupportedImage):
+            self.store.save(svg, "dog.svg")
+        buffer = BytesIO()
+        Image.new("RGB", (8, 8)).save(buffer, format="TIFF")
+        with self.assertRaises(UnsupportedImage) as ctx:
+            self.store.save(buffer.getvalue(), "dog.png")
+        self.assertEqual(ctx.exception.image_format, "TIFF")
+        self.assertFalse([p for p in self.root.rglob("*") if p.is_file()])
+        print("✅ Test fichero que no es imagen rechazado PASADO")
+
+    def test_local_path_from_url(self):
+        stored = self.store.save(png_bytes(), "dog.png")
+        self.assertEqual(self.store.backend.key_for(stored["path_imagen"]), stored["key"])
+        self.assertEqual(image_path(self.store, stored["path_imagen"]), Path(stored["file_path"]))
+        # Reportes anteriores: rutas estáticas fuera del almacenamiento
+        self.assertIsNone(self.store.backend.key_for("static/uploads/testuser/dog.png"))
+        self.assertEqual(image_path(self.store, "static/uploads/testuser/dog.png"),
+                         STATIC_ROOT / "static/uploads/testuser/dog.png")
+
+        s3 = ImageStore(S3Storage(FakeS3Client(), "petracker", "https://cdn.example.com/", self.root / "cache"))
+        stored = s3.save(png_bytes(), "dog.png")
+        Path(stored["file_path"]).unlink()
+        self.assertEqual(image_path(s3, stored["path_imagen"]).read_bytes(), png_bytes())
+        print("✅ Test fichero local a partir de path_imagen PASADO")
+
+    def test_s3_backend(self):
+        client = FakeS3Client()
+        store = ImageStore(S3Storage(client, "petracker", "https://cdn.example.com/", self.root / "cache"))
+        stored = store.save(png_bytes(), "dog.png")
+
+        self.assertTrue(stored["path_miniatura"].startswith("https://cdn.example.com/miniatura/"))
+        self.assertEqual(len(client.objects), 3)
+        self.assertEqual(client.objects[("petracker", stored["key"])][1], "image/png")
+
+        # Sin copia local se descarga del bucket para la inferencia
+        Path(stored["file_path"]).unlink()
+        self.assertEqual(Path(store.backend.local_path(stored["key"])).read_bytes(), png_bytes())
+        self.assertEqual(store.save(png_bytes(), "again.png"), stored)
+        print("✅ Test backend compatible con S3 PASADO")
+
+
+class TestUploadVariants(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.app = create_app('testing', test_config={
+            "IMAGE_STORE": ImageStore(LocalStorage(self.tmp.name, "static/media"))
+        })
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        with self.client.session_transaction() as sess:
+            sess["logged_in"] = True
+            sess["account_type"] = "user"
+            sess["nombre"] = "testuser"
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+        self.tmp.cleanup()
+
+    @patch("backend.app.predict")
+    def test_predict_records_variants(self, mock_predict):
+        mock_predict.return_value = "labrador"
+        response = self.client.post("/predict", data={
+            "imagen": (BytesIO(png_bytes()), "dog.png"),
+            "latitud": "40.4168",
+            "longitud": "-3.7038"
+        }, content_type="multipart/form-data")
+
+        self.assertEqual(response.status_code, 200)
+        report = LostReport.query.one()
+        self.assertTrue(report.path_miniatura.endswith(".webp"))
+        self.assertTrue(report.path_previa.endswith(".webp"))
+        self.assertEqual(response.get_json()["reporte_usuario"]["path_miniatura"], report.path_miniatura)
+        print("✅ Test /predict guarda las variantes en el reporte PASADO")
+
+
+if __name__ == "__main__":
+    unittest.main()
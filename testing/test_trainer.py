@@ -0,0 +1,114 @@
+import tempfile
+import unittest
+
+import torch
+from torch import nn
+from torch.utils.data import DataLoader, TensorDataset
+
+from backend.inference.augmentation import EvalTransform
+from backend.inference.metrics import acc_fn
+from backend.inference.trainer import Trainer
+
+
+def small_model(batch_norm=True):
+    torch.manual_seed(0)
+    # BatchNorm depende del tamaño del lote: sin ella, acumular 4x4 es exactamente un lote de 16
+    norm = nn.BatchNorm2d(8) if batch_norm else nn.Identity()
+    return nn.Sequential(nn.Conv2d(3, 8, 3, padding=1), norm, nn.ReLU(),
+                         nn.AdaptiveAvgPool2d(1), nn.Flatten(), nn.Linear(8, 3))
+
+
+class TestTrainer(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        generator = torch.Generator().manual_seed(0)
+        self.images = torch.randint(0, 256, (16, 3, 16, 16), dtype=torch.uint8, generator=generator)
+        self.labels = torch.randint(0, 3, (16,), generator=generator)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def trainer(self, model, batch_size, epochs=1, optimizer=None, **options):
+        loader = DataLoader(TensorDataset(self.images, self.labels), batch_size=batch_size)
+        optimizer = optimizer or torch.optim.SGD(model.parameters(), lr=0.1)
+        return Trainer(epochs=epochs, model=model, model_name='test', train_dataloader=loader, val_dataloader=loader,
+                       optimizer=optimizer, output_path=self.tmp.name,
+                       loss_fn=nn.CrossEntropyLoss(), acc_fn=acc_fn, device='cpu',
+                       train_transform=EvalTransform(), eval_transform=EvalTransform(), plot_curves=False, **options)
+
+    def test_grad_accumulation_matches_large_batch(self):
+        large = self.trainer(small_model(batch_norm=False), batch_size=16)
+        accumulated = self.trainer(small_model(batch_norm=False), batch_size=4, grad_accumulation=4)
+        large_loss, _ = large.train_one_epoch(large.train_dataloader)
+        accumulated_loss, _ = accumulated.train_one_epoch(accumulated.train_dataloader)
+
+        for p_large, p_acc in zip(large.model.parameters(), accumulated.model.parameters()):
+            self.assertTrue(torch.allclose(p_large, p_acc, atol=1e-5))
+        self.assertAlmostEqual(large_loss, accumulated_loss, places=5)
+        print("✅ Test acumulación de gradientes equivalente a un lote grande PASADO")
+
+    def test_metrics_accumulated_on_device(self):
+        trainer = self.trainer(small_model(), batch_size=5)
+        loss, acc = trainer.val_one_epoch(trainer.val_dataloader)
+
+        with torch.inference_mode():
+            logits = trainer.model(EvalTransform()(self.images))
+        self.assertAlmostEqual(loss, nn.functional.cross_entropy(logits, self.labels).item(), places=5)
+        self.assertAlmostEqual(acc, (logits.argmax(dim=1) == self.labels).float().mean().item(), places=6)
+        print("✅ Test métricas acumuladas por muestra en el dispositivo PASADO")
+
+    def test_bf16_channels_last(self):
+        trainer = self.trainer(small_model(), batch_size=8, amp_dtype=torch.bfloat16, channels_last=True)
+        self.assertTrue(trainer.model[0].weight.is_contiguous(memory_format=torch.channels_last))
+        before = trainer.model[0].weight.detach().clone()
+
+        loss, acc = trainer.train_one_epoch(trainer.train_dataloader)
+        self.assertTrue(torch.isfinite(torch.tensor(loss)))
+        self.assertTrue(0 <= acc <= 1)
+        # Los pesos siguen en float32: autocast solo cambia el tipo de las operaciones
+        self.assertEqual(trainer.model[0].weight.dtype, torch.float32)
+        self.assertFalse(torch.equal(before, trainer.model[0].weight))
+        print("✅ Test entrenamiento bf16 con channels_last PASADO")
+
+    def resumable(self, epochs):
+        model = small_model()
+        optimizer = torch.optim.SGD(model.parameters(), lr=0.1, momentum=0.9)
+        scheduler = torch.optim.lr_scheduler.StepLR(optimizer, step_size=1, gamma=0.5)
+        return self.trainer(model, batch_size=8, epochs=epochs, optimizer=optimizer, scheduler=scheduler)
+
+    def test_resume_matches_uninterrupted_run(self):
+        full = self.resumable(epochs=4)
+        full.train()
+        expected = {k: v.clone() for k, v in full.model.state_dict().items()}
+        expected_history = full.history
+        (full.output_path / "last.pt").unlink()
+
+        # Un entrenamiento cortado tras 2 épocas y reanudado desde last.pt con un Trainer nuevo
+        self.resumable(epochs=2).train()
+        resumed = self.resumable(epochs=4)
+        self.assertEqual(resumed.train(resume=True), 4)
+
+        for key, value in resumed.model.state_dict().items():
+            self.assertTrue(torch.allclose(value.float(), expected[key].float(), atol=1e-6), key)
+        self.assertEqual(resumed.history["epoch"], [0, 1, 2, 3])
+        self.assertEqual(resumed.history["lr"], expected_history["lr"])
+        self.assertEqual(resumed.scheduler.last_epoch, 4)
+        self.assertEqual(sorted(p.name for p in resumed.output_path.glob(".tmp-*")), [])
+        print("✅ Test reanudación idéntica a un entrenamiento sin cortes PASADO")
+
+    def test_early_stopping(self):
+        model = small_model()
+        # Con lr=0 la validación nunca mejora tras la primera época
+        trainer = self.trainer(model, batch_size=8, epochs=20, optimizer=torch.optim.SGD(model.parameters(), lr=0),
+                               patience=2, checkpoint_every=10)
+
+        self.assertEqual(trainer.train(), 3)
+        self.assertTrue((trainer.output_path / "best.pth").exists())
+        # Al parar se guarda el checkpoint aunque no toque por checkpoint_every
+        self.assertEqual(torch.load(trainer.output_path / "last.pt", weights_only=False)["epoch"], 3)
+        print("✅ Test parada temprana por paciencia PASADO")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import tempfile
+import unittest
+from io import BytesIO
+from unittest.mock import patch
+
+from PIL import Image
+
+from backend.app import create_app, db, LostReport
+from backend.storage import ImageStore, LocalStorage
+
+
+def png_bytes(size):
+    buffer = BytesIO()
+    Image.new("RGB", size, (10, 20, 30)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class TestUploadLimits(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.app = create_app('testing', test_config={
+            "MAX_CONTENT_LENGTH": 64 * 1024,
+            "IMAGE_STORE": ImageStore(LocalStorage(self.tmp.name, "static/media"), max_pixels=500 * 500)
+        })
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        with self.client.session_transaction() as sess:
+            sess["logged_in"] = True
+            sess["account_type"] = "user"
+            sess["nombre"] = "testuser"
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+        self.tmp.cleanup()
+
+    def upload(self, data):
+        return self.client.post("/predict", data={
+            "imagen": (BytesIO(data), "dog.png"),
+            "latitud": "40.4168",
+            "longitud": "-3.7038"
+        }, content_type="multipart/form-data")
+
+    @patch("backend.app.predict")
+    def test_decodes_from_memory(self, mock_predict):
+        mock_predict.return_value = "labrador"
+        data = png_bytes((400, 300))
+        response = self.upload(data)
+
+        self.assertEqual(response.status_code, 200)
+        # El modelo recibe los bytes subidos, no la ruta del fichero guardado
+        self.assertEqual(mock_predict.call_args.args[1], data)
+        print("✅ Test decodificación desde memoria PASADO")
+
+    @patch("backend.app.predict")
+    def test_content_length_limit(self, mock_predict):
+        response = self.upload(b"\0" * (128 * 1024))
+
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(response.get_json()["error"], "File too large")
+        mock_predict.assert_not_called()
+        print("✅ Test límite de tamaño de la subida PASADO")
+
+    @patch("backend.app.predict")
+    def test_pixel_limit(self, mock_predict):
+        # Pocos bytes pero demasiados píxeles: se rechaza por la cabecera, sin decodificar ni guardar
+        response = self.upload(png_bytes((1000, 1000)))
+
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(response.get_json()["error"], "Image too large")
+        mock_predict.assert_not_called()
+        self.assertEqual(LostReport.query.count(), 0)
+        self.assertEqual(list(self.app.config["IMAGE_STORE"].backend.root.rglob("*.png")), [])
+        print("✅ Test límite de píxeles PASADO")
+
+
+if __name__ == "__main__":
+    unittest.main()
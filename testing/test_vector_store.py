@@ -0,0 +1,163 @@
+import tempfile
+import unittest
+from io import BytesIO
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+from PIL import Image
+
+from backend.app import create_app, db, ShelterReport
+from backend.inference.vector_store import VectorStore
+
+DIM = 32
+
+
+def png_bytes():
+    buffer = BytesIO()
+    Image.new("RGB", (64, 48), (10, 20, 30)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class TestVectorStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(0)
+        self.vectors = rng.standard_normal((500, DIM)).astype(np.float32)
+        self.queries = self.vectors[:20] + 0.3 * rng.standard_normal((20, DIM)).astype(np.float32)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def exact_top_k(self, query, k):
+        normalized = self.vectors / np.linalg.norm(self.vectors, axis=1, keepdims=True)
+        return set(np.argsort(-(normalized @ query))[:k].tolist())
+
+    def fill(self, dtype):
+        store = VectorStore(Path(self.tmp.name) / dtype, DIM, dtype=dtype)
+        for key, vector in enumerate(self.vectors):
+            store.add(key, vector)
+        return store
+
+    def test_float16_search(self):
+        store = self.fill("float16")
+        self.assertEqual(len(store), 500)
+
+        keys, similarities = store.search(self.vectors[7], k=5)
+        self.assertEqual(keys[0], 7)
+        self.assertAlmostEqual(float(similarities[0]), 1.0, places=2)
+        self.assertEqual(list(similarities), sorted(similarities, reverse=True))
+
+        print("✅ Búsqueda en vector store float16 PASADO")
+
+    def test_int8_recall(self):
+        store = self.fill("int8")
+        recall = np.mean([
+            len(set(store.search(query, k=10)[0].tolist()) & self.exact_top_k(query, 10)) / 10
+            for query in self.queries
+        ])
+        self.assertGreaterEqual(recall, 0.9)
+
+        print("✅ Recall@10 del vector store int8 PASADO")
+
+    def test_persistence_and_lookup(self):
+        self.fill("float16")
+        store = VectorStore(Path(self.tmp.name) / "float16", DIM, dtype="float16")
+        self.assertEqual(len(store), 500)
+
+        similarities = store.similarities(self.vectors[3], [3, 10, 9999])
+        self.assertAlmostEqual(float(similarities[0]), 1.0, places=2)
+        self.assertTrue(np.isnan(similarities[2]))
+
+        print("✅ Persistencia del vector store entre instancias PASADO")
+
+    def test_interrupted_add(self):
+        path = Path(self.tmp.name) / "int8"
+        store = VectorStore(path, DIM, dtype="int8")
+        for key in range(3):
+            store.add(key, self.vectors[key])
+        # add interrumpido: vector y escala escritos, clave no
+        encoded, scale = store._encode(self.vectors[3])
+        with open(path / "vectors.bin", "ab") as f:
+            f.write(encoded.tobytes())
+        with open(path / "scales.bin", "ab") as f:
+            f.write(scale.tobytes())
+
+        store.add(4, self.vectors[4])
+        self.assertEqual(len(store), 4)
+        self.assertAlmostEqual(float(store.similarities(self.vectors[4], [4])[0]), 1.0, places=2)
+
+        # Y al abrir: un vector sin escala ni clave se descarta
+        with open(path / "vectors.bin", "ab") as f:
+            f.write(encoded.tobytes())
+        store = VectorStore(path, DIM, dtype="int8")
+        self.assertEqual((path / "vectors.bin").stat().st_size, 4 * DIM)
+        store.add(5, self.vectors[5])
+        self.assertEqual(store.search(self.vectors[5], k=1)[0].tolist(), [5])
+
+        print("✅ Vector store reparado tras un add interrumpido PASADO")
+
+
+class TestVisualMatching(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.stores = {
+            "perdidos": VectorStore(Path(self.tmp.name) / "perdidos", DIM),
+            "acogidas": VectorStore(Path(self.tmp.name) / "acogidas", DIM)
+        }
+        self.app = create_app('testing', test_config={"VECTOR_STORES": self.stores})
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        with self.client.session_transaction() as sess:
+            sess["logged_in"] = True
+            sess["account_type"] = "user"
+            sess["nombre"] = "testuser"
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+        self.tmp.cleanup()
+
+    def add_shelter_report(self, raza, embedding):
+        report = ShelterReport(path_imagen=f"{raza}.png", raza=raza, latitud=40.0, longitud=-3.0,
+                               protectora="testshelter")
+        db.session.add(report)
+        db.session.commit()
+        self.stores["acogidas"].add(report.id, embedding)
+
+    @patch("backend.app.predict")
+    def test_predict_ranks_by_similarity(self, mock_predict):
+        query = np.zeros(DIM, dtype=np.float32)
+        query[0] = 1.0
+        similar = query.copy()
+        similar[1] = 0.2
+        different = np.zeros(DIM, dtype=np.float32)
+        different[2] = 1.0
+        # Otra raza pero visualmente casi idéntico: debe aparecer y quedar primero
+        self.add_shelter_report("beagle", different)
+        self.add_shelter_report("labrador", similar)
+        mock_predict.return_value = ("beagle", query)
+
+        response = self.client.post("/predict", data={
+            "imagen": (BytesIO(png_bytes()), "dog.png"),
+            "latitud": "40.0",
+            "longitud": "-3.0"
+        }, content_type="multipart/form-data")
+
+        self.assertEqual(response.status_code, 200)
+        matches = response.get_json()["protegidos_similares"]
+        self.assertEqual([m["raza"] for m in matches], ["labrador", "beagle"])
+        self.assertGreater(matches[0]["similitud"], 0.9)
+        self.assertEqual(len(self.stores["perdidos"]), 1)
+
+        print("✅ /predict ordena por similitud visual PASADO")
+
+
+if __name__ == "__main__":
+    unittest.main()